@@ -7,10 +7,7 @@
 import os
 import random
 import csv
-import threading
 import time
-import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from datetime import timedelta, datetime
 
@@ -48,6 +45,119 @@ try:
     from .extensions import jwt, sess, bcrypt, mail, csrf
 except ImportError:  # Fallback for script execution
     from extensions import jwt, sess, bcrypt, mail, csrf
+
+try:
+    from .modules.ingest import (
+        _chunks,
+        company_question_docs,
+        inspect_upload,
+        iter_upload_chunks,
+        normalize_import_frame,
+        resolve_company_ids,
+        resolve_question_ids,
+        write_company_questions,
+    )
+    from .modules.jobs import JobRunner, describe_job, job_handler
+    from .modules.meta_ids import MetaIds, to_oid
+    from .modules.sync_state import SyncMetrics, SyncState
+    from .modules.sync_scheduler import (
+        PRIORITY_LOGIN,
+        PRIORITY_MANUAL,
+        SyncScheduler,
+    )
+    from .modules.catalog import CatalogResponses, SlugIndex, bump_catalog_version
+    from .modules.cache import make_cache
+    from .modules.company_index import CompanyIndex
+    from .modules.catalog_snapshot import CatalogSnapshot
+    from .modules.search_index import SearchIndex
+    from .modules.bucket_view import BucketView, refresh_questions, write_view_rows
+    from .modules.pagination import (
+        InvalidCursor,
+        decode_cursor,
+        encode_cursor,
+        keyset_match,
+        value_at,
+    )
+    from .modules.bitmaps import (
+        CatalogBitmaps,
+        SolvedBitmaps,
+        assign_ordinals,
+        difference,
+        intersect,
+        popcount,
+    )
+    from .modules.user_stats import StatsCounters
+    from .modules.meta_buffer import (
+        ROW_FIELDS,
+        SHARED_FIELDS,
+        MetaWriteBuffer,
+        row_ops,
+        target_row,
+    )
+    from .modules.content_cache import ContentCache
+    from .modules.leetcode_client import (
+        HttpClient,
+        HTTPClientError,
+        HTTPStatusError,
+        LeetCodeClient,
+        solved_from_problem_list,
+    )
+except ImportError:  # Fallback for script execution
+    from modules.ingest import (
+        _chunks,
+        company_question_docs,
+        inspect_upload,
+        iter_upload_chunks,
+        normalize_import_frame,
+        resolve_company_ids,
+        resolve_question_ids,
+        write_company_questions,
+    )
+    from modules.jobs import JobRunner, describe_job, job_handler
+    from modules.meta_ids import MetaIds, to_oid
+    from modules.sync_state import SyncMetrics, SyncState
+    from modules.sync_scheduler import (
+        PRIORITY_LOGIN,
+        PRIORITY_MANUAL,
+        SyncScheduler,
+    )
+    from modules.catalog import CatalogResponses, SlugIndex, bump_catalog_version
+    from modules.cache import make_cache
+    from modules.company_index import CompanyIndex
+    from modules.catalog_snapshot import CatalogSnapshot
+    from modules.search_index import SearchIndex
+    from modules.bucket_view import BucketView, refresh_questions, write_view_rows
+    from modules.pagination import (
+        InvalidCursor,
+        decode_cursor,
+        encode_cursor,
+        keyset_match,
+        value_at,
+    )
+    from modules.bitmaps import (
+        CatalogBitmaps,
+        SolvedBitmaps,
+        assign_ordinals,
+        difference,
+        intersect,
+        popcount,
+    )
+    from modules.user_stats import StatsCounters
+    from modules.meta_buffer import (
+        ROW_FIELDS,
+        SHARED_FIELDS,
+        MetaWriteBuffer,
+        row_ops,
+        target_row,
+    )
+    from modules.content_cache import ContentCache
+    from modules.leetcode_client import (
+        HttpClient,
+        HTTPClientError,
+        HTTPStatusError,
+        LeetCodeClient,
+        solved_from_problem_list,
+    )
 from flask_cors import CORS
 from flask_wtf.csrf import generate_csrf
 import bleach
@@ -99,10 +209,102 @@ CQ = db.company_questions
 USER_META = db.user_meta
 USERS = db.users
 FS = gridfs.GridFS(db)
+CATALOG_STATE = db.catalog_state
+
+# slug -> question id, shared by every sync in this process; refreshed
+# incrementally when a loader or import bumps the catalog version.
+SLUG_INDEX = SlugIndex(QUEST, CATALOG_STATE)
+# Last synced solved set per user; syncs only write the difference.
+SYNC_STATE = SyncState(db.sync_state)
+# user_meta.question_id filters; matches legacy string ids until
+# `python -m backend.modules.meta_ids` has finished.
+META_IDS = MetaIds(db.migrations)
+SYNC_METRICS = SyncMetrics()
+# Companies, buckets and question fields for request handlers, swapped whole
+# on catalog changes; loaded in the background on a worker's first request.
+# The bitmaps, search and question -> companies indexes below are built from
+# it rather than scanning the collections again.
+CATALOG_SNAPSHOT = CatalogSnapshot(COMPANIES, QUEST, CQ, CATALOG_STATE)
+# Solved sets as bitmaps over question ordinals: per-bucket membership is
+# rebuilt on catalog changes, per-user bitmaps are kept current by every
+# write to user_meta.solved.
+CATALOG_BITS = CatalogBitmaps(CATALOG_SNAPSHOT)
+SOLVED_BITS = SolvedBitmaps(db.user_bitmaps, USER_META, CATALOG_BITS)
+# Per-user solved/attempted counters, incremented by the same writes.
+USER_STATS = StatsCounters(db.user_stats, USER_META, CATALOG_BITS, SOLVED_BITS)
+# Listing rows with the question fields copied in (bucket_questions); the
+# old company_questions join is used until `python -m
+# backend.modules.bucket_view` has built it.
+BUCKET_QUESTIONS = db.bucket_questions
+BUCKET_VIEW = BucketView(BUCKET_QUESTIONS, CQ, CATALOG_STATE)
+# Title/slug search for suggestions and listing filters, reloaded on
+# catalog changes.
+SEARCH_INDEX = SearchIndex(CATALOG_SNAPSHOT)
+# question -> companies (with buckets and frequency) for the question page.
+COMPANY_INDEX = CompanyIndex(CATALOG_SNAPSHOT)
+# Serialized catalog endpoint bodies, ETagged by catalog version.
+CATALOG_RESPONSES = CatalogResponses(CATALOG_STATE)
+
+# Background jobs (admin import, tag backfill). "thread" runs them in this
+# process; "worker" only enqueues for `python -m backend.worker`.
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "thread").lower()
+JOBS = JobRunner(db.jobs, workers=int(os.getenv("JOB_WORKERS", 2)), logger=app.logger)
+
+# Optional write-behind for question meta writes: acknowledged before
+# user_meta is written, coalesced and flushed every META_FLUSH_MS ms or
+# META_FLUSH_OPS pending questions, and at shutdown. A crash loses at most
+# that window. The buffer only orders writes within this process, so it
+# needs the one web process that also runs the LeetCode syncs.
+META_WRITE_BEHIND = os.getenv("META_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+if META_WRITE_BEHIND and (
+    int(os.getenv("WORKERS", os.getenv("WEB_CONCURRENCY", "1"))) > 1 or JOBS_BACKEND != "thread"
+):
+    app.logger.warning(
+        "META_WRITE_BEHIND needs a single web process with JOBS_BACKEND=thread; writing user_meta directly"
+    )
+    META_WRITE_BEHIND = False
+META_BUFFER = (
+    MetaWriteBuffer(
+        USER_META,
+        META_IDS,
+        flush_ms=int(os.getenv("META_FLUSH_MS", 200)),
+        max_ops=int(os.getenv("META_FLUSH_OPS", 500)),
+        on_flush=lambda uid, inserted: _meta_flushed(uid, inserted),
+        logger=app.logger,
+    )
+    if META_WRITE_BEHIND
+    else None
+)
+
+# list_questions totals per (company, bucket, tag, search), dropped whenever
+# the catalog version changes.
+LIST_COUNTS = {}
+LIST_COUNTS_MAX = 4096
+
+# Computed stats: "memory" (per process, LRU), "mongo" (stats_cache
+# collection) or "redis" (REDIS_URL). Meta writes invalidate the user's
+# entry; use a shared backend when running several workers.
+STATS_CACHE = make_cache(
+    os.getenv("STATS_CACHE_BACKEND", "memory"),
+    ttl=float(os.getenv("STATS_CACHE_TTL", 300)),
+    coll=db.stats_cache,
+    max_entries=int(os.getenv("STATS_CACHE_SIZE", 10000)),
+    redis_url=os.getenv("REDIS_URL"),
+)
 
-# Cache for per-user statistics (simple in-memory)
-STATS_CACHE = {}
-STATS_TTL_SECONDS = 60
+
+@app.before_request
+def start_job_runner():
+    """
+    Start the in-process job runner, sync scheduler and meta write-behind
+    flusher, and begin loading the catalog snapshot, on the first request.
+    """
+    CATALOG_SNAPSHOT.warm()
+    if JOBS_BACKEND == "thread" and not JOBS.started:
+        JOBS.start()
+        SYNC.start(seed_from=_linked_user_ids)
+    if META_BUFFER is not None and not META_BUFFER.started:
+        META_BUFFER.start()
 
 
 @app.after_request
@@ -162,66 +364,33 @@ def serialize_user(user):
 
 
 # ─── LeetCode API endpoints & fetch helpers ───────────────────────────────
-PROB_API = "https://leetcode.com/api/problems/algorithms/"
-GRAPHQL_API = "https://leetcode.com/graphql"
-BROWSER_HEADERS = {
-    "User-Agent": "Mozilla/5.0",
-    "Accept": "application/json, text/html",
-    "Referer": "https://leetcode.com/",
-    "Origin": "https://leetcode.com",
-}
-GRAPHQL_HEADERS = {
-    "User-Agent": BROWSER_HEADERS["User-Agent"],
-    "Content-Type": "application/json",
-}
+# All LeetCode traffic goes through one pooled client: at most LEETCODE_RATE
+# requests/sec (bursts of LEETCODE_BURST), retries with backoff on 429/5xx,
+# and a circuit breaker. GraphQL batches hold LEETCODE_BATCH_SIZE questions.
+LEETCODE = LeetCodeClient(
+    batch_size=int(os.getenv("LEETCODE_BATCH_SIZE", 25)),
+    rate=float(os.getenv("LEETCODE_RATE", 5)),
+    burst=int(os.getenv("LEETCODE_BURST", 10)),
+    max_concurrency=int(os.getenv("LEETCODE_CONCURRENCY", 8)),
+)
+# Hints are interactive, so OpenRouter gets keep-alive and a single retry.
+OPENROUTER = HttpClient(timeout=10, retries=1, max_concurrency=4)
 
 
 def _fetch_solved_slugs_via_list(session_cookie: str) -> set[str]:
-    cookies = {"LEETCODE_SESSION": session_cookie}
     try:
-        resp = requests.get(
-            PROB_API, headers=BROWSER_HEADERS, cookies=cookies, timeout=10
-        )
-    except requests.RequestException as e:
+        resp = LEETCODE.problem_list(session_cookie)
+    except HTTPClientError as e:
         app.logger.error("Problems API request failed: %s", e)
         abort(502, description="Unable to contact LeetCode")
 
     try:
         resp.raise_for_status()
-    except requests.HTTPError as e:
+    except HTTPStatusError as e:
         app.logger.error("Problems API error %s: %s", resp.status_code, resp.text[:200])
         abort(502, description="Failed to fetch LeetCode problem list: " + str(e))
 
-    data = resp.json().get("stat_status_pairs", [])
-    return {p["stat"]["question__title_slug"] for p in data if p.get("status") == "ac"}
-
-
-def fetch_leetcode_tags(slug: str) -> list[str]:
-    query = """
-    query getQuestionDetail($titleSlug: String!) {
-      question(titleSlug: $titleSlug) {
-        topicTags {
-          name
-        }
-      }
-    }
-    """
-    payload = {"query": query, "variables": {"titleSlug": slug}}
-    try:
-        resp = requests.post(
-            GRAPHQL_API, headers=GRAPHQL_HEADERS, json=payload, timeout=10
-        )
-    except requests.RequestException as e:
-        app.logger.error("Tag request failed for %s: %s", slug, e)
-        abort(502, description="Unable to contact LeetCode")
-
-    try:
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        app.logger.warning("Failed to fetch tags for %s: %s", slug, e)
-        return []
-    tags = resp.json().get("data", {}).get("question", {}).get("topicTags", [])
-    return [t["name"] for t in tags]
+    return solved_from_problem_list(resp.json())
 
 
 def fetch_leetcode_content(slug: str) -> str:
@@ -232,50 +401,119 @@ def fetch_leetcode_content(slug: str) -> str:
       }
     }
     """
-    payload = {"query": query, "variables": {"titleSlug": slug}}
     try:
-        resp = requests.post(
-            GRAPHQL_API, headers=GRAPHQL_HEADERS, json=payload, timeout=10
-        )
-    except requests.RequestException as e:
+        resp = LEETCODE.graphql_response(query, {"titleSlug": slug})
+    except HTTPClientError as e:
         app.logger.error("Content request failed for %s: %s", slug, e)
         abort(502, description="Unable to contact LeetCode")
 
     try:
         resp.raise_for_status()
-    except requests.HTTPError as e:
+    except HTTPStatusError as e:
         app.logger.warning("Failed to fetch content for %s: %s", slug, e)
         return ""
     return resp.json().get("data", {}).get("question", {}).get("content", "")
 
 
+def fetch_leetcode_questions(slugs: list[str]) -> tuple[dict, int]:
+    """
+    Fetch tags and content for ``slugs`` with batched GraphQL requests, all
+    batches in flight at once (bounded by the client's concurrency and rate
+    limits). Returns ``(results, failed)`` where ``failed`` counts slugs
+    whose batch errored or that LeetCode did not return.
+    """
+    return LEETCODE.fetch_questions(slugs, return_failed=True)
+
+
+# Problem HTML is served from a local store; the live fetch above only runs
+# on a cold miss or as a background refresh once an entry is older than the TTL.
+CONTENT = ContentCache(
+    db.question_content,
+    fetch_leetcode_content,
+    ttl=timedelta(hours=int(os.getenv("CONTENT_TTL_HOURS", 168))),
+    logger=app.logger,
+)
+
+
 def sync_leetcode(username: str, session_cookie: str, user_id: str) -> int:
     solved_slugs = _fetch_solved_slugs_via_list(session_cookie)
+    return _mark_solved(user_id, solved_slugs)
 
-    slug_to_qid = {
-        q["link"].rstrip("/").split("/")[-1]: str(q["_id"])
-        for q in QUEST.find({}, {"_id": 1, "link": 1})
-    }
 
+def _mark_solved(user_id: str, solved_slugs: set[str]) -> int:
+    """
+    Mark the user's accepted problems solved, writing only those not in the
+    fingerprint of the previous sync. Returns how many catalog questions
+    the user has solved.
+    """
     from pymongo import UpdateOne
 
-    ops = []
-    for slug in solved_slugs:
-        qid = slug_to_qid.get(slug)
-        if not qid:
-            continue
-        ops.append(
-            UpdateOne(
-                {"user_id": user_id, "question_id": qid},
-                {"$set": {"solved": True}},
-                upsert=True,
-            )
-        )
+    solved = set(SLUG_INDEX.ids_for(solved_slugs).values())
+    new = solved - SYNC_STATE.previous(user_id)
+
+    if new:
+        if META_BUFFER is not None:
+            # Queue behind the user's own pending edits so a flush cannot
+            # overwrite a newer row with an older value; rows it inserts are
+            # counted when it flushes
+            now = datetime.utcnow()
+            for qid in sorted(new):
+                META_BUFFER.add(user_id, to_oid(qid), None, {"solved": True}, now)
+            inserted = 0
+        else:
+            ops = [
+                UpdateOne(
+                    {"user_id": user_id, "question_id": META_IDS.match(qid)},
+                    {"$set": {"solved": True, "question_id": to_oid(qid)}},
+                    upsert=True,
+                )
+                for qid in sorted(new)
+            ]
+            inserted = USER_META.bulk_write(ops).upserted_count
+        SYNC_STATE.record(user_id, solved)
+        flipped = SOLVED_BITS.update(user_id, new, True)
+        USER_STATS.apply(user_id, flipped, True, inserted=inserted)
+        invalidate_user_stats(user_id)
+    SYNC_METRICS.record(written=len(new), avoided=len(solved) - len(new))
+
+    return len(solved)
+
+
+def _scheduled_sync(user_id: str) -> int | None:
+    user = USERS.find_one(
+        {"_id": ObjectId(user_id)}, {"leetcode_username": 1, "leetcode_session": 1}
+    )
+    if not user or not (user.get("leetcode_username") and user.get("leetcode_session")):
+        return None
+    return sync_leetcode(user["leetcode_username"], user["leetcode_session"], user_id)
 
-    if ops:
-        USER_META.bulk_write(ops)
 
-    return len(ops)
+def _linked_user_ids():
+    cursor = USERS.find(
+        {"leetcode_username": {"$ne": None}, "leetcode_session": {"$ne": None}},
+        {"_id": 1},
+    )
+    return (str(u["_id"]) for u in cursor)
+
+
+# Login, manual and periodic LeetCode syncs all go through one queue
+# (sync_queue); see modules/sync_scheduler.py. SYNC_SHARD_IDS limits this
+# process to part of the SYNC_SHARDS user shards.
+_sync_interval = float(os.getenv("SYNC_INTERVAL_HOURS", 24))
+SYNC = SyncScheduler(
+    db.sync_queue,
+    _scheduled_sync,
+    shards=int(os.getenv("SYNC_SHARDS", 1)),
+    shard_ids=[int(x) for x in os.getenv("SYNC_SHARD_IDS", "").split(",") if x.strip()],
+    workers=int(os.getenv("SYNC_WORKERS", 2)),
+    max_running=int(os.getenv("SYNC_MAX_RUNNING", 4)),
+    interval=timedelta(hours=_sync_interval) if _sync_interval > 0 else None,
+    logger=app.logger,
+)
+# A manual sync request waits this long for its result before answering 202
+# (the sync carries on in the background); kept short so it does not hold
+# a web worker.
+SYNC_WAIT_SECONDS = float(os.getenv("SYNC_WAIT_SECONDS", 3))
 
 
 # =============================================================================
@@ -374,18 +612,8 @@ def login():
     resp = jsonify({"msg": "Login successful"})
     set_access_cookies(resp, token)
 
-    def _bg_sync(u, s, uid):
-        try:
-            sync_leetcode(u, s, uid)
-        except Exception as e:
-            app.logger.warning("Background sync failed for %s: %s", uid, e)
-
-    uname = user.get("leetcode_username")
-    sc = user.get("leetcode_session")
-    if uname and sc:
-        threading.Thread(
-            target=_bg_sync, args=(uname, sc, str(user["_id"])), daemon=True
-        ).start()
+    if user.get("leetcode_username") and user.get("leetcode_session"):
+        SYNC.request(str(user["_id"]), PRIORITY_LOGIN)
 
     return resp, 200
 
@@ -547,11 +775,16 @@ def manual_leetcode_sync():
     ):
         abort(400, description="Username & sessionCookie must be set first")
 
-    synced = sync_leetcode(
-        user["leetcode_username"], user["leetcode_session"], str(uid)
-    )
+    # Queued ahead of login/periodic syncs; wait briefly for the result so
+    # the client still gets the count in the common case.
+    requested_at = SYNC.request(str(uid), PRIORITY_MANUAL)
+    done = SYNC.wait(str(uid), requested_at, timeout=SYNC_WAIT_SECONDS)
+    if done is None:
+        return jsonify({"synced": None, "queued": True}), 202
+    if done.get("lastError"):
+        abort(502, description=done["lastError"])
 
-    return jsonify({"synced": synced}), 200
+    return jsonify({"synced": done["lastResult"]}), 200
 
 
 # ─── Update per‐user color settings ────────────────────────────────────────
@@ -749,6 +982,8 @@ def import_questions():
           frequency (optional), acceptanceRate (optional)
       • If a company already exists we *append* new questions;
         otherwise we create the company on the fly.
+      • The file is streamed in chunks, so memory use does not grow with
+        its size.
     """
     # 1) Authorize ─────────────────────────────────────────────────────────
     uid = get_jwt_identity()
@@ -764,94 +999,82 @@ def import_questions():
         abort(400, description="No file selected")
 
     ext = up_file.filename.rsplit(".", 1)[-1].lower()
+    if ext not in ("csv", "xlsx", "xls"):
+        abort(400, description="Unsupported file type; only CSV/Excel")
+
+    # 2) Validate the header now; rows are processed by a background job
     try:
-        if ext == "csv":
-            df = pd.read_csv(up_file.stream)
-        elif ext in ("xlsx", "xls"):
-            # Must read the raw bytes first; BytesIO lets pandas parse it
-            df = pd.read_excel(BytesIO(up_file.read()), engine="openpyxl")
-        else:
-            abort(400, description="Unsupported file type; only CSV/Excel")
+        columns, est_rows = inspect_upload(up_file.stream, ext)
     except (EmptyDataError, pd.errors.ParserError) as e:
         abort(400, description=f"Could not parse file: {e}")
 
-    if df.empty:
-        abort(400, description="Uploaded file contained no rows")
-
-    # ── Normalize column names: strip & lower for lookup convenience ──────
-    df.columns = [c.strip().lower() for c in df.columns]
-
     required_cols = {"title", "link", "company", "bucket"}
-    if not required_cols.issubset(set(df.columns)):
-        missing = required_cols - set(df.columns)
+    if not required_cols.issubset(columns):
+        missing = required_cols - columns
         abort(400, description=f"Missing required columns: {missing}")
+    if est_rows == 0:
+        abort(400, description="Uploaded file contained no rows")
 
-    imported, skipped = 0, 0
-
-    for _, row in df.iterrows():
-        title = str(row.get("title") or "").strip()
-        link = str(row.get("link") or row.get("url") or "").strip()
-        company = str(row.get("company") or "").strip()
-        bucket = str(row.get("bucket") or "").strip()  # e.g. “30Days”, “3Months”, etc.
+    file_id = FS.put(
+        up_file.stream,
+        filename=f"import-{uid}.{ext}",
+        content_type=up_file.content_type,
+    )
+    job_id = JOBS.submit(
+        "import", {"file_id": str(file_id), "ext": ext, "user_id": uid}, total=est_rows
+    )
+    return jsonify({"jobId": job_id, "status": "queued"}), 202
 
-        if not (title and link and company and bucket):
-            skipped += 1
-            continue  # malformed row
 
-        try:
-            freq = float(row.get("frequency") or 0)
-        except (ValueError, TypeError):
-            freq = 0.0
+def _drop_import_upload(params):
+    # Also run when the job fails for good, so failed uploads don't pile up
+    FS.delete(ObjectId(params["file_id"]))
 
-        try:
-            acc = float(row.get("acceptancerate") or 0)
-        except (ValueError, TypeError):
-            acc = 0.0
 
-        ldiff = str(row.get("difficulty") or "").capitalize().strip()
+@job_handler("import", on_failure=_drop_import_upload)
+def _run_import_job(ctx):
+    """
+    Stream the stored upload in bounded chunks; each chunk is deduplicated
+    and written with one batched lookup per collection and one bulk_write.
+    Checkpoint: number of chunks already written.
+    """
+    file_id = ObjectId(ctx.params["file_id"])
+    ext = ctx.params["ext"]
+    done = (ctx.checkpoint or {}).get("chunks", 0)
+    company_cache = {}
+    # A resumed run may follow chunks an earlier attempt wrote but never
+    # published
+    changed = done > 0
 
-        # 2) Upsert canonical question ───────────────────────────────────
-        q_doc = QUEST.find_one_and_update(
-            {"link": link},
-            {
-                "$setOnInsert": {
-                    "link": link,
-                    "title": title,
-                    "leetDifficulty": ldiff or None,
-                }
-            },
-            upsert=True,
-            return_document=True,
-        )
-        qid = q_doc["_id"]
-
-        # 3) Fetch (or insert) company ────────────────────────────────────
-        c_doc = COMPANIES.find_one_and_update(
-            {"name": company},
-            {"$setOnInsert": {"name": company}},
-            upsert=True,
-            return_document=True,
-        )
-        cid = c_doc["_id"]
+    try:
+        for i, chunk in enumerate(iter_upload_chunks(FS.get(file_id), ext)):
+            if i < done:
+                continue  # written before a restart
+            rows, bad = normalize_import_frame(chunk)
+            if not rows.empty:
+                # Questions and companies are resolved once per distinct key
+                rows["question_id"] = resolve_question_ids(QUEST, rows)
+                co_ids = resolve_company_ids(COMPANIES, rows["company"].unique(), company_cache)
+                rows["company_id"] = rows["company"].map(co_ids)
+                docs = company_question_docs(rows)
+                write_company_questions(CQ, docs, chunk_size=len(docs))
+                write_view_rows(BUCKET_QUESTIONS, QUEST, docs, chunk_size=len(docs))
+                changed = True
+            ctx.progress(processed=len(rows), failed=bad, checkpoint={"chunks": i + 1})
+    finally:
+        if changed:
+            # Once per job, not per chunk: every bump makes each worker
+            # rebuild its catalog indexes
+            assign_ordinals(QUEST, CATALOG_STATE)
+            bump_catalog_version(CATALOG_STATE)
+
+    _drop_import_upload(ctx.params)
 
-        # 4) Upsert join row (company × bucket × question) ───────────────
-        CQ.replace_one(
-            {"company_id": cid, "question_id": qid, "bucket": bucket},
-            {
-                "company_id": cid,
-                "question_id": qid,
-                "bucket": bucket,
-                "frequency": freq,
-                "acceptanceRate": acc,
-            },
-            upsert=True,
-        )
-        imported += 1
 
-    return jsonify({"imported": imported, "skipped": skipped}), 201
+# ─── Admin-only: backfill tags for existing questions ─────────────────────
+BACKFILL_PAGE = 100
 
 
-# ─── Admin-only: backfill tags for existing questions ─────────────────────
 @app.route("/api/admin/backfill-tags", methods=["POST"])
 @jwt_required()
 def backfill_tags():
@@ -860,237 +1083,388 @@ def backfill_tags():
     if user.get("role") != "admin":
         abort(403, description="Only admin can run backfill")
 
-    cursor = QUEST.find({}, {"link": 1})
-    slugs = [(q["_id"], q["link"].rstrip("/").split("/")[-1]) for q in cursor]
+    job_id = JOBS.submit("backfill-tags", {"user_id": uid})
+    return jsonify({"jobId": job_id, "status": "queued"}), 202
 
-    with ThreadPoolExecutor(max_workers=5) as pool:
-        future_to_id = {
-            pool.submit(fetch_leetcode_tags, slug): qid for qid, slug in slugs
-        }
-        for fut in concurrent.futures.as_completed(future_to_id):
-            qid = future_to_id[fut]
-            try:
-                tags = fut.result()
-            except Exception as e:
-                app.logger.warning("Failed to backfill tags for %s: %s", qid, e)
-                tags = []
-            QUEST.update_one({"_id": qid}, {"$set": {"tags": tags}})
 
-    return jsonify({"msg": "Backfill complete"}), 200
+@job_handler("backfill-tags")
+def _run_backfill_job(ctx):
+    """
+    Fetch tags (and content) for every question in _id order, one page of
+    batched GraphQL requests at a time, and write each page with one
+    bulk_write. Checkpoint: the last question _id whose page was written.
+    """
+    from pymongo import UpdateOne
+
+    if ctx.total is None:
+        ctx.set_total(QUEST.count_documents({}))
+
+    last_id = ctx.checkpoint
+    # A resumed run may follow pages an earlier attempt wrote but never
+    # published
+    changed = last_id is not None
+    try:
+        while True:
+            query = {"_id": {"$gt": ObjectId(last_id)}} if last_id else {}
+            page = list(QUEST.find(query, {"link": 1}).sort("_id", 1).limit(BACKFILL_PAGE))
+            if not page:
+                return
+            slug_to_id = {q["link"].rstrip("/").split("/")[-1]: q["_id"] for q in page}
+
+            results, failed = fetch_leetcode_questions(list(slug_to_id))
+            ops = [
+                UpdateOne({"_id": slug_to_id[slug]}, {"$set": {"tags": r["tags"]}})
+                for slug, r in results.items()
+            ]
+            if ops:
+                QUEST.bulk_write(ops, ordered=False)
+                refresh_questions(BUCKET_QUESTIONS, QUEST, [slug_to_id[slug] for slug in results])
+                changed = True
+            # The same response carries the problem HTML; keep the store warm
+            CONTENT.store_many({slug: r["content"] for slug, r in results.items()})
+
+            last_id = str(page[-1]["_id"])
+            ctx.progress(processed=len(ops), failed=failed, checkpoint=last_id)
+    finally:
+        if changed:
+            # Tags feed the indexes and tag-filtered listing totals; bump
+            # once per job, since every bump rebuilds them in each worker
+            bump_catalog_version(CATALOG_STATE)
+
+
+# ─── Admin-only: prefetch problem content into the local store ────────────
+@app.route("/api/admin/prefetch-content", methods=["POST"])
+@jwt_required()
+def prefetch_content():
+    uid = get_jwt_identity()
+    user = USERS.find_one({"_id": ObjectId(uid)})
+    if user.get("role") != "admin":
+        abort(403, description="Only admin can prefetch content")
+
+    force = bool((request.get_json(silent=True) or {}).get("force"))
+    job_id = JOBS.submit("prefetch-content", {"user_id": uid, "force": force})
+    return jsonify({"jobId": job_id, "status": "queued"}), 202
+
+
+@job_handler("prefetch-content")
+def _run_prefetch_job(ctx):
+    """
+    Fill question_content for every question, skipping entries that are
+    still fresh unless ``force`` is set. Checkpoint: last question _id.
+    """
+    if ctx.total is None:
+        ctx.set_total(QUEST.count_documents({}))
+    force = ctx.params.get("force", False)
+
+    last_id = ctx.checkpoint
+    while True:
+        query = {"_id": {"$gt": ObjectId(last_id)}} if last_id else {}
+        page = list(QUEST.find(query, {"link": 1}).sort("_id", 1).limit(BACKFILL_PAGE))
+        if not page:
+            return
+        slugs = [q["link"].rstrip("/").split("/")[-1] for q in page]
+        fresh = set() if force else CONTENT.fresh_slugs(slugs)
+        todo = [s for s in slugs if s not in fresh]
+
+        results, failed = fetch_leetcode_questions(todo) if todo else ({}, 0)
+        CONTENT.store_many({slug: r["content"] for slug, r in results.items()})
+
+        last_id = str(page[-1]["_id"])
+        ctx.progress(processed=len(page) - failed, failed=failed, checkpoint=last_id)
+
+
+# ─── Admin-only: recompute per-user stats counters ────────────────────────
+RECONCILE_PAGE = 500
+
+
+@app.route("/api/admin/reconcile-stats", methods=["POST"])
+@jwt_required()
+def reconcile_stats():
+    uid = get_jwt_identity()
+    user = USERS.find_one({"_id": ObjectId(uid)})
+    if not user or user.get("role") != "admin":
+        abort(403, description="Only admin can reconcile stats")
+
+    job_id = JOBS.submit("reconcile-stats", {"user_id": uid})
+    return jsonify({"jobId": job_id, "status": "queued"}), 202
+
+
+@job_handler("reconcile-stats")
+def _run_reconcile_stats_job(ctx):
+    """
+    Rebuild every user's solved bitmap and user_stats document from
+    user_meta in _id order. The job result counts drifted users and
+    counters; each drift is logged. Checkpoint: the last user _id reconciled.
+    """
+    if ctx.total is None:
+        ctx.set_total(USERS.count_documents({}))
+
+    last_id = ctx.checkpoint
+    while True:
+        query = {"_id": {"$gt": ObjectId(last_id)}} if last_id else {}
+        page = list(USERS.find(query, {"_id": 1}).sort("_id", 1).limit(RECONCILE_PAGE))
+        if not page:
+            return
+        drifted = counters = 0
+        for u in page:
+            # Rebuild the solved bitmap from user_meta too; after a crash in
+            # write-behind mode it may hold writes that never got flushed
+            SOLVED_BITS.reset(str(u["_id"]))
+            drift = USER_STATS.reconcile(str(u["_id"]))
+            if drift:
+                app.logger.warning("user_stats drift for %s: %s", u["_id"], drift)
+                drifted += 1
+                counters += len(drift)
+                invalidate_user_stats(str(u["_id"]))
+
+        last_id = str(page[-1]["_id"])
+        ctx.progress(
+            processed=len(page),
+            checkpoint=last_id,
+            counts={"driftedUsers": drifted, "driftedCounters": counters},
+        )
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+@jwt_required()
+def job_status(job_id):
+    """Progress of a background job: counts, throughput (items/sec) and ETA."""
+    uid = get_jwt_identity()
+    user = USERS.find_one({"_id": ObjectId(uid)})
+    if not user or user.get("role") != "admin":
+        abort(403, description="Only admin can view jobs")
+
+    doc = JOBS.get(job_id)
+    if not doc:
+        abort(404, description=f"Job '{job_id}' not found")
+    return jsonify(describe_job(doc)), 200
+
+
+@app.route("/api/admin/sync-metrics", methods=["GET"])
+@jwt_required()
+def sync_metrics():
+    """LeetCode sync counters for this process, including writes avoided."""
+    uid = get_jwt_identity()
+    user = USERS.find_one({"_id": ObjectId(uid)})
+    if not user or user.get("role") != "admin":
+        abort(403, description="Only admin can view sync metrics")
+    return jsonify(SYNC_METRICS.snapshot()), 200
 
 
 # =============================================================================
 # Public listings & per-user metadata
 # =============================================================================
+def _catalog_response(key, build, sources=()):
+    """
+    JSON response for data that only changes with the catalog, ETagged by
+    the catalog version. A matching If-None-Match gets a 304 before
+    ``build`` runs; bodies are cached per version (see CATALOG_RESPONSES).
+    A body read from an index still catching up goes out without an ETag.
+    """
+    etag = CATALOG_RESPONSES.etag
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+    else:
+        etag, body = CATALOG_RESPONSES.get(key, lambda: app.json.response(build()).get_data(), sources)
+        resp = app.response_class(body, mimetype="application/json")
+    if etag is not None:
+        resp.set_etag(etag)
+    # Per-user auth: browsers may keep it, but must revalidate every time
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
 @app.route("/api/companies", methods=["GET"])
 @jwt_required()
 def list_companies():
-    return jsonify(COMPANIES.distinct("name")), 200
+    return _catalog_response(("companies",), CATALOG_SNAPSHOT.company_names, sources=(CATALOG_SNAPSHOT,))
 
 
 @app.route("/api/companies/<company>/buckets", methods=["GET"])
 @jwt_required()
 def list_buckets(company):
-    co = COMPANIES.find_one({"name": company})
-    if not co:
-        abort(404, description=f"No company '{company}'")
-    return jsonify(CQ.distinct("bucket", {"company_id": co["_id"]})), 200
+    return _catalog_response(
+        ("buckets", company),
+        lambda: CATALOG_SNAPSHOT.buckets(_company_or_404(company)),
+        sources=(CATALOG_SNAPSHOT,),
+    )
 
 
 @app.route("/api/companies/<company>/topics", methods=["GET"])
 @jwt_required()
 def get_company_topics(company):
-    co = COMPANIES.find_one({"name": company})
-    if not co:
-        abort(404, description=f"No company '{company}'")
-
     bucket = request.args.get("bucket", "All")
     unsolved = request.args.get("unsolved", "false").lower() == "true"
     uid = get_jwt_identity()
 
-    match = {"company_id": co["_id"]}
-    # When "All" bucket is requested, restrict to the actual "All" bucket
-    # document instead of every bucket to avoid duplicates.
-    # The CSV/Excel dataset already contains a pre-made "All" bucket with
-    # unique questions, so querying all buckets would return duplicates.
-    if bucket != "All":
-        match["bucket"] = bucket
-    else:
-        match["bucket"] = "All"
+    def build():
+        co_id = _company_or_404(company)
+
+        # When "All" bucket is requested, use the actual "All" bucket instead of
+        # every bucket to avoid duplicates: the CSV/Excel dataset already
+        # contains a pre-made "All" bucket with unique questions.
+        # Histograms are precomputed per bucket and rebuilt on catalog changes.
+        histogram = CATALOG_BITS.tag_histogram(co_id, bucket)
+        if unsolved:
+            remaining = difference(CATALOG_BITS.bucket(co_id, bucket), SOLVED_BITS.get(uid))
+            tag_bits = CATALOG_BITS.tags()
+            counts = (
+                (tag, popcount(intersect(remaining, tag_bits[tag])))
+                for tag, _ in histogram
+                if tag in tag_bits
+            )
+            histogram = sorted((tc for tc in counts if tc[1]), key=lambda tc: (-tc[1], tc[0]))
 
-    pipeline = [
-        {"$match": match},
-        # Deduplicate questions in case multiple company_question documents
-        # exist for the same question ID and bucket.
-        {"$group": {"_id": "$question_id"}},
-        {"$set": {"question_id": "$_id"}},
-        {
-            "$lookup": {
-                "from": "questions",
-                "localField": "question_id",
-                "foreignField": "_id",
-                "as": "q",
-            }
-        },
-        {"$unwind": "$q"},
-    ]
+        return {"data": [{"tag": tag, "count": count} for tag, count in histogram]}
 
     if unsolved:
-        pipeline += [
-            {
-                "$lookup": {
-                    "from": "user_meta",
-                    "let": {"qid": "$question_id"},
-                    "pipeline": [
-                        {
-                            "$match": {
-                                "$expr": {
-                                    "$and": [
-                                        {
-                                            "$eq": [
-                                                "$question_id",
-                                                {"$toString": "$$qid"},
-                                            ]
-                                        },
-                                        {"$eq": ["$user_id", uid]},
-                                    ]
-                                }
-                            }
-                        },
-                        {"$project": {"solved": 1}},
-                    ],
-                    "as": "meta",
-                }
-            },
-            {"$match": {"$or": [{"meta": {"$eq": []}}, {"meta.0.solved": False}]}},
-        ]
+        # Depends on the user's progress, not just the catalog
+        return jsonify(build()), 200
+    return _catalog_response(("topics", company, bucket), build, sources=(CATALOG_BITS, CATALOG_SNAPSHOT))
 
-    pipeline += [
-        {"$unwind": "$q.tags"},
-        {"$group": {"_id": "$q.tags", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-    ]
 
-    results = list(CQ.aggregate(pipeline))
-    topics = [{"tag": r["_id"], "count": r["count"]} for r in results]
-    return jsonify({"data": topics}), 200
+def _cached_list_count(key) -> int | None:
+    if key is None:
+        return None
+    CATALOG_BITS.refresh()
+    return LIST_COUNTS.get((CATALOG_BITS.version, *key))
+
+
+def _store_list_count(key, total: int) -> None:
+    if key is None:
+        return
+    version = CATALOG_BITS.version
+    # Another request may clear the dict between a truthiness check and
+    # reading its first key, so read the key with a default instead
+    first = next(iter(LIST_COUNTS), None)
+    if first is not None and (len(LIST_COUNTS) >= LIST_COUNTS_MAX or first[0] != version):
+        LIST_COUNTS.clear()
+    LIST_COUNTS[(version, *key)] = total
 
 
 @app.route("/api/companies/<company>/buckets/<bucket>/questions", methods=["GET"])
 @jwt_required()
 def list_questions(company, bucket):
-    co = COMPANIES.find_one({"name": company})
-    if not co:
-        abort(404, description=f"No company '{company}'")
+    co_id = _company_or_404(company)
 
     page = int(request.args.get("page", 1))
     limit = int(request.args.get("limit", 50))
     skip = (page - 1) * limit
+    # Keyset mode: `cursor` is the previous response's nextCursor; page is ignored
+    cursor = request.args.get("cursor")
     search = request.args.get("search")
-    if search:
-        if len(search) > 100:
-            abort(400, description="Search query too long")
-        search = re.escape(search)
+    if search and len(search) > 100:
+        abort(400, description="Search query too long")
     sortField = request.args.get("sortField")
     sortOrder = request.args.get("sortOrder", "asc")
     tag_filter = request.args.get("tag")
     showUnsolved = request.args.get("showUnsolved", "false").lower() == "true"
 
-    match = {"company_id": co["_id"]}
+    match = {"company_id": co_id}
     # Show the dedicated "All" bucket instead of combining all buckets to
     # avoid duplicates when viewing "All" questions for a company.
     if bucket != "All":
         match["bucket"] = bucket
     else:
         match["bucket"] = "All"
-
-    pipeline = [
-        {"$match": match},
-        # Group by question to avoid duplicates if multiple rows exist
-        {
-            "$group": {
-                "_id": "$question_id",
-                "frequency": {"$max": "$frequency"},
-                "acceptanceRate": {"$max": "$acceptanceRate"},
-            }
-        },
-        {"$set": {"question_id": "$_id"}},
-        {
-            "$lookup": {
-                "from": "questions",
-                "localField": "question_id",
-                "foreignField": "_id",
-                "as": "q",
-            }
-        },
-        {"$unwind": "$q"},
-    ]
-
-    if tag_filter:
-        pipeline.append({"$match": {"q.tags": tag_filter}})
-
+    uid = get_jwt_identity()
+    # Filter before paginating so pages stay full and the total is right
+    if showUnsolved:
+        members = CATALOG_BITS.bucket(co_id, match["bucket"])
+        match["question_id"] = {"$in": CATALOG_BITS.ids(difference(members, SOLVED_BITS.get(uid)))}
     if search:
-        pipeline.append({"$match": {"q.title": {"$regex": search, "$options": "i"}}})
+        found = SEARCH_INDEX.matching_ids(search)
+        if showUnsolved:
+            keep = set(match["question_id"]["$in"])
+            found = [qid for qid in found if qid in keep]
+        match["question_id"] = {"$in": found}
+
+    source, pipeline = BUCKET_VIEW.rows(match, tag_filter)
 
     fmap = {
-        "title": "q.title",
+        "title": "title",
         "frequency": "frequency",
         "acceptanceRate": "acceptanceRate",
-        "leetDifficulty": "q.leetDifficulty",
+        "leetDifficulty": "leetDifficulty",
     }
     if sortField in fmap:
-        pipeline.append({"$sort": {fmap[sortField]: 1 if sortOrder == "asc" else -1}})
+        sort_key, direction = fmap[sortField], 1 if sortOrder == "asc" else -1
     else:
-        pipeline.append({"$sort": {"q.title": 1}})
-
-    total_count = list(CQ.aggregate(pipeline + [{"$count": "c"}]))
-    total = total_count[0]["c"] if total_count else 0
-
-    pipeline += [{"$skip": skip}, {"$limit": limit}]
-
-    results = list(CQ.aggregate(pipeline))
-
-    uid = get_jwt_identity()
-    qids = [str(r["q"]["_id"]) for r in results]
+        sort_key, direction = "title", 1
+    # question_id breaks ties so pages never overlap and cursors are exact;
+    # the view has a (company_id, bucket, field, question_id) index per field
+    sort = {"$sort": {sort_key: direction, "question_id": direction}}
+
+    # Totals don't depend on the page; cache them per filter until the
+    # catalog changes (showUnsolved totals are per user and not cached).
+    count_key = None if showUnsolved else (co_id, match["bucket"], tag_filter, search)
+    total = _cached_list_count(count_key)
+
+    page_stages = [sort]
+    if cursor:
+        try:
+            after_value, after_id = decode_cursor(cursor, sort_key)
+        except InvalidCursor as e:
+            abort(400, description=f"Invalid cursor: {e}")
+        page_stages = [{"$match": keyset_match(sort_key, direction, after_value, after_id, "question_id")}, sort]
+    elif skip:
+        page_stages.append({"$skip": skip})
+    # One extra row tells whether there is a next page
+    page_stages.append({"$limit": limit + 1})
+
+    if total is None:
+        # Counted on its own: a $facet beside the page could not use an index
+        total = BUCKET_VIEW.count(match, tag_filter)
+        _store_list_count(count_key, total)
+    results = list(source.aggregate(pipeline + page_stages))
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = encode_cursor(sort_key, value_at(last, sort_key), last["question_id"])
+
+    qids = [r["question_id"] for r in results]
 
     meta_generic = {
-        m["question_id"]: m
-        for m in USER_META.find({"user_id": uid, "question_id": {"$in": qids}})
+        str(m["question_id"]): m
+        for m in USER_META.find({"user_id": uid, "question_id": META_IDS.match_many(qids)})
     }
 
     meta_filter = {
         "user_id": uid,
-        "company_id": co["_id"],
-        "question_id": {"$in": qids},
+        "company_id": co_id,
+        "question_id": META_IDS.match_many(qids),
     }
     if bucket != "All":
         meta_filter["bucket"] = bucket
-    meta_specific = {m["question_id"]: m for m in USER_META.find(meta_filter)}
+    meta_specific = {str(m["question_id"]): m for m in USER_META.find(meta_filter)}
+    # The user's own writes still waiting in the write-behind buffer
+    pending = META_BUFFER.pending(uid, qids) if META_BUFFER is not None else {}
 
     out = []
     for doc in results:
-        q = doc["q"]
-        qid_str = str(q["_id"])
+        qid_str = str(doc["question_id"])
         meta = meta_specific.get(qid_str) or meta_generic.get(qid_str)
+        if qid_str in pending:
+            meta = (meta or {}) | pending[qid_str]
         solved = meta.get("solved", False) if meta else False
-        if showUnsolved and solved:
-            continue
 
         out.append(
             {
                 "id": qid_str,
-                "title": q["title"],
-                "link": q["link"],
+                "title": doc["title"],
+                "link": doc["link"],
                 "frequency": doc.get("frequency"),
                 "acceptanceRate": doc.get("acceptanceRate"),
-                "leetDifficulty": q.get("leetDifficulty"),
+                "leetDifficulty": doc.get("leetDifficulty"),
                 "solved": solved,
                 "userDifficulty": meta.get("userDifficulty") if meta else None,
                 "note": meta.get("note") if meta else None,
             }
         )
 
-    return jsonify({"data": out, "total": total}), 200
+    return jsonify({"data": out, "total": total, "nextCursor": next_cursor}), 200
 
 
 @app.route("/api/questions/<question_id>", methods=["GET"])
@@ -1101,15 +1475,16 @@ def get_question(question_id):
     except InvalidId:
         abort(400, description=f"Invalid question ID '{question_id}'")
 
-    q = QUEST.find_one({"_id": q_oid})
+    q = _question_doc(q_oid)
     if not q:
         abort(404, description=f"Question '{question_id}' not found")
 
     slug = q["link"].rstrip("/").split("/")[-1]
-    content = fetch_leetcode_content(slug)
-    meta = USER_META.find_one(
-        {"user_id": get_jwt_identity(), "question_id": question_id}
-    )
+    content = CONTENT.get(slug)
+    uid = get_jwt_identity()
+    meta = USER_META.find_one({"user_id": uid, "question_id": META_IDS.match(q_oid)})
+    if META_BUFFER is not None:
+        meta = (meta or {}) | META_BUFFER.pending(uid, [q_oid]).get(str(q_oid), {})
     resp = {
         "id": str(q["_id"]),
         "title": q.get("title"),
@@ -1122,6 +1497,76 @@ def get_question(question_id):
     return jsonify(resp), 200
 
 
+def _question_exists(q_oid: ObjectId) -> bool:
+    """Catalog membership from the in-memory ordinal map; the DB only settles misses."""
+    if CATALOG_BITS.ordinal(q_oid) is not None:
+        return True
+    return QUEST.find_one({"_id": q_oid}, {"_id": 1}) is not None
+
+
+def _company_id(name: str):
+    """``_id`` of the named company, or None; the DB only settles snapshot misses."""
+    co_id = CATALOG_SNAPSHOT.company_id(name)
+    if co_id is None:
+        co = COMPANIES.find_one({"name": name}, {"_id": 1})
+        co_id = co["_id"] if co else None
+    return co_id
+
+
+def _company_or_404(name: str):
+    co_id = _company_id(name)
+    if co_id is None:
+        abort(404, description=f"No company '{name}'")
+    return co_id
+
+
+def _question_doc(q_oid: ObjectId) -> dict | None:
+    """The question's catalog fields, from the snapshot unless it lacks them."""
+    info = CATALOG_SNAPSHOT.question(q_oid)
+    if info is not None:
+        return info.as_doc()
+    return QUEST.find_one({"_id": q_oid})
+
+
+# Questions per read + bulk_write in a meta update
+BATCH_META_CHUNK = 500
+
+
+def _write_meta(uid: str, oids: list, update_fields: dict, company_id, bucket) -> tuple[dict, int]:
+    """
+    Apply a meta update to the user's rows for ``oids``: the bucket row (or
+    the generic row without a company) gets every field, the question's
+    other rows the shared ones. Goes through META_BUFFER when write-behind
+    is on. Returns ``{str(oid): target row after the update}`` and how many
+    rows the update inserted (0 when buffered).
+    """
+    fields = {k: update_fields[k] for k in SHARED_FIELDS if k in update_fields}
+    write = ((company_id, bucket) if company_id else None, fields, update_fields["updatedAt"])
+    current, inserted = {}, 0
+    for part in _chunks(oids, BATCH_META_CHUNK):
+        # One read of the user's rows for the chunk gives each target row,
+        # the seed for new bucket rows and the other rows to keep in step
+        rows = {}
+        for m in USER_META.find({"user_id": uid, "question_id": META_IDS.match_many(part)}, ROW_FIELDS):
+            rows.setdefault(str(m["question_id"]), []).append(m)
+
+        ops = []
+        for oid in part:
+            state = rows.get(str(oid), [])
+            if META_BUFFER is not None:
+                # Replay what is still buffered so the response reflects the
+                # user's earlier writes; inserted rows are counted on flush
+                row_ops(uid, oid, None, META_BUFFER.writes(uid, oid) + [write], state)
+                META_BUFFER.add(uid, oid, *write)
+            else:
+                ops += row_ops(uid, oid, META_IDS.match(oid), [write], state)[0]
+            current[str(oid)] = target_row(state, write[0])
+        # Each question's ops touch only its own rows, so order does not matter
+        if ops:
+            inserted += USER_META.bulk_write(ops, ordered=False).upserted_count
+    return current, inserted
+
+
 @app.route("/api/questions/<question_id>", methods=["PATCH"])
 @jwt_required()
 def update_question_meta(question_id):
@@ -1132,7 +1577,7 @@ def update_question_meta(question_id):
     except InvalidId:
         abort(400, description=f"Invalid question ID '{question_id}'")
 
-    if not QUEST.find_one({"_id": q_oid}):
+    if not _question_exists(q_oid):
         abort(404, description=f"Question '{question_id}' not found")
 
     data = request.get_json() or {}
@@ -1142,10 +1587,9 @@ def update_question_meta(question_id):
     bucket = data.get("bucket")
     company_id = None
     if company_name and bucket:
-        co = COMPANIES.find_one({"name": company_name})
-        if not co:
+        company_id = _company_id(company_name)
+        if company_id is None:
             abort(404, description=f"No company '{company_name}'")
-        company_id = co["_id"]
 
     if "solved" in data:
         update_fields["solved"] = bool(data["solved"])
@@ -1161,58 +1605,16 @@ def update_question_meta(question_id):
 
     update_fields["updatedAt"] = datetime.utcnow()
 
-    query = {"user_id": uid, "question_id": question_id}
-    if company_id:
-        query_specific = query | {"company_id": company_id, "bucket": bucket}
-    else:
-        query_specific = query
-
-
-    set_on_insert = {}
-    if company_id and "solved" not in update_fields:
-        existing = USER_META.find_one(query_specific, {"solved": 1})
-        if not existing:
-            generic = USER_META.find_one(query, {"solved": 1}) or {}
-            if "solved" in generic:
-                set_on_insert["solved"] = generic["solved"]
-
-    update_doc = {
-        "$set": update_fields | ({"company_id": company_id, "bucket": bucket} if company_id else {})
-    }
-    if set_on_insert:
-        update_doc["$setOnInsert"] = set_on_insert
-
-    meta = USER_META.find_one_and_update(
-        query_specific,
-        update_doc,
-        upsert=True,
-        return_document=True,
-    )
-    # Ensure a generic record exists and update all other bucket records
-    generic_update = {
-        "$set": {
-            k: update_fields[k]
-            for k in ["solved", "userDifficulty", "note"]
-            if k in update_fields
-        }
-    }
-    USER_META.update_one(query, generic_update, upsert=True)
-
-    USER_META.update_many(
-        (
-            {
-                **query,
-                "$or": [
-                    {"company_id": {"$ne": company_id}},
-                    {"bucket": {"$ne": bucket}},
-                ],
-            }
-            if company_id
-            else {**query, "company_id": {"$exists": True}}
-        ),
-        generic_update,
-    )
+    current, inserted = _write_meta(uid, [q_oid], update_fields, company_id, bucket)
+    if update_fields.get("solved") is False:
+        SYNC_STATE.forget(uid, [str(q_oid)])
+    flipped = []
+    if "solved" in update_fields:
+        flipped = SOLVED_BITS.update(uid, [q_oid], update_fields["solved"])
+    USER_STATS.apply(uid, flipped, update_fields.get("solved", True), inserted=inserted)
+    invalidate_user_stats(uid)
 
+    meta = current[str(q_oid)]
     resp = {
         "question_id": question_id,
         "solved": meta.get("solved", False),
@@ -1230,6 +1632,10 @@ def batch_update_questions_meta():
     ids = data.get("ids")
     if not isinstance(ids, list) or not ids:
         abort(400, description="Field 'ids' must be a non-empty list")
+    try:
+        oids = {qid: to_oid(qid) for qid in ids}
+    except (InvalidId, TypeError):
+        abort(400, description="Field 'ids' must contain question IDs")
 
     update_fields = {}
     if "solved" in data:
@@ -1249,82 +1655,24 @@ def batch_update_questions_meta():
     bucket = data.get("bucket")
     company_id = None
     if company_name and bucket:
-        co = COMPANIES.find_one({"name": company_name})
-        if not co:
+        company_id = _company_id(company_name)
+        if company_id is None:
             abort(404, description=f"No company '{company_name}'")
-        company_id = co["_id"]
 
-    from pymongo import UpdateOne
-
-    ops = []
-    for qid in ids:
-        query_base = {"user_id": uid, "question_id": qid}
-        if company_id:
-            query_specific = query_base | {"company_id": company_id, "bucket": bucket}
-        else:
-            query_specific = query_base
-
-        set_on_insert = {}
-        if company_id and "solved" not in update_fields:
-            meta_exist = USER_META.find_one(query_specific, {"solved": 1})
-            if not meta_exist:
-                generic_meta = USER_META.find_one(query_base, {"solved": 1}) or {}
-                if "solved" in generic_meta:
-                    set_on_insert["solved"] = generic_meta["solved"]
-
-        update_doc = {
-            "$set": update_fields
-            | (
-                {"company_id": company_id, "bucket": bucket}
-                if company_id
-                else {}
-            )
-        }
-        if set_on_insert:
-            update_doc["$setOnInsert"] = set_on_insert
-
-        ops.append(
-            UpdateOne(
-                query_specific,
-                update_doc,
-                upsert=True,
-            )
-        )
-
-        generic_update = {
-            "$set": {
-                k: update_fields[k]
-                for k in ["solved", "userDifficulty", "note"]
-                if k in update_fields
-            }
-        }
-        ops.append(UpdateOne(query_base, generic_update, upsert=True))
-        if company_id:
-            ops.append(
-                UpdateOne(
-                    {
-                        **query_base,
-                        "$or": [
-                            {"company_id": {"$ne": company_id}},
-                            {"bucket": {"$ne": bucket}},
-                        ],
-                    },
-                    generic_update,
-                    upsert=False,
-                )
-            )
+    unique = list(dict.fromkeys(oids.values()))
+    current, inserted = _write_meta(uid, unique, update_fields, company_id, bucket)
 
-    if ops:
-        USER_META.bulk_write(ops)
-
-    filter_query = {"user_id": uid, "question_id": {"$in": ids}}
-    if company_id:
-        filter_query.update({"company_id": company_id, "bucket": bucket})
-    meta_docs = {m["question_id"]: m for m in USER_META.find(filter_query)}
+    if update_fields.get("solved") is False:
+        SYNC_STATE.forget(uid, [str(o) for o in unique])
+    flipped = []
+    if "solved" in update_fields:
+        flipped = SOLVED_BITS.update(uid, unique, update_fields["solved"])
+    USER_STATS.apply(uid, flipped, update_fields.get("solved", True), inserted=inserted)
+    invalidate_user_stats(uid)
 
     results = []
     for qid in ids:
-        meta = meta_docs.get(qid, {})
+        meta = current[str(oids[qid])]
         results.append(
             {
                 "question_id": qid,
@@ -1350,11 +1698,10 @@ def question_suggestions():
         return jsonify({"suggestions": []}), 200
     if len(query) > 100:
         abort(400, description="Query too long")
-    regex = re.escape(query)
-    docs = QUEST.find(
-        {"title": {"$regex": regex, "$options": "i"}}, {"title": 1}
-    ).limit(limit)
-    suggestions = [{"id": str(d["_id"]), "title": d["title"]} for d in docs]
+    # Prefix matches first, then infix; ties go to higher company frequency
+    suggestions = [
+        {"id": str(qid), "title": title} for qid, title in SEARCH_INDEX.search(query, limit)
+    ]
     return jsonify({"suggestions": suggestions}), 200
 
 
@@ -1367,23 +1714,11 @@ def question_companies(question_id):
     except InvalidId:
         abort(400, description=f"Invalid question ID '{question_id}'")
 
-    pipeline = [
-        {"$match": {"question_id": q_oid}},
-        {
-            "$lookup": {
-                "from": "companies",
-                "localField": "company_id",
-                "foreignField": "_id",
-                "as": "co",
-            }
-        },
-        {"$unwind": "$co"},
-        {"$group": {"_id": "$co.name"}},
-        {"$sort": {"_id": 1}},
-    ]
-    results = list(CQ.aggregate(pipeline))
-    companies = [r["_id"] for r in results]
-    return jsonify({"companies": companies}), 200
+    def build():
+        details = COMPANY_INDEX.companies_for(q_oid)
+        return {"companies": [d["company"] for d in details], "details": details}
+
+    return _catalog_response(("question-companies", str(q_oid)), build, sources=(COMPANY_INDEX,))
 
 
 # ─── Company-wide progress (per bucket) ───────────────────────────────────
@@ -1404,75 +1739,22 @@ def company_progress(company):
     """
     uid = get_jwt_identity()
 
-    # 1) Find the company document
-    co = COMPANIES.find_one({"name": company})
-    if not co:
-        abort(404, description=f"No company '{company}'")
-
-    # 2) Aggregate: for each bucket, count total vs. solved
-    pipeline = [
-        {"$match": {"company_id": co["_id"]}},
-        {
-            "$lookup": {
-                "from": "user_meta",
-                "let": {"qid": "$question_id"},
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    # user_meta.question_id is stored as STRING, so compare to stringified ObjectId
-                                    {"$eq": ["$question_id", {"$toString": "$$qid"}]},
-                                    {"$eq": ["$user_id", uid]},
-                                ]
-                            }
-                        }
-                    },
-                    {"$project": {"solved": 1, "_id": 0}},
-                ],
-                "as": "meta",
-            }
-        },
-        {
-            "$group": {
-                "_id": "$bucket",
-                "total": {"$sum": 1},
-                # If meta array is non-empty and meta[0].solved == true, count as solved
-                "solved": {
-                    "$sum": {
-                        "$cond": [
-                            {
-                                "$and": [
-                                    {"$ne": ["$meta", []]},
-                                    {
-                                        "$eq": [
-                                            {"$arrayElemAt": ["$meta.solved", 0]},
-                                            True,
-                                        ]
-                                    },
-                                ]
-                            },
-                            1,
-                            0,
-                        ]
-                    }
-                },
-            }
-        },
-        {"$project": {"bucket": "$_id", "total": 1, "solved": 1, "_id": 0}},
-    ]
-
-    results = list(CQ.aggregate(pipeline))
+    # 1) Resolve the company
+    co_id = _company_or_404(company)
 
-    # Fill in missing buckets with total=0, solved=0
+    # 2) Per bucket: members, and members the user has solved
+    solved = SOLVED_BITS.get(uid)
     BUCKET_ORDER = ["30Days", "3Months", "6Months", "MoreThan6Months", "All"]
-    bucket_map = {r["bucket"]: r for r in results}
     final_list = []
     for b in BUCKET_ORDER:
-        if b in bucket_map:
-            final_list.append(bucket_map[b])
-        else:
-            final_list.append({"bucket": b, "total": 0, "solved": 0})
+        members = CATALOG_BITS.bucket(co_id, b)
+        final_list.append(
+            {
+                "bucket": b,
+                "total": popcount(members),
+                "solved": popcount(intersect(members, solved)),
+            }
+        )
     return jsonify(final_list), 200
 
 
@@ -1531,100 +1813,73 @@ def recent_buckets():
 def user_stats():
     """Return solved/attempted counts and per-company breakdown."""
     uid = get_jwt_identity()
+    key = _user_stats_key(uid)
+    CATALOG_BITS.refresh()
+    data = STATS_CACHE.get_or_compute(key, lambda: _compute_user_stats(uid))
+    # Company totals come from the catalog; recompute after it changed
+    if data["catalogVersion"] != CATALOG_BITS.version:
+        STATS_CACHE.invalidate(key)
+        data = STATS_CACHE.get_or_compute(key, lambda: _compute_user_stats(uid))
+    data = {k: v for k, v in data.items() if k != "catalogVersion"}
+    return jsonify(data | {"totalQuestions": _total_questions()}), 200
 
-    cached = STATS_CACHE.get(uid)
-    now = datetime.utcnow()
-    if cached and (now - cached["ts"]).total_seconds() < STATS_TTL_SECONDS:
-        if "totalQuestions" in cached["data"]:
-            return jsonify(cached["data"]), 200
 
-    total_attempted = USER_META.count_documents({"user_id": uid})
-    total_solved = USER_META.count_documents({"user_id": uid, "solved": True})
+def _user_stats_key(uid: str) -> str:
+    return f"user-stats:{uid}"
 
-    diff_pipeline = [
-        {"$match": {"user_id": uid, "solved": True}},
-        {
-            "$lookup": {
-                "from": "questions",
-                "let": {"qid": "$question_id"},
-                "pipeline": [
-                    {"$match": {"$expr": {"$eq": ["$_id", {"$toObjectId": "$$qid"}]}}},
-                    {"$project": {"leetDifficulty": 1}},
-                ],
-                "as": "q",
-            }
-        },
-        {"$unwind": "$q"},
-        {"$group": {"_id": "$q.leetDifficulty", "count": {"$sum": 1}}},
-    ]
-    raw_counts = {d["_id"]: d["count"] for d in USER_META.aggregate(diff_pipeline)}
-    diff_counts = {"Easy": 0, "Medium": 0, "Hard": 0}
-    for k, v in raw_counts.items():
-        key = str(k).strip().capitalize()
-        if key in diff_counts:
-            diff_counts[key] += v
-
-    company_pipeline = [
-        {"$match": {"bucket": "All"}},
-        {
-            "$lookup": {
-                "from": "user_meta",
-                "let": {"qid": "$question_id"},
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    {"$eq": ["$question_id", {"$toString": "$$qid"}]},
-                                    {"$eq": ["$user_id", uid]},
-                                    {"$eq": ["$solved", True]},
-                                ]
-                            }
-                        }
-                    },
-                    {"$project": {"_id": 0}},
-                ],
-                "as": "meta",
-            }
-        },
-        {
-            "$lookup": {
-                "from": "companies",
-                "localField": "company_id",
-                "foreignField": "_id",
-                "as": "co",
-            }
-        },
-        {"$unwind": "$co"},
-        {
-            "$group": {
-                "_id": "$co.name",
-                "total": {"$sum": 1},
-                "solved": {"$sum": {"$cond": [{"$gt": [{"$size": "$meta"}, 0]}, 1, 0]}},
-            }
-        },
-        {"$project": {"company": "$_id", "total": 1, "solved": 1, "_id": 0}},
-        {"$sort": {"company": 1}},
-    ]
-    company_stats = list(CQ.aggregate(company_pipeline))
 
-    # Count unique question slugs across all companies to avoid duplicates
-    qids = CQ.distinct("question_id")
-    links = [q.get("link", "") for q in QUEST.find({"_id": {"$in": qids}}, {"link": 1})]
-    slugs = {
-        link.rstrip("/").split("/")[-1].split("?")[0].lower() for link in links if link
-    }
-    total_questions = len(slugs)
+def invalidate_user_stats(uid: str) -> None:
+    STATS_CACHE.invalidate(_user_stats_key(uid))
+
+
+def _meta_flushed(uid: str, inserted: int) -> None:
+    """Count rows the write-behind buffer inserted once they exist."""
+    if inserted:
+        USER_STATS.apply(uid, inserted=inserted)
+        invalidate_user_stats(uid)
+
 
-    data = {
-        "totalSolved": total_solved,
-        "totalAttempted": total_attempted,
-        "totalQuestions": total_questions,
-        "difficulty": diff_counts,
+def _compute_user_stats(uid: str) -> dict:
+    counters = USER_STATS.get(uid)
+    solved_by_company = counters.get("companies") or {}
+
+    all_buckets = CATALOG_BITS.buckets("All")
+    names = {co_id: CATALOG_SNAPSHOT.company_name(co_id) for co_id in all_buckets}
+    company_stats = sorted(
+        (
+            {
+                "company": names[co_id],
+                "total": popcount(members),
+                "solved": solved_by_company.get(str(co_id), 0),
+            }
+            for co_id, members in all_buckets.items()
+            if names[co_id] is not None
+        ),
+        key=lambda c: c["company"],
+    )
+
+    difficulty = counters.get("difficulty") or {}
+    return {
+        "catalogVersion": CATALOG_BITS.version,
+        "totalSolved": counters["totalSolved"],
+        "totalAttempted": counters["totalAttempted"],
+        "difficulty": {level: difficulty.get(level, 0) for level in ("Easy", "Medium", "Hard")},
         "companies": company_stats,
     }
-    STATS_CACHE[uid] = {"ts": now, "data": data}
-    return jsonify(data), 200
+
+
+def _total_questions() -> int:
+    """Unique question slugs across all companies; recomputed per catalog version."""
+
+    def compute():
+        links = [q.link or "" for q in CATALOG_SNAPSHOT.listed()]
+        slugs = {
+            link.rstrip("/").split("/")[-1].split("?")[0].lower() for link in links if link
+        }
+        return len(slugs)
+
+    CATALOG_SNAPSHOT.refresh()
+    return STATS_CACHE.get_or_compute(f"total-questions:{CATALOG_SNAPSHOT.version}", compute)
 
 
 # ─── Ask AI Chat Endpoint ───────────────────────────────────────────────
@@ -1637,12 +1892,12 @@ def ask_ai(question_id):
     except InvalidId:
         abort(400, description=f"Invalid question ID '{question_id}'")
 
-    q = QUEST.find_one({"_id": q_oid})
+    q = _question_doc(q_oid)
     if not q:
         abort(404, description=f"Question '{question_id}' not found")
 
     slug = q["link"].rstrip("/").split("/")[-1]
-    content = fetch_leetcode_content(slug)
+    content = CONTENT.get(slug)
     tags = q.get("tags", [])
     title = q.get("title")
 
@@ -1679,7 +1934,7 @@ def ask_ai(question_id):
         ai_resp = ""
         if OPENROUTER_API_KEY:
             try:
-                r = requests.post(
+                r = OPENROUTER.post(
                     "https://openrouter.ai/api/v1/chat/completions",
                     headers={
                         "Authorization": f"Bearer {OPENROUTER_API_KEY}",
@@ -1691,7 +1946,6 @@ def ask_ai(question_id):
                         "model": "qwen/qwen-2.5-coder-32b-instruct:free",
                         "messages": messages,
                     },
-                    timeout=10,
                 )
                 r.raise_for_status()
                 ai_resp = r.json()["choices"][0]["message"]["content"]
@@ -1720,39 +1974,6 @@ def ask_ai(question_id):
     )
 
 
-# ─── Run & Startup Sync ────────────────────────────────────────────────────
-def _startup_sync():
-    """Sync every user who has both handle & session saved."""
-    users = list(
-        USERS.find(
-            {
-                "leetcode_username": {"$exists": True},
-                "leetcode_session": {"$exists": True},
-            }
-        )
-    )
-
-    if not users:
-        return
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_uid = {
-            executor.submit(
-                sync_leetcode,
-                u["leetcode_username"],
-                u["leetcode_session"],
-                str(u["_id"]),
-            ): u["_id"]
-            for u in users
-        }
-        for fut in concurrent.futures.as_completed(future_to_uid):
-            uid = future_to_uid[fut]
-            try:
-                fut.result()
-            except Exception as e:
-                app.logger.warning("Startup sync failed for %s: %s", uid, e)
-
-
 # ─── Serve React Frontend ────────────────────────────────────────────────
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
@@ -1779,8 +2000,6 @@ def serve_react(path: str):
 
 
 if __name__ == "__main__":
-    # If you want to perform a one-time sync on startup, uncomment below:
-    # _startup_sync()
     debug_env = os.getenv("FLASK_DEBUG", "").lower()
     debug = debug_env in ("1", "true", "yes")
 
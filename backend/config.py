@@ -5,6 +5,11 @@ import os
 from pymongo import MongoClient
 from datetime import timedelta
 
+try:
+    from .modules.bucket_view import ensure_view_indexes
+except ImportError:  # pragma: no cover - script execution
+    from modules.bucket_view import ensure_view_indexes
+
 load_dotenv()  # loads variables from your .env
 
 # ————————————————
@@ -32,6 +37,7 @@ def ensure_indexes(db):
     """Create indexes used across the application."""
     db.questions.create_index("link", unique=True)
     db.questions.create_index("slug", unique=True)
+    db.questions.create_index("ordinal", unique=True, sparse=True)
     db.companies.create_index("name", unique=True)
     db.company_questions.create_index(
         [("company_id", 1), ("bucket", 1), ("question_id", 1)], unique=True
@@ -39,6 +45,10 @@ def ensure_indexes(db):
     db.company_questions.create_index("question_id")
     db.user_meta.create_index([("user_id", 1), ("question_id", 1)])
     db.user_meta.create_index([("user_id", 1), ("company_id", 1), ("bucket", 1)])
+    db.jobs.create_index([("status", 1), ("createdAt", 1)])
+    db.sync_queue.create_index([("shard", 1), ("status", 1), ("priority", -1), ("dueAt", 1)])
+    db.question_content.create_index("fetchedAt")
+    ensure_view_indexes(db.bucket_questions)
 
 
 # ————————————————
@@ -0,0 +1,333 @@
+"""
+Solved-set bitmaps over dense question ordinals.
+
+Every question gets an integer ``ordinal`` (``assign_ordinals``, called by
+each writer that inserts questions; the next free value lives in
+``catalog_state`` as ``{_id: "ordinals", next}``). With
+that, a set of questions is a packed NumPy bit array, bit ``i`` standing for
+the question with ordinal ``i``:
+
+* ``CatalogBitmaps`` holds one bitmap per ``(company_id, bucket)``, per
+  difficulty and per tag, plus each bucket's tag histogram, rebuilt from
+  the catalog snapshot whenever it reloads (loaders, imports and the tag
+  backfill bump the catalog version).
+* ``SolvedBitmaps`` holds each user's solved set, persisted in
+  ``user_bitmaps`` as ``{_id: user_id, bits, version, updatedAt}`` and
+  cached in memory. Writers bump ``version`` with a compare-and-set, and a
+  cached bitmap older than ``check_interval`` seconds is revalidated
+  against it, so other processes' writes show up within that window.
+
+Progress is then ``popcount(bucket & solved)`` and "unsolved" is
+``bucket & ~solved``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+import numpy as np
+from bson import Binary, ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+try:
+    from .catalog_snapshot import CatalogSnapshot, SnapshotView
+except ImportError:  # pragma: no cover - script execution
+    from catalog_snapshot import CatalogSnapshot, SnapshotView
+
+ORDINALS_KEY = "ordinals"
+CAS_RETRIES = 5
+
+
+# ── bit helpers ──────────────────────────────────────────────────────────
+def empty(size: int) -> np.ndarray:
+    return np.zeros((size + 7) // 8, dtype=np.uint8)
+
+
+def from_ordinals(ordinals, size: int) -> np.ndarray:
+    bits = empty(size)
+    set_bits(bits, ordinals, True)
+    return bits
+
+
+def set_bits(bits: np.ndarray, ordinals, value: bool) -> None:
+    """Set (or clear) the given ordinals in place; out-of-range ones are ignored."""
+    ords = np.asarray(ordinals, dtype=np.int64)
+    ords = ords[(ords >= 0) & (ords < bits.size * 8)]
+    masks = (0x80 >> (ords & 7)).astype(np.uint8)  # np.packbits bit order
+    if value:
+        np.bitwise_or.at(bits, ords >> 3, masks)
+    else:
+        np.bitwise_and.at(bits, ords >> 3, ~masks)
+
+
+def fit(bits: np.ndarray, nbytes: int) -> np.ndarray:
+    """``bits`` truncated or zero-padded to ``nbytes`` bytes."""
+    if bits.size == nbytes:
+        return bits
+    if bits.size > nbytes:
+        return bits[:nbytes]
+    return np.concatenate([bits, np.zeros(nbytes - bits.size, dtype=np.uint8)])
+
+
+def popcount(bits: np.ndarray) -> int:
+    return int(np.bitwise_count(bits).sum())
+
+
+def intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a & fit(b, a.size)
+
+
+def difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a & ~fit(b, a.size)
+
+
+def ordinals_of(bits: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.unpackbits(bits))
+
+
+# ── ordinals ─────────────────────────────────────────────────────────────
+def assign_ordinals(questions, state, batch_size: int = 1000) -> int:
+    """
+    Give every question without an ``ordinal`` the next free one; returns
+    how many were assigned. Each call reserves its range atomically, so
+    concurrent loaders never hand out the same value.
+    """
+    missing = [d["_id"] for d in questions.find({"ordinal": {"$exists": False}}, {"_id": 1}).sort("_id", 1)]
+    if not missing:
+        return 0
+    doc = state.find_one_and_update(
+        {"_id": ORDINALS_KEY},
+        {"$inc": {"next": len(missing)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    start = doc["next"] - len(missing)
+    ops = [
+        UpdateOne({"_id": qid, "ordinal": {"$exists": False}}, {"$set": {"ordinal": start + i}})
+        for i, qid in enumerate(missing)
+    ]
+    assigned = 0
+    for i in range(0, len(ops), batch_size):
+        assigned += questions.bulk_write(ops[i : i + batch_size], ordered=False).modified_count
+    return assigned
+
+
+class CatalogBitmaps(SnapshotView):
+    """Ordinal maps, membership bitmaps and per-bucket tag histograms."""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        super().__init__(snapshot)
+        self.size = 0
+        self._ordinal = {}
+        self._ids = []
+        self._buckets = {}
+        self._difficulty = {}
+        self._tags = {}
+        self._histograms = {}
+        self._level_of = {}
+        self._companies_of = {}
+
+    def ordinal(self, qid) -> int | None:
+        self.refresh()
+        return self._ordinal.get(str(qid))
+
+    def ordinals(self, qids) -> list[int]:
+        self.refresh()
+        index = self._ordinal
+        return [index[q] for q in map(str, qids) if q in index]
+
+    def ids(self, bits: np.ndarray) -> list[ObjectId]:
+        """Question ids for the set bits."""
+        ids = self._ids
+        return [ids[i] for i in ordinals_of(bits) if i < len(ids) and ids[i] is not None]
+
+    def bucket(self, company_id, bucket: str) -> np.ndarray:
+        self.refresh()
+        bits = self._buckets.get((company_id, bucket))
+        return bits if bits is not None else empty(self.size)
+
+    def buckets(self, bucket: str) -> dict:
+        """``{company_id: bitmap}`` for every company with questions in ``bucket``."""
+        self.refresh()
+        return {co: bits for (co, b), bits in self._buckets.items() if b == bucket}
+
+    def difficulty(self) -> dict[str, np.ndarray]:
+        self.refresh()
+        return self._difficulty
+
+    def tags(self) -> dict[str, np.ndarray]:
+        self.refresh()
+        return self._tags
+
+    def tag_histogram(self, company_id, bucket: str) -> list[tuple[str, int]]:
+        """``[(tag, questions)]`` for the bucket, most common first."""
+        self.refresh()
+        return self._histograms.get((company_id, bucket), [])
+
+    def breakdown(self, ordinals) -> tuple[Counter, Counter]:
+        """
+        ``(levels, companies)`` counting the given questions per difficulty
+        and per company listing them in its ``All`` bucket.
+        """
+        self.refresh()
+        levels, companies = Counter(), Counter()
+        for i in ordinals:
+            level = self._level_of.get(i)
+            if level:
+                levels[level] += 1
+            companies.update(self._companies_of.get(i, ()))
+        return levels, companies
+
+    def _build(self, snap) -> None:
+        # Questions without an ordinal are left out until the writer that
+        # inserted them assigns one
+        ordinal, by_ordinal, difficulty, tags_of = {}, {}, {}, {}
+        for q in snap.questions:
+            if q.ordinal is None:
+                continue
+            ordinal[str(q.id)] = q.ordinal
+            by_ordinal[q.ordinal] = q.id
+            if q.difficulty:
+                level = str(q.difficulty).strip().capitalize()
+                difficulty.setdefault(level, []).append(q.ordinal)
+            if q.tags:
+                tags_of[q.ordinal] = q.tags
+        size = max(by_ordinal, default=-1) + 1
+        ids = [None] * size
+        for i, qid in by_ordinal.items():
+            ids[i] = qid
+
+        members = {}
+        for key, positions in snap.members.items():
+            ords = [snap.questions[pos].ordinal for pos in positions]
+            ords = [i for i in ords if i is not None]
+            if ords:
+                members[key] = ords
+
+        level_of = {i: level for level, ords in difficulty.items() for i in ords}
+        companies_of = {}
+        for (co, b), ords in members.items():
+            if b == "All":
+                for i in set(ords):
+                    companies_of.setdefault(i, []).append(co)
+
+        histograms = {}
+        for key, ords in members.items():
+            counts = Counter(t for i in set(ords) for t in tags_of.get(i, ()))
+            histograms[key] = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        by_tag = {}
+        for i, tags in tags_of.items():
+            for t in tags:
+                by_tag.setdefault(t, []).append(i)
+
+        # Built aside, then swapped in whole; bitmaps are padded/truncated on use,
+        # so a reader straddling the swap still gets a consistent answer
+        self._buckets = {key: from_ordinals(ords, size) for key, ords in members.items()}
+        self._difficulty = {level: from_ordinals(ords, size) for level, ords in difficulty.items()}
+        self._tags = {tag: from_ordinals(ords, size) for tag, ords in by_tag.items()}
+        self._histograms = histograms
+        self._level_of = level_of
+        self._companies_of = companies_of
+        self._ids = ids
+        self._ordinal = ordinal
+        self.size = size
+
+
+class SolvedBitmaps:
+    """Per-user solved bitmaps: ``user_bitmaps`` documents with an LRU in front."""
+
+    def __init__(self, coll, user_meta, catalog: CatalogBitmaps, check_interval: float = 1.0, max_users: int = 10000):
+        self.coll = coll
+        self.user_meta = user_meta
+        self.catalog = catalog
+        self.check_interval = check_interval
+        self.max_users = max_users
+        self._cache = OrderedDict()  # user_id -> (version, bits, checked)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> np.ndarray:
+        """The user's solved bitmap, sized to the current catalog."""
+        return fit(self._current(user_id)[1], (self.catalog.size + 7) // 8)
+
+    def update(self, user_id: str, qids, solved: bool) -> list[int]:
+        """
+        Set or clear the bits for ``qids``; unknown question ids are skipped.
+        Returns the ordinals whose bit actually changed.
+        """
+        ords = self.catalog.ordinals(qids)
+        if not ords:
+            return []
+        nbytes = (max(self.catalog.size, max(ords) + 1) + 7) // 8
+        for _ in range(CAS_RETRIES):
+            version, bits = self._current(user_id)
+            new = fit(bits, nbytes).copy()
+            set_bits(new, ords, solved)
+            flipped = ordinals_of(new ^ fit(bits, nbytes))
+            if not flipped.size:
+                return []
+            res = self.coll.update_one(
+                {"_id": user_id, "version": version},
+                {
+                    "$set": {"bits": Binary(new.tobytes()), "updatedAt": datetime.utcnow()},
+                    "$inc": {"version": 1},
+                },
+            )
+            if res.matched_count:
+                self._put(user_id, version + 1, new)
+                return flipped.tolist()
+            self.invalidate(user_id)
+        # Lost every race: drop the cache and let the next read rebuild
+        self.coll.delete_one({"_id": user_id})
+        self.invalidate(user_id)
+        return []
+
+    def reset(self, user_id: str) -> None:
+        """Drop the stored bitmap; the next read rebuilds it from ``user_meta``."""
+        self.coll.delete_one({"_id": user_id})
+        self.invalidate(user_id)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    def _current(self, user_id: str) -> tuple[int, np.ndarray]:
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached:
+                self._cache.move_to_end(user_id)
+        now = time.monotonic()
+        if cached and now - cached[2] < self.check_interval:
+            return cached[0], cached[1]
+        if cached:
+            doc = self.coll.find_one({"_id": user_id}, {"version": 1})
+            if doc and doc["version"] == cached[0]:
+                self._put(user_id, cached[0], cached[1])
+                return cached[0], cached[1]
+        doc = self.coll.find_one({"_id": user_id})
+        if doc is None:
+            doc = self._build(user_id)
+        bits = np.frombuffer(doc["bits"], dtype=np.uint8).copy()
+        self._put(user_id, doc["version"], bits)
+        return doc["version"], bits
+
+    def _build(self, user_id: str) -> dict:
+        """First use: derive the bitmap from the user's ``user_meta`` rows."""
+        qids = self.user_meta.distinct("question_id", {"user_id": user_id, "solved": True})
+        bits = from_ordinals(self.catalog.ordinals(qids), self.catalog.size)
+        doc = {"_id": user_id, "bits": Binary(bits.tobytes()), "version": 1, "updatedAt": datetime.utcnow()}
+        try:
+            self.coll.insert_one(doc)
+        except DuplicateKeyError:
+            return self.coll.find_one({"_id": user_id}) or doc
+        return doc
+
+    def _put(self, user_id: str, version: int, bits: np.ndarray) -> None:
+        with self._lock:
+            self._cache[user_id] = (version, bits, time.monotonic())
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_users:
+                self._cache.popitem(last=False)
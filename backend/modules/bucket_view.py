@@ -0,0 +1,239 @@
+"""
+Denormalized ``(company, bucket)`` question listing.
+
+``bucket_questions`` holds one document per ``company_questions`` row with
+the question fields listings filter and sort on copied in:
+
+    {company_id, bucket, question_id, frequency, acceptanceRate,
+     title, slug, link, leetDifficulty, tags}
+
+so listing a bucket is an indexed query instead of ``$group`` + ``$lookup``
+over every row. Writers keep it current next to ``company_questions``:
+
+    sync_view_bucket()    after ``sync_bucket_rows`` (loaders)
+    write_view_rows()     after ``write_company_questions`` (admin import)
+    refresh_questions()   after question fields change (tag backfill)
+
+``rebuild`` fills it from scratch and then records
+``{_id: "bucket_view", status: "done"}`` in ``catalog_state``; until that
+document exists ``BucketView`` serves the same row shape from the old join.
+
+    python -m backend.modules.bucket_view
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+
+from pymongo import ReplaceOne, UpdateMany
+
+try:
+    from .ingest import LOOKUP_CHUNK, WRITE_CHUNK, _chunks, sync_bucket_rows, write_company_questions
+except ImportError:  # pragma: no cover - script execution
+    from ingest import LOOKUP_CHUNK, WRITE_CHUNK, _chunks, sync_bucket_rows, write_company_questions
+
+VIEW_STATE_KEY = "bucket_view"
+QUESTION_FIELDS = ("title", "slug", "link", "leetDifficulty", "tags")
+# Listing sort fields; each gets a (company_id, bucket, field, question_id) index
+SORT_FIELDS = ("title", "frequency", "acceptanceRate", "leetDifficulty")
+
+
+def ensure_view_indexes(view) -> None:
+    view.create_index([("company_id", 1), ("bucket", 1), ("question_id", 1)], unique=True)
+    for field in SORT_FIELDS:
+        view.create_index([("company_id", 1), ("bucket", 1), (field, 1), ("question_id", 1)])
+    view.create_index([("company_id", 1), ("bucket", 1), ("tags", 1)])
+    view.create_index("question_id")
+
+
+def view_docs(questions, rows: list[dict]) -> list[dict]:
+    """View documents for ``company_questions`` rows; rows whose question is gone are dropped."""
+    fields = {}
+    qids = list({r["question_id"] for r in rows})
+    for part in _chunks(qids, LOOKUP_CHUNK):
+        for q in questions.find({"_id": {"$in": part}}, dict.fromkeys(QUESTION_FIELDS, 1)):
+            fields[q.pop("_id")] = q
+    docs = []
+    for r in rows:
+        q = fields.get(r["question_id"])
+        if q is None:
+            continue
+        docs.append(
+            {
+                "company_id": r["company_id"],
+                "bucket": r["bucket"],
+                "question_id": r["question_id"],
+                "frequency": r.get("frequency"),
+                "acceptanceRate": r.get("acceptanceRate"),
+                **{f: q.get(f) for f in QUESTION_FIELDS},
+            }
+        )
+    return docs
+
+
+def sync_view_bucket(view, questions, company_id, bucket: str, rows: list[dict], chunk_size: int = WRITE_CHUNK) -> dict:
+    """Make the view rows of ``(company_id, bucket)`` match ``rows``, writing only differences."""
+    return sync_bucket_rows(view, company_id, bucket, view_docs(questions, rows), chunk_size)
+
+
+def write_view_rows(view, questions, rows: list[dict], chunk_size: int = WRITE_CHUNK) -> int:
+    """Upsert the view rows for freshly written ``company_questions`` rows."""
+    return write_company_questions(view, view_docs(questions, rows), chunk_size)
+
+
+def refresh_questions(view, questions, question_ids, chunk_size: int = WRITE_CHUNK) -> int:
+    """Copy the current question fields into every view row of ``question_ids``."""
+    updated = 0
+    for part in _chunks(list(question_ids), chunk_size):
+        ops = [
+            UpdateMany({"question_id": q["_id"]}, {"$set": {f: q.get(f) for f in QUESTION_FIELDS}})
+            for q in questions.find({"_id": {"$in": part}}, dict.fromkeys(QUESTION_FIELDS, 1))
+        ]
+        if ops:
+            updated += view.bulk_write(ops, ordered=False).modified_count
+    return updated
+
+
+def rebuild(view, company_questions, questions, state, chunk_size: int = WRITE_CHUNK, log=print) -> int:
+    """
+    Rewrite every view row from ``company_questions`` in ``_id`` order and
+    drop rows that no longer have a source, then mark the view ready.
+    """
+    started = time.perf_counter()
+    run = datetime.utcnow()
+    written = 0
+    last_id = None
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        rows = list(company_questions.find(query).sort("_id", 1).limit(chunk_size))
+        if not rows:
+            break
+        ops = [
+            ReplaceOne(
+                {"company_id": d["company_id"], "bucket": d["bucket"], "question_id": d["question_id"]},
+                d | {"builtAt": run},
+                upsert=True,
+            )
+            for d in view_docs(questions, rows)
+        ]
+        if ops:
+            view.bulk_write(ops, ordered=False)
+        written += len(ops)
+        last_id = rows[-1]["_id"]
+    removed = _drop_orphans(view, company_questions, questions, run, chunk_size)
+    state.update_one(
+        {"_id": VIEW_STATE_KEY},
+        {"$set": {"status": "done", "rows": written, "finishedAt": datetime.utcnow()}},
+        upsert=True,
+    )
+    log(f"✅ bucket_questions rebuilt: {written} rows, {removed} stale removed, {time.perf_counter() - started:.1f}s")
+    return written
+
+
+def _drop_orphans(view, company_questions, questions, run, chunk_size: int) -> int:
+    """
+    Delete the view rows this rebuild did not write whose source row or
+    question no longer exists. Rows loaders and imports wrote during the
+    rebuild carry no ``builtAt`` of this run but still have a source.
+    """
+    key_fields = {"company_id": 1, "bucket": 1, "question_id": 1}
+    leftover = list(view.find({"builtAt": {"$ne": run}}, key_fields))
+    removed = 0
+    for part in _chunks(leftover, min(chunk_size, LOOKUP_CHUNK)):
+        qids = list({r["question_id"] for r in part})
+        live = {
+            (r["company_id"], r["bucket"], r["question_id"])
+            for r in company_questions.find({"question_id": {"$in": qids}}, key_fields)
+        }
+        present = {q["_id"] for q in questions.find({"_id": {"$in": qids}}, {"_id": 1})}
+        gone = [
+            r["_id"]
+            for r in part
+            if r["question_id"] not in present or (r["company_id"], r["bucket"], r["question_id"]) not in live
+        ]
+        if gone:
+            removed += view.delete_many({"_id": {"$in": gone}}).deleted_count
+    return removed
+
+
+class BucketView:
+    """Source of listing rows: the view once built, the old join until then."""
+
+    def __init__(self, view, company_questions, state, check_interval: float = 30.0):
+        self.view = view
+        self.company_questions = company_questions
+        self.state = state
+        self.check_interval = check_interval
+        self._ready = False
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        if self._ready:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked >= self.check_interval:
+                doc = self.state.find_one({"_id": VIEW_STATE_KEY}, {"status": 1})
+                self._ready = (doc or {}).get("status") == "done"
+                self._checked = now
+        return self._ready
+
+    def rows(self, match: dict, tag: str | None = None) -> tuple:
+        """
+        ``(collection, pipeline)`` producing one view-shaped document per
+        question matching ``match`` (on company_id/bucket/question_id) and
+        tagged ``tag``. On the view it is a single ``$match`` that sort and
+        limit stages can follow on an index.
+        """
+        if self.ready:
+            return self.view, [{"$match": match | ({"tags": tag} if tag else {})}]
+        pipeline = [
+            {"$match": match},
+            # Group by question to avoid duplicates if multiple rows exist
+            {
+                "$group": {
+                    "_id": "$question_id",
+                    "frequency": {"$max": "$frequency"},
+                    "acceptanceRate": {"$max": "$acceptanceRate"},
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "questions",
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "as": "q",
+                }
+            },
+            {"$unwind": "$q"},
+            {
+                "$project": {
+                    "question_id": "$_id",
+                    "frequency": 1,
+                    "acceptanceRate": 1,
+                    **{f: f"$q.{f}" for f in QUESTION_FIELDS},
+                }
+            },
+        ]
+        if tag:
+            pipeline.append({"$match": {"tags": tag}})
+        return self.company_questions, pipeline
+
+    def count(self, match: dict, tag: str | None = None) -> int:
+        """Number of documents ``rows(match, tag)`` produces."""
+        source, pipeline = self.rows(match, tag)
+        if source is self.view:
+            return source.count_documents(pipeline[0]["$match"])
+        return next(iter(source.aggregate(pipeline + [{"$count": "c"}])), {}).get("c", 0)
+
+
+if __name__ == "__main__":
+    from backend.config import get_db
+
+    db = get_db()
+    ensure_view_indexes(db.bucket_questions)
+    rebuild(db.bucket_questions, db.company_questions, db.questions, db.catalog_state)
@@ -0,0 +1,172 @@
+"""
+Small pluggable cache for computed JSON values (per-user stats and the like).
+
+Backends share ``get(key)`` / ``set(key, value)`` / ``delete(key)``:
+
+    LRUCache     in-process, size-capped, per-entry TTL
+    MongoCache   a collection with a TTL index on ``expiresAt``
+    RedisCache   any Redis-compatible server (needs the ``redis`` package)
+
+``Cache`` wraps a backend with ``get_or_compute``, which lets only one
+caller per key and process compute a missing value while concurrent
+callers wait for its result (singleflight). A value whose key is
+invalidated while it is being computed is returned to the callers already
+waiting but not stored, and later callers compute afresh. ``make_cache``
+picks the backend from configuration.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class MongoCache:
+    """Entries as ``{_id: key, value, expiresAt}``; MongoDB's TTL monitor removes expired ones."""
+
+    def __init__(self, coll, ttl: float = 300.0):
+        self.coll = coll
+        self.ttl = ttl
+        coll.create_index("expiresAt", expireAfterSeconds=0)
+
+    def get(self, key: str):
+        # The TTL monitor only runs every minute, so check expiry here too
+        doc = self.coll.find_one({"_id": key, "expiresAt": {"$gt": datetime.utcnow()}})
+        return doc["value"] if doc else None
+
+    def set(self, key: str, value) -> None:
+        expires = datetime.utcnow() + timedelta(seconds=self.ttl)
+        self.coll.replace_one({"_id": key}, {"value": value, "expiresAt": expires}, upsert=True)
+
+    def delete(self, key: str) -> None:
+        self.coll.delete_one({"_id": key})
+
+
+class RedisCache:
+    def __init__(self, client, ttl: float = 300.0, prefix: str = "leetease:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value) -> None:
+        self.client.set(self.prefix + key, json.dumps(value, default=str), ex=max(1, int(self.ttl)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.generation = 0
+
+
+class Cache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        return self.backend.get(key)
+
+    def set(self, key: str, value) -> None:
+        self.backend.set(key, value)
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                # Detach a running computation: it may have read the old data
+                flight = self._flights.pop(key, None)
+                if flight is not None:
+                    flight.generation += 1
+        for key in keys:
+            self.backend.delete(key)
+
+    def get_or_compute(self, key: str, compute):
+        """Cached value for ``key``, computing and storing it once on a miss."""
+        value = self.backend.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            generation = flight.generation
+            flight.value = compute()
+            if flight.generation == generation:
+                self.backend.set(key, flight.value)
+                # An invalidate that landed during the set may have run its
+                # delete first; drop what was just stored
+                if flight.generation != generation:
+                    self.backend.delete(key)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+
+def make_cache(kind: str, ttl: float, coll=None, max_entries: int = 10000, redis_url: str | None = None) -> Cache:
+    """``Cache`` over the ``memory``, ``mongo`` or ``redis`` backend."""
+    kind = kind.lower()
+    if kind == "memory":
+        return Cache(LRUCache(max_entries=max_entries, ttl=ttl))
+    if kind == "mongo":
+        return Cache(MongoCache(coll, ttl=ttl))
+    if kind == "redis":
+        import redis  # optional dependency, only needed for this backend
+
+        return Cache(RedisCache(redis.Redis.from_url(redis_url or "redis://localhost:6379/0"), ttl=ttl))
+    raise ValueError(f"Unknown cache backend '{kind}'")
@@ -0,0 +1,194 @@
+"""
+Catalog version counter, the process-wide slug → question id index and the
+cache of serialized catalog responses.
+
+Every writer of ``questions``, ``companies`` or ``company_questions`` (the
+dataset loaders, ``/api/import`` and the tag backfill) calls
+``bump_catalog_version`` afterwards; the counter lives in one document of
+the ``catalog_state`` collection:
+
+    {_id: "catalog", version, updatedAt}
+
+In-memory views of the catalog derive from ``VersionedIndex``, which reads
+the version at most every ``check_interval`` seconds and reloads when it
+moved. ``SlugIndex`` keeps ``{slug: str(question _id)}``; on a version
+change it only fetches questions with an ``_id`` newer than the newest one
+already indexed (minus a small clock-skew margin, since ObjectIds from
+different writers are only roughly ordered). ``CatalogResponses`` keeps
+response bodies built from catalog data for the current version, which
+also serves as their ETag.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+CATALOG_KEY = "catalog"
+ID_SKEW = timedelta(minutes=5)
+
+
+def get_catalog_version(state) -> int:
+    doc = state.find_one({"_id": CATALOG_KEY}, {"version": 1})
+    return (doc or {}).get("version", 0)
+
+
+def bump_catalog_version(state) -> int:
+    """Record that the question catalog changed; returns the new version."""
+    from pymongo import ReturnDocument
+
+    doc = state.find_one_and_update(
+        {"_id": CATALOG_KEY},
+        {"$inc": {"version": 1}, "$set": {"updatedAt": datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc["version"]
+
+
+def _slug(doc: dict) -> str | None:
+    if doc.get("slug"):
+        return doc["slug"]
+    link = doc.get("link") or ""
+    return link.split("?")[0].rstrip("/").split("/")[-1] or None
+
+
+class VersionedIndex(ABC):
+    """
+    In-memory view of catalog data, reloaded when the catalog version moves.
+    The version is read at most every ``check_interval`` seconds;
+    subclasses implement ``_load(full)``, which builds the new state without
+    touching the current one, and ``_swap(state)``, which installs it.
+
+    One thread at a time reloads, and it builds outside ``_lock``: the
+    other threads keep reading the current state meanwhile, and only the
+    first load, which has nothing to serve yet, makes them wait. The swap
+    and the new ``version`` are set together under ``_lock``.
+    """
+
+    def __init__(self, state, check_interval: float = 2.0):
+        self.state = state
+        self.check_interval = check_interval
+        self.version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return
+        if not self._reloading.acquire(blocking=self.version is None or force):
+            return
+        try:
+            if not force and now - self._checked < self.check_interval:
+                return
+            # Read the version before scanning: a write that lands mid-scan
+            # bumps it again and is picked up on the next check.
+            version = get_catalog_version(self.state)
+            if version != self.version or force:
+                state = self._load(full=self.version is None or force)
+                with self._lock:
+                    self._swap(state)
+                    self.version = version
+            self._checked = time.monotonic()
+        finally:
+            self._reloading.release()
+
+    @abstractmethod
+    def _load(self, full: bool):
+        """Build the new state; ``full`` is false when only newer data needs adding."""
+
+    @abstractmethod
+    def _swap(self, state) -> None:
+        """Install a state built by ``_load``."""
+
+
+class SlugIndex(VersionedIndex):
+    def __init__(self, questions, state, check_interval: float = 2.0):
+        super().__init__(state, check_interval)
+        self.questions = questions
+        self._map = {}
+        self._max_id = None
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def ids_for(self, slugs) -> dict[str, str]:
+        """``{slug: question_id}`` for the given slugs that are in the catalog."""
+        self.refresh()
+        index = self._map
+        return {s: index[s] for s in slugs if s in index}
+
+    def get(self, slug: str) -> str | None:
+        self.refresh()
+        return self._map.get(slug)
+
+    def _load(self, full: bool) -> tuple[dict, ObjectId | None]:
+        query = {}
+        if not full and self._max_id is not None:
+            since = self._max_id.generation_time - ID_SKEW
+            query = {"_id": {"$gt": ObjectId.from_datetime(since)}}
+        index = {} if full else dict(self._map)
+        max_id = None if full else self._max_id
+        for doc in self.questions.find(query, {"slug": 1, "link": 1}):
+            slug = _slug(doc)
+            if slug:
+                index[slug] = str(doc["_id"])
+            if max_id is None or doc["_id"] > max_id:
+                max_id = doc["_id"]
+        return index, max_id
+
+    def _swap(self, state) -> None:
+        # Swap rather than mutate so lock-free readers see a complete map
+        self._map, self._max_id = state
+
+
+class CatalogResponses(VersionedIndex):
+    """
+    Serialized bodies of catalog-only responses, dropped when the version
+    moves. A body built while an index it was read from (``sources``) was
+    on another version is neither cached nor ETagged, so a lagging index
+    cannot pin stale data under a new ETag, here or in a client's cache.
+    """
+
+    def __init__(self, state, check_interval: float = 2.0, max_entries: int = 10000):
+        super().__init__(state, check_interval)
+        self.max_entries = max_entries
+        self._bodies = {}
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag (unquoted) for responses of the current version."""
+        self.refresh()
+        return f"catalog-{self.version}"
+
+    def get(self, key, build, sources=()) -> tuple[str | None, bytes]:
+        """ETag (None if ``sources`` lag) and body for ``key``, from ``build()`` on a miss."""
+        self.refresh()
+        # Keyed by version too: a reader racing a reload cannot file an old
+        # body under the new version
+        key = (self.version, key)
+        bodies = self._bodies
+        etag = f"catalog-{key[0]}"
+        body = bodies.get(key)
+        if body is not None:
+            return etag, body
+        for index in sources:
+            index.refresh()
+        body = build()
+        if any(index.version != key[0] for index in sources):
+            return None, body
+        if len(bodies) < self.max_entries:
+            bodies[key] = body
+        return etag, body
+
+    def _load(self, full: bool) -> dict:
+        return {}
+
+    def _swap(self, state) -> None:
+        self._bodies = state
@@ -0,0 +1,214 @@
+"""
+Read-only in-memory copy of the catalog for request handlers.
+
+The snapshot holds every company (name ↔ ``_id``), each company's buckets
+and their member questions with their frequency, and the question fields
+pages and indexes need (title, slug, link, difficulty, tags, ordinal). It
+is built from one scan each of ``companies``, ``questions`` and
+``company_questions`` whenever the catalog version moves, and replaces the
+previous one in a single assignment, so a reader always sees one whole
+version without locking.
+
+Questions are stored once, as ``QuestionInfo`` objects with ``__slots__``;
+bucket member lists are ``array("I")`` positions into that table.
+
+The other catalog views (solved-set bitmaps, search, question → companies)
+derive from ``SnapshotView`` and are rebuilt from the snapshot in memory
+rather than scanning the collections again.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from array import array
+
+try:
+    from .catalog import VersionedIndex, _slug
+except ImportError:  # pragma: no cover - script execution
+    from catalog import VersionedIndex, _slug
+
+log = logging.getLogger(__name__)
+
+
+class QuestionInfo:
+    __slots__ = ("id", "title", "slug", "link", "difficulty", "tags", "ordinal")
+
+    def __init__(self, doc: dict):
+        self.id = doc["_id"]
+        self.title = doc.get("title")
+        self.slug = _slug(doc)
+        self.link = doc.get("link")
+        self.difficulty = doc.get("leetDifficulty")
+        self.tags = tuple(doc.get("tags") or ())
+        self.ordinal = doc.get("ordinal")
+
+    def as_doc(self) -> dict:
+        """The fields as a ``questions`` document would have them."""
+        return {
+            "_id": self.id,
+            "title": self.title,
+            "slug": self.slug,
+            "link": self.link,
+            "leetDifficulty": self.difficulty,
+            "tags": list(self.tags),
+        }
+
+
+class _Snapshot:
+    __slots__ = ("company_ids", "names", "company_names", "buckets", "members", "frequencies", "questions", "positions")
+
+    def __init__(self):
+        self.company_ids = {}  # name -> _id
+        self.names = {}  # _id -> name
+        self.company_names = []  # sorted
+        self.buckets = {}  # company _id -> sorted bucket names
+        self.members = {}  # (company _id, bucket) -> array of positions
+        self.frequencies = {}  # (company _id, bucket) -> frequency per member
+        self.questions = []  # position -> QuestionInfo
+        self.positions = {}  # str(question _id) -> position
+
+
+class CatalogSnapshot(VersionedIndex):
+    def __init__(self, companies, questions, company_questions, state, check_interval: float = 2.0):
+        super().__init__(state, check_interval)
+        self.companies = companies
+        self.questions = questions
+        self.company_questions = company_questions
+        self._snap = _Snapshot()
+        self._warming = None
+
+    def __len__(self) -> int:
+        return len(self._snap.questions)
+
+    def company_names(self) -> list[str]:
+        """Every company name, sorted."""
+        self.refresh()
+        return self._snap.company_names
+
+    def company_id(self, name: str):
+        """``_id`` of the company called ``name``, or None."""
+        self.refresh()
+        return self._snap.company_ids.get(name)
+
+    def company_name(self, company_id) -> str | None:
+        """Name of the company with ``_id`` ``company_id``, or None."""
+        self.refresh()
+        return self._snap.names.get(company_id)
+
+    def buckets(self, company_id) -> list[str]:
+        """The company's bucket names, sorted."""
+        self.refresh()
+        return self._snap.buckets.get(company_id, [])
+
+    def question(self, question_id) -> QuestionInfo | None:
+        self.refresh()
+        snap = self._snap
+        pos = snap.positions.get(str(question_id))
+        return snap.questions[pos] if pos is not None else None
+
+    def members(self, company_id, bucket: str) -> list[QuestionInfo]:
+        """Questions in a company bucket, in catalog order."""
+        self.refresh()
+        snap = self._snap
+        return [snap.questions[pos] for pos in snap.members.get((company_id, bucket), ())]
+
+    def listed(self) -> list[QuestionInfo]:
+        """Questions in at least one company bucket."""
+        self.refresh()
+        snap = self._snap
+        seen = set()
+        for positions in snap.members.values():
+            seen.update(positions)
+        return [snap.questions[pos] for pos in sorted(seen)]
+
+    def current(self) -> tuple[int | None, _Snapshot]:
+        """``(version, snapshot)``, read together, for views built from it."""
+        self.refresh()
+        with self._lock:
+            return self.version, self._snap
+
+    def warm(self) -> None:
+        """Load in the background, so a new worker's first requests find it ready."""
+        if self._warming is not None:
+            return
+        self._warming = threading.Thread(target=self._warm, daemon=True)
+        self._warming.start()
+
+    def _warm(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            log.warning("Catalog snapshot preload failed, loading on first use: %s", e)
+
+    def _load(self, full: bool) -> _Snapshot:
+        snap = _Snapshot()
+        for c in self.companies.find({}, {"name": 1}):
+            snap.company_ids[c["name"]] = c["_id"]
+            snap.names[c["_id"]] = c["name"]
+        snap.company_names = sorted(snap.company_ids)
+
+        fields = {"title": 1, "slug": 1, "link": 1, "leetDifficulty": 1, "tags": 1, "ordinal": 1}
+        for doc in self.questions.find({}, fields):
+            snap.positions[str(doc["_id"])] = len(snap.questions)
+            snap.questions.append(QuestionInfo(doc))
+
+        buckets, listed = {}, {}
+        for row in self.company_questions.find(
+            {}, {"company_id": 1, "bucket": 1, "question_id": 1, "frequency": 1, "_id": 0}
+        ):
+            co_id, bucket = row.get("company_id"), row.get("bucket")
+            if co_id not in snap.names:
+                continue
+            buckets.setdefault(co_id, set()).add(bucket)
+            pos = snap.positions.get(str(row.get("question_id")))
+            if pos is not None:
+                listed.setdefault((co_id, bucket), []).append((pos, row.get("frequency")))
+        snap.buckets = {co_id: sorted(b for b in found if b is not None) for co_id, found in buckets.items()}
+        for key, rows in listed.items():
+            rows.sort(key=lambda pf: pf[0])
+            snap.members[key] = array("I", (pos for pos, _ in rows))
+            snap.frequencies[key] = [f for _, f in rows]
+        return snap
+
+    def _swap(self, state: _Snapshot) -> None:
+        self._snap = state
+
+
+class SnapshotView(ABC):
+    """
+    In-memory view built from a ``CatalogSnapshot`` instead of its own scans.
+    ``refresh`` rebuilds it (the abstract ``_build(snap)``) whenever the
+    snapshot has reloaded; ``version`` is the catalog version it was built
+    from. As with the snapshot, one thread rebuilds while the others keep
+    reading the current view, and only the first build makes them wait.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        self.version = None
+        self._source = None
+        self._rebuilding = threading.Lock()
+
+    def refresh(self, force: bool = False) -> None:
+        if force:
+            self.snapshot.refresh(force=True)
+        version, snap = self.snapshot.current()
+        if snap is self._source and not force:
+            return
+        if not self._rebuilding.acquire(blocking=self._source is None or force):
+            return
+        try:
+            version, snap = self.snapshot.current()
+            if snap is self._source and not force:
+                return
+            self._build(snap)
+            self._source = snap
+            self.version = version
+        finally:
+            self._rebuilding.release()
+
+    @abstractmethod
+    def _build(self, snap: _Snapshot) -> None:
+        """Rebuild the view from ``snap``."""
@@ -0,0 +1,56 @@
+"""
+question_id → companies, inverted from ``company_questions``.
+
+For every question the index holds the companies listing it, sorted by
+name, each with its buckets and per-bucket frequency. The mapping only
+changes when ``company_questions`` does, so it is rebuilt from the catalog
+snapshot whenever that reloads and otherwise served from memory.
+"""
+
+from __future__ import annotations
+
+try:
+    from .catalog_snapshot import CatalogSnapshot, SnapshotView
+except ImportError:  # pragma: no cover - script execution
+    from catalog_snapshot import CatalogSnapshot, SnapshotView
+
+BUCKET_ORDER = ("30Days", "3Months", "6Months", "MoreThan6Months", "All")
+_BUCKET_RANK = {b: i for i, b in enumerate(BUCKET_ORDER)}
+
+
+class CompanyIndex(SnapshotView):
+    def __init__(self, snapshot: CatalogSnapshot):
+        super().__init__(snapshot)
+        self._by_question = {}
+
+    def __len__(self) -> int:
+        return len(self._by_question)
+
+    def companies_for(self, question_id) -> list[dict]:
+        """``[{"company", "buckets": [{"bucket", "frequency"}]}]`` sorted by company."""
+        self.refresh()
+        return self._by_question.get(str(question_id), [])
+
+    def _build(self, snap) -> None:
+        grouped = {}
+        for (co_id, bucket), positions in snap.members.items():
+            name = snap.names[co_id]
+            for pos, frequency in zip(positions, snap.frequencies[(co_id, bucket)]):
+                grouped.setdefault(pos, {}).setdefault(name, {})[bucket] = frequency
+
+        by_question = {}
+        for pos, companies in grouped.items():
+            by_question[str(snap.questions[pos].id)] = [
+                {
+                    "company": name,
+                    "buckets": [
+                        {"bucket": b, "frequency": f}
+                        for b, f in sorted(
+                            buckets.items(),
+                            key=lambda bf: (_BUCKET_RANK.get(bf[0], len(BUCKET_ORDER)), str(bf[0])),
+                        )
+                    ],
+                }
+                for name, buckets in sorted(companies.items())
+            ]
+        self._by_question = by_question
@@ -0,0 +1,131 @@
+"""
+Local store for LeetCode problem HTML.
+
+Lookups go through three tiers:
+
+    1. an in-process LRU (sub-millisecond)
+    2. the ``question_content`` collection:
+           {_id: slug, content, hash, fetchedAt}
+    3. the live GraphQL fetch, only on a cold miss
+
+Entries older than ``ttl`` are still served, and a background refresh is
+scheduled for them (at most one in flight per slug).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+log = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    def __init__(self, coll, fetch, ttl: timedelta, max_entries: int = 2048, logger=None):
+        self.coll = coll
+        self.fetch = fetch  # slug -> html ("" when unavailable)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.log = logger or log
+        self._lru = OrderedDict()  # slug -> (content, fetchedAt)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="content-refresh")
+
+    def get(self, slug: str) -> str:
+        """Return cached HTML for ``slug``, fetching live only on a cold miss."""
+        with self._lock:
+            entry = self._lru.get(slug)
+            if entry:
+                self._lru.move_to_end(slug)
+        if entry is None:
+            doc = self.coll.find_one({"_id": slug}, {"content": 1, "fetchedAt": 1})
+            if doc:
+                entry = (doc.get("content") or "", doc.get("fetchedAt"))
+                self._remember(slug, *entry)
+        if entry is None:
+            content = self.fetch(slug)
+            if content:
+                self.store(slug, content)
+            return content
+
+        content, fetched_at = entry
+        if self.is_stale(fetched_at):
+            self.refresh_async(slug)
+        return content
+
+    def is_stale(self, fetched_at) -> bool:
+        return not fetched_at or datetime.utcnow() - fetched_at > self.ttl
+
+    def store(self, slug: str, content: str) -> None:
+        now = datetime.utcnow()
+        self.coll.update_one(
+            {"_id": slug},
+            {"$set": {"content": content, "hash": content_hash(content), "fetchedAt": now}},
+            upsert=True,
+        )
+        self._remember(slug, content, now)
+
+    def store_many(self, items: dict[str, str]) -> int:
+        """Upsert several ``{slug: content}`` entries with one bulk write."""
+        from pymongo import UpdateOne
+
+        now = datetime.utcnow()
+        ops = [
+            UpdateOne(
+                {"_id": slug},
+                {"$set": {"content": html, "hash": content_hash(html), "fetchedAt": now}},
+                upsert=True,
+            )
+            for slug, html in items.items()
+            if html
+        ]
+        if ops:
+            self.coll.bulk_write(ops, ordered=False)
+            for slug, html in items.items():
+                if html:
+                    self._remember(slug, html, now)
+        return len(ops)
+
+    def fresh_slugs(self, slugs: list[str]) -> set[str]:
+        """Subset of ``slugs`` that already have a non-stale stored entry."""
+        cutoff = datetime.utcnow() - self.ttl
+        return {
+            d["_id"]
+            for d in self.coll.find(
+                {"_id": {"$in": slugs}, "fetchedAt": {"$gte": cutoff}}, {"_id": 1}
+            )
+        }
+
+    def refresh_async(self, slug: str) -> None:
+        with self._lock:
+            if slug in self._refreshing:
+                return
+            self._refreshing.add(slug)
+        self._pool.submit(self._refresh, slug)
+
+    def _refresh(self, slug: str) -> None:
+        try:
+            content = self.fetch(slug)
+            if content:
+                self.store(slug, content)
+        except Exception as e:
+            self.log.warning("Content refresh failed for %s: %s", slug, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(slug)
+
+    def _remember(self, slug: str, content: str, fetched_at) -> None:
+        with self._lock:
+            self._lru[slug] = (content, fetched_at)
+            self._lru.move_to_end(slug)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
@@ -0,0 +1,459 @@
+"""
+Bulk ingest helpers shared by the dataset loaders.
+
+The per-row loader resolves every slug with its own ``find_one_and_update``
+and writes every ``company_questions`` row with its own ``replace_one``.
+The helpers here do the same work column-wise:
+
+    read_bucket_frame()        parse one CSV/Excel file into a tidy frame
+    parse_company_dir()        parse every bucket file of one company
+    resolve_company_ids()      one ``$in`` lookup + one ``insert_many``
+    resolve_question_ids()     batched ``$in`` lookups + one ``insert_many``
+    write_company_questions()  chunked ``bulk_write(ordered=False)``
+    sync_bucket_rows()         write only the rows of a bucket that changed
+    inspect_upload()           header and estimated row count of an upload
+    iter_upload_chunks()       stream an admin upload as bounded DataFrames
+    normalize_import_frame()   map one upload chunk onto the import columns
+
+``IdRegistry`` holds the name/slug → ObjectId maps shared by a whole load.
+Parsing touches no database state, so ``parse_company_dir`` can run in
+worker processes while a single writer resolves ids through the registry.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from pathlib import Path
+
+import pandas as pd
+from bson import ObjectId
+from pandas.errors import EmptyDataError
+from pymongo import DeleteMany, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+# ── Column variants accepted in the upstream dataset ────────────────────
+TITLE_COLUMNS = ("Title", "Question", "Problem")
+LINK_COLUMNS = ("Link", "URL", "url")
+FREQUENCY_COLUMNS = ("Frequency",)
+ACCEPTANCE_COLUMNS = ("Acceptance Rate", "AcceptanceRate", "Acceptance")
+DIFFICULTY_COLUMNS = ("Difficulty", "LeetDiff")
+
+# Columns of the frame returned by ``normalize_frame``
+FRAME_COLUMNS = ["title", "link", "slug", "frequency", "acceptanceRate", "leetDifficulty"]
+
+# Upper bound on values per ``$in`` query and ops per ``bulk_write``
+LOOKUP_CHUNK = 5_000
+WRITE_CHUNK = 1_000
+# Rows per chunk when streaming an admin upload
+IMPORT_CHUNK = 5_000
+
+
+def _chunks(seq: list, size: int):
+    for start in range(0, len(seq), size):
+        yield seq[start : start + size]
+
+
+def _first_present(df: pd.DataFrame, columns: tuple[str, ...]) -> pd.Series:
+    """Per row, the first non-empty value among ``columns`` (as text)."""
+    out = pd.Series("", index=df.index, dtype="object")
+    for col in reversed(columns):
+        if col not in df.columns:
+            continue
+        values = df[col].astype("string").str.strip().fillna("")
+        out = values.where(values != "", out)
+    return out.astype(str)
+
+
+def _first_number(df: pd.DataFrame, columns: tuple[str, ...]) -> pd.Series:
+    """Per row, the first numeric value among ``columns``; 0.0 if none."""
+    out = pd.Series(float("nan"), index=df.index, dtype="float64")
+    for col in reversed(columns):
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        out = values.where(values.notna() & (values != 0), out)
+    return out.fillna(0.0)
+
+
+def slugs_from_links(links: pd.Series) -> pd.Series:
+    """Vectorised ``slug_from_link``: strip trailing '/', drop query, last segment."""
+    return (
+        links.str.strip()
+        .str.replace(r"/+$", "", regex=True)
+        .str.split("?", n=1)
+        .str[0]
+        .str.rsplit("/", n=1)
+        .str[-1]
+    )
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map a raw dataset frame onto ``FRAME_COLUMNS``.
+    Rows without a link are dropped.
+    """
+    df = df.rename(columns=lambda c: str(c).strip())
+    out = pd.DataFrame(
+        {
+            "title": _first_present(df, TITLE_COLUMNS),
+            "link": _first_present(df, LINK_COLUMNS),
+            "frequency": _first_number(df, FREQUENCY_COLUMNS),
+            "acceptanceRate": _first_number(df, ACCEPTANCE_COLUMNS),
+            "leetDifficulty": _first_present(df, DIFFICULTY_COLUMNS)
+            .str.capitalize()
+            .str.strip(),
+        }
+    )
+    out = out[out["link"] != ""]
+    out["slug"] = slugs_from_links(out["link"])
+    return out[FRAME_COLUMNS].reset_index(drop=True)
+
+
+def read_bucket_frame(path: str | Path) -> pd.DataFrame | None:
+    """
+    Parse one bucket file (.csv | .xlsx | .xls) into a normalised frame.
+    Empty files give an empty frame; unreadable or unsupported files give ``None``.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    try:
+        if suffix == ".csv":
+            df = pd.read_csv(path)
+        elif suffix in (".xlsx", ".xls"):
+            df = pd.read_excel(path, engine="openpyxl")
+        else:
+            return None
+    except EmptyDataError:
+        df = pd.DataFrame()
+    except pd.errors.ParserError:
+        return None
+    return normalize_frame(df)
+
+
+def parse_company_dir(cpath: str | Path, bucket_map: dict) -> tuple[str, pd.DataFrame | None, list[str]]:
+    """
+    Parse every bucket file of one company folder.
+    Returns ``(company name, frame with a bucket column, unreadable file names)``;
+    the frame is ``None`` when no file could be read.
+    """
+    cpath = Path(cpath)
+    frames, skipped = [], []
+    for fname, bucket in bucket_map.items():
+        fpath = cpath / fname
+        if not fpath.exists():
+            continue
+        frame = read_bucket_frame(fpath)
+        if frame is None:
+            skipped.append(fname)
+            continue
+        frames.append(frame.assign(bucket=bucket))
+    if not frames:
+        return cpath.name, None, skipped
+    return cpath.name, pd.concat(frames, ignore_index=True), skipped
+
+
+class IdRegistry:
+    """
+    In-memory company name → ObjectId and slug → ObjectId maps for one load.
+    Owned by the writer stage, so ids are resolved exactly once per key.
+    """
+
+    def __init__(self):
+        self.companies: dict[str, ObjectId] = {}
+        self.questions: dict[str, ObjectId] = {}
+
+    def clear(self) -> None:
+        self.companies.clear()
+        self.questions.clear()
+
+    def company_ids(self, coll, names) -> dict:
+        return resolve_company_ids(coll, names, self.companies)
+
+    def question_ids(self, coll, frame: pd.DataFrame) -> pd.Series:
+        return resolve_question_ids(coll, frame, self.questions)
+
+
+def resolve_company_ids(coll, names, cache: dict | None = None) -> dict:
+    """
+    Return ``{name: ObjectId}`` for every name, creating missing companies
+    with a single ``insert_many``.
+    """
+    cache = {} if cache is None else cache
+    missing = sorted({n for n in names if n not in cache})
+    if missing:
+        for part in _chunks(missing, LOOKUP_CHUNK):
+            for doc in coll.find({"name": {"$in": part}}, {"name": 1}):
+                cache[doc["name"]] = doc["_id"]
+        new_docs = [{"_id": ObjectId(), "name": n} for n in missing if n not in cache]
+        _insert_new(coll, new_docs, "name", cache)
+    return {n: cache[n] for n in names}
+
+
+def resolve_question_ids(coll, frame: pd.DataFrame, cache: dict | None = None) -> pd.Series:
+    """
+    Return a Series of question ObjectIds aligned with ``frame``.
+
+    Existing questions are matched by slug or link (as the per-row loader
+    does); unseen slugs are inserted with the title/difficulty of their
+    first occurrence in ``frame``.
+    """
+    cache = {} if cache is None else cache
+    firsts = frame.drop_duplicates("slug", keep="first")
+    unseen = firsts[~firsts["slug"].isin(cache.keys())]
+
+    if not unseen.empty:
+        slugs = unseen["slug"].tolist()
+        links = unseen["link"].tolist()
+        by_link = {}
+        for s_part, l_part in zip(_chunks(slugs, LOOKUP_CHUNK), _chunks(links, LOOKUP_CHUNK)):
+            query = {"$or": [{"slug": {"$in": s_part}}, {"link": {"$in": l_part}}]}
+            for doc in coll.find(query, {"slug": 1, "link": 1}):
+                if doc.get("slug"):
+                    cache.setdefault(doc["slug"], doc["_id"])
+                if doc.get("link"):
+                    by_link[doc["link"]] = doc["_id"]
+
+        new_docs = []
+        for row in unseen.itertuples(index=False):
+            if row.slug in cache:
+                continue
+            if row.link in by_link:
+                cache[row.slug] = by_link[row.link]
+                continue
+            new_docs.append(
+                {
+                    "_id": ObjectId(),
+                    "link": row.link,
+                    "slug": row.slug,
+                    "title": row.title,
+                    "leetDifficulty": row.leetDifficulty,
+                }
+            )
+        _insert_new(coll, new_docs, "slug", cache, also=("link",))
+
+    return frame["slug"].map(cache)
+
+
+def _insert_new(coll, docs: list[dict], key: str, cache: dict, also: tuple[str, ...] = ()) -> None:
+    """
+    ``insert_many`` the given docs and record their ids in ``cache``.
+    Documents that lost a race with a concurrent writer are re-read by
+    ``key`` or any of the ``also`` fields, since the duplicate may be on
+    either unique index.
+    """
+    if not docs:
+        return
+    try:
+        coll.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        failed = [docs[err["index"]] for err in errors]
+        lost = {d[key] for d in failed}
+        for doc in docs:
+            if doc[key] not in lost:
+                cache[doc[key]] = doc["_id"]
+        fields = (key, *also)
+        query = {"$or": [{f: {"$in": sorted({d[f] for d in failed if d.get(f)})}} for f in fields]}
+        found = {f: {} for f in fields}
+        for doc in coll.find(query, {f: 1 for f in fields}):
+            for f in fields:
+                if doc.get(f):
+                    found[f][doc[f]] = doc["_id"]
+        for d in failed:
+            for f in fields:
+                if d.get(f) in found[f]:
+                    cache[d[key]] = found[f][d[f]]
+                    break
+        return
+    for doc in docs:
+        cache[doc[key]] = doc["_id"]
+
+
+def company_question_docs(frame: pd.DataFrame) -> list[dict]:
+    """
+    Build ``company_questions`` documents from a frame carrying
+    ``company_id``, ``bucket`` and ``question_id`` columns.
+    The last row wins for duplicate (company, bucket, question) keys.
+    """
+    keys = ["company_id", "bucket", "question_id"]
+    rows = frame.drop_duplicates(keys, keep="last")
+    return rows[keys + ["frequency", "acceptanceRate"]].to_dict("records")
+
+
+def write_company_questions(coll, docs: list[dict], chunk_size: int = WRITE_CHUNK) -> int:
+    """Upsert ``company_questions`` rows in unordered bulk writes of ``chunk_size``."""
+    written = 0
+    for part in _chunks(docs, chunk_size):
+        ops = [
+            ReplaceOne(
+                {
+                    "company_id": d["company_id"],
+                    "question_id": d["question_id"],
+                    "bucket": d["bucket"],
+                },
+                d,
+                upsert=True,
+            )
+            for d in part
+        ]
+        coll.bulk_write(ops, ordered=False)
+        written += len(ops)
+    return written
+
+
+def sync_bucket_rows(coll, company_id, bucket: str, docs: list[dict], chunk_size: int = WRITE_CHUNK) -> dict:
+    """
+    Make the ``(company_id, bucket)`` rows of ``company_questions`` equal
+    ``docs`` by diffing against what is stored: new rows are inserted,
+    rows whose stats changed are replaced, rows no longer present are deleted.
+    Returns ``{"inserted": n, "updated": n, "removed": n}``.
+    """
+    existing = {}
+    for doc in coll.find(
+        {"company_id": company_id, "bucket": bucket},
+        {"question_id": 1, "frequency": 1, "acceptanceRate": 1},
+    ):
+        existing.setdefault(doc["question_id"], doc)
+
+    ops, inserted, updated = [], 0, 0
+    wanted = set()
+    for d in docs:
+        wanted.add(d["question_id"])
+        old = existing.get(d["question_id"])
+        if old is None:
+            inserted += 1
+        elif (old.get("frequency"), old.get("acceptanceRate")) != (
+            d["frequency"],
+            d["acceptanceRate"],
+        ):
+            updated += 1
+        else:
+            continue
+        ops.append(
+            ReplaceOne(
+                {"company_id": company_id, "question_id": d["question_id"], "bucket": bucket},
+                d,
+                upsert=True,
+            )
+        )
+
+    stale = [qid for qid in existing if qid not in wanted]
+    for part in _chunks(stale, LOOKUP_CHUNK):
+        ops.append(
+            DeleteMany(
+                {"company_id": company_id, "bucket": bucket, "question_id": {"$in": part}}
+            )
+        )
+
+    for part in _chunks(ops, chunk_size):
+        coll.bulk_write(part, ordered=False)
+    return {"inserted": inserted, "updated": updated, "removed": len(stale)}
+
+
+def inspect_upload(stream, ext: str) -> tuple[set[str], int | None]:
+    """
+    Return ``(lower-cased column names, estimated data row count)`` of an
+    upload without parsing its rows, then rewind ``stream``. The CSV count
+    is a line count, so quoted multi-line cells make it an upper bound.
+    Excel counts come from the sheet's stored dimensions; when those are
+    missing (or claim no rows while data follows) the count is None,
+    unknown, and 0 only if there is no data row at all.
+    """
+    if ext == "csv":
+        columns = pd.read_csv(stream, nrows=0).columns
+        stream.seek(0)
+        lines, last = 0, b"\n"
+        for block in iter(lambda: stream.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+        lines += last != b"\n"  # final line without a newline
+        stream.seek(0)
+        return {str(c).strip().lower() for c in columns}, max(lines - 1, 0)
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        it = ws.iter_rows(values_only=True)
+        header = next(it, ())
+        rows = max(ws.max_row - 1, 0) if ws.max_row is not None else None
+        if not rows:
+            # Missing or stale dimensions: only the next row tells whether
+            # there is any data
+            rows = None if next(it, None) is not None else 0
+    finally:
+        wb.close()
+    stream.seek(0)
+    return {str(c or "").strip().lower() for c in header}, rows
+
+
+def iter_upload_chunks(stream, ext: str, chunksize: int = IMPORT_CHUNK):
+    """
+    Yield an uploaded CSV/Excel file as DataFrames of at most ``chunksize``
+    rows, with column names stripped and lower-cased. The file is never
+    loaded whole: CSV goes through ``read_csv(chunksize=...)`` and Excel
+    through openpyxl's read-only row iterator.
+    """
+    if ext == "csv":
+        for chunk in pd.read_csv(stream, chunksize=chunksize):
+            chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+            yield chunk
+        return
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c or "").strip().lower() for c in header]
+        while True:
+            block = list(islice(rows, chunksize))
+            if not block:
+                return
+            yield pd.DataFrame(block, columns=columns)
+    finally:
+        wb.close()
+
+
+def normalize_import_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    """
+    Map one upload chunk (lower-cased columns) onto
+    ``title, link, slug, company, bucket, frequency, acceptanceRate, leetDifficulty``.
+    Returns ``(frame, skipped)`` where ``skipped`` counts malformed rows.
+    """
+
+    def text(col):
+        if col not in df.columns:
+            return pd.Series("", index=df.index, dtype="object")
+        return df[col].astype("string").str.strip().fillna("").astype(str)
+
+    def number(col):
+        if col not in df.columns:
+            return pd.Series(0.0, index=df.index)
+        return pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+
+    link = text("link")
+    if "url" in df.columns:
+        link = link.where(link != "", text("url"))
+    diff = text("difficulty").str.capitalize().str.strip()
+    out = pd.DataFrame(
+        {
+            "title": text("title"),
+            "link": link,
+            "company": text("company"),
+            "bucket": text("bucket"),
+            "frequency": number("frequency"),
+            "acceptanceRate": number("acceptancerate"),
+            "leetDifficulty": diff.where(diff != "", None),
+        }
+    )
+    valid = (out[["title", "link", "company", "bucket"]] != "").all(axis=1)
+    out = out[valid].reset_index(drop=True)
+    out["slug"] = slugs_from_links(out["link"])
+    return out, int((~valid).sum())
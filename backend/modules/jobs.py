@@ -0,0 +1,271 @@
+"""
+Background jobs persisted in the ``jobs`` collection.
+
+    {_id, type, params, status, total, processed, failed, checkpoint,
+     result, error, attempts, owner, createdAt, startedAt, heartbeatAt, finishedAt}
+
+``status`` moves queued → running → done | failed. A running job whose
+heartbeat is older than ``LEASE_SECONDS`` belonged to a worker that died;
+it is claimed again and its handler resumes from ``checkpoint``.
+
+Handlers are registered with ``@job_handler("type")`` and receive a
+``JobContext``; an optional ``on_failure(params)`` runs once the job is
+marked failed, to release what it holds (such as a stored upload). Jobs
+execute on an in-process thread pool by default (``JOBS_BACKEND=thread``);
+with ``JOBS_BACKEND=worker`` the web process only enqueues and
+``python -m backend.worker`` runs them from the same collection.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+LEASE_SECONDS = 60
+POLL_SECONDS = 2.0
+MAX_ATTEMPTS = 3
+
+HANDLERS = {}
+FAILURE_HOOKS = {}
+
+log = logging.getLogger(__name__)
+
+
+def job_handler(job_type: str, on_failure=None):
+    """Register ``fn(ctx)`` as the handler for ``job_type``."""
+
+    def decorator(fn):
+        HANDLERS[job_type] = fn
+        if on_failure is not None:
+            FAILURE_HOOKS[job_type] = on_failure
+        return fn
+
+    return decorator
+
+
+class JobContext:
+    """Handle passed to a job handler for reading params and saving progress."""
+
+    def __init__(self, coll, doc: dict):
+        self.coll = coll
+        self.id = doc["_id"]
+        self.params = doc.get("params") or {}
+        self.total = doc.get("total")
+        self.checkpoint = doc.get("checkpoint")
+
+    def set_total(self, total: int) -> None:
+        self.total = total
+        self.coll.update_one({"_id": self.id}, {"$set": {"total": total}})
+
+    def progress(self, processed: int = 0, failed: int = 0, checkpoint=None, counts: dict | None = None) -> None:
+        """
+        Record a finished unit of work. Counters, handler-specific ``counts``
+        (added up under ``result``) and checkpoint are saved in one update,
+        so a resumed job never double-counts.
+        """
+        update = {
+            "$inc": {"processed": processed, "failed": failed}
+            | {f"result.{k}": v for k, v in (counts or {}).items()},
+            "$set": {"heartbeatAt": datetime.utcnow()},
+        }
+        if checkpoint is not None:
+            update["$set"]["checkpoint"] = checkpoint
+            self.checkpoint = checkpoint
+        self.coll.update_one({"_id": self.id}, update)
+
+
+def describe_job(doc: dict) -> dict:
+    """JSON view of a job with throughput (units/sec) and ETA (seconds)."""
+    processed = doc.get("processed", 0)
+    failed = doc.get("failed", 0)
+    total = doc.get("total")
+    started = doc.get("startedAt")
+    until = doc.get("finishedAt") or datetime.utcnow()
+
+    throughput = eta = None
+    if started:
+        elapsed = (until - started).total_seconds()
+        if elapsed > 0:
+            throughput = round((processed + failed) / elapsed, 2)
+    if doc.get("status") == "running" and throughput and total is not None:
+        eta = round(max(total - processed - failed, 0) / throughput, 1)
+
+    out = {
+        "id": str(doc["_id"]),
+        "type": doc.get("type"),
+        "status": doc.get("status"),
+        "total": total,
+        "processed": processed,
+        "failed": failed,
+        "throughput": throughput,
+        "eta": eta,
+        "createdAt": doc.get("createdAt"),
+        "startedAt": started,
+        "finishedAt": doc.get("finishedAt"),
+    }
+    if doc.get("result"):
+        out["result"] = doc["result"]
+    if doc.get("error"):
+        out["error"] = doc["error"]
+    return out
+
+
+class JobRunner:
+    """Claims jobs from ``coll`` and executes them on worker threads."""
+
+    def __init__(self, coll, workers: int = 2, logger=None):
+        self.coll = coll
+        self.workers = workers
+        self.log = logger or log
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._running = set()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    # ── Producer side ────────────────────────────────────────────────────
+    def submit(self, job_type: str, params: dict | None = None, total: int | None = None) -> str:
+        if job_type not in HANDLERS:
+            raise ValueError(f"Unknown job type '{job_type}'")
+        doc = {
+            "type": job_type,
+            "params": params or {},
+            "status": "queued",
+            "total": total,
+            "processed": 0,
+            "failed": 0,
+            "checkpoint": None,
+            "attempts": 0,
+            "createdAt": datetime.utcnow(),
+        }
+        job_id = self.coll.insert_one(doc).inserted_id
+        self._wake.set()
+        return str(job_id)
+
+    def get(self, job_id: str) -> dict | None:
+        try:
+            oid = ObjectId(job_id)
+        except (InvalidId, TypeError):
+            return None
+        return self.coll.find_one({"_id": oid})
+
+    # ── Consumer side ────────────────────────────────────────────────────
+    @property
+    def started(self) -> bool:
+        return bool(self._threads)
+
+    def start(self) -> None:
+        """Start worker and heartbeat threads (idempotent)."""
+        with self._lock:
+            if self._threads:
+                return
+            targets = [self._work_loop] * self.workers + [self._heartbeat_loop]
+            for target in targets:
+                t = threading.Thread(target=target, daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def run_forever(self) -> None:
+        """Blocking entry point for a standalone worker process."""
+        self.start()
+        try:
+            while not self._stop.wait(POLL_SECONDS):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+
+    def claim(self) -> dict | None:
+        """Atomically take the oldest queued (or orphaned running) job."""
+        now = datetime.utcnow()
+        return self.coll.find_one_and_update(
+            {
+                "type": {"$in": list(HANDLERS)},
+                "$or": [
+                    {"status": "queued"},
+                    {
+                        "status": "running",
+                        "heartbeatAt": {"$lt": now - timedelta(seconds=LEASE_SECONDS)},
+                    },
+                ],
+            },
+            {
+                "$set": {"status": "running", "owner": self.owner, "heartbeatAt": now},
+                "$min": {"startedAt": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("createdAt", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def execute(self, doc: dict) -> None:
+        job_id = doc["_id"]
+        if doc.get("attempts", 0) > MAX_ATTEMPTS:
+            self._fail(doc, "Gave up after repeated worker restarts")
+            return
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            HANDLERS[doc["type"]](JobContext(self.coll, doc))
+        except Exception as e:
+            self.log.exception("Job %s (%s) failed", job_id, doc["type"])
+            self._fail(doc, str(e) or e.__class__.__name__)
+        else:
+            self._finish(job_id, "done")
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def _fail(self, doc: dict, error: str) -> None:
+        self._finish(doc["_id"], "failed", error)
+        hook = FAILURE_HOOKS.get(doc["type"])
+        if hook is None:
+            return
+        try:
+            hook(doc.get("params") or {})
+        except Exception as e:
+            self.log.warning("Cleanup for failed job %s (%s) failed: %s", doc["_id"], doc["type"], e)
+
+    def _finish(self, job_id, status: str, error: str | None = None) -> None:
+        update = {"status": status, "finishedAt": datetime.utcnow()}
+        if error:
+            update["error"] = error
+        self.coll.update_one({"_id": job_id}, {"$set": update})
+
+    def _work_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                doc = self.claim()
+            except Exception as e:
+                self.log.warning("Job claim failed: %s", e)
+                doc = None
+            if doc:
+                self.execute(doc)
+                continue
+            self._wake.wait(POLL_SECONDS)
+            self._wake.clear()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(LEASE_SECONDS / 3):
+            with self._lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                self.coll.update_many(
+                    {"_id": {"$in": running}, "owner": self.owner},
+                    {"$set": {"heartbeatAt": datetime.utcnow()}},
+                )
+            except Exception as e:
+                self.log.warning("Job heartbeat failed: %s", e)
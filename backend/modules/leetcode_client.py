@@ -0,0 +1,464 @@
+"""
+HTTP clients for LeetCode (and other outbound APIs) with connection
+pooling, rate limiting, retries and a circuit breaker.
+
+Every request is made by one long-lived ``aiohttp.ClientSession`` per
+client, running on a shared background event loop:
+
+* bulk work (startup sync, backfill) awaits the ``a*`` coroutines through
+  ``client.run(...)`` and fans out concurrently;
+* request handlers use the blocking facade (``get``/``post``/``graphql``),
+  which submits the same coroutines to that loop and waits at most
+  ``request_deadline`` seconds, retrying at most ``request_retries`` times,
+  so a slow LeetCode cannot hold a web worker for the full backoff ladder.
+
+Each attempt first takes a token from a ``TokenBucket``; 429/5xx responses
+and connection errors are retried with full-jitter exponential backoff
+(``Retry-After`` wins when present), and consecutive failures open a
+``CircuitBreaker`` so a LeetCode outage fails fast instead of tying up
+workers.
+
+Questions are fetched in aliased GraphQL batches, so one round-trip returns
+tags and content for a whole batch:
+
+    query batch($s0: String!, $s1: String!) {
+      q0: question(titleSlug: $s0) { titleSlug content topicTags { name } }
+      q1: question(titleSlug: $s1) { titleSlug content topicTags { name } }
+    }
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import aiohttp
+
+PROB_API = "https://leetcode.com/api/problems/algorithms/"
+GRAPHQL_API = "https://leetcode.com/graphql"
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json, text/html",
+    "Referer": "https://leetcode.com/",
+    "Origin": "https://leetcode.com",
+}
+GRAPHQL_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Content-Type": "application/json",
+    "Referer": "https://leetcode.com/",
+}
+DEFAULT_BATCH_SIZE = 25
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+QUESTION_FIELDS = "titleSlug content topicTags { name }"
+
+log = logging.getLogger(__name__)
+
+# Retry cap for the current task, set by the blocking facade
+_RETRIES = contextvars.ContextVar("retries", default=None)
+
+
+class HTTPClientError(Exception):
+    """A request could not be completed (network error, retries exhausted)."""
+
+
+class CircuitOpenError(HTTPClientError):
+    """The circuit breaker is open; the request was not attempted."""
+
+
+class HTTPStatusError(HTTPClientError):
+    def __init__(self, status: int, url: str):
+        super().__init__(f"{status} error for url: {url}")
+        self.status = status
+
+
+class Response:
+    """Fully-read HTTP response, safe to use after the connection is released."""
+
+    def __init__(self, status_code: int, headers: dict, content: bytes, url: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content or b"null")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise HTTPStatusError(self.status_code, self.url)
+
+
+def build_batch_query(slugs: list[str]) -> tuple[str, dict]:
+    """Return ``(query, variables)`` fetching every slug under aliases q0..qN."""
+    params = ", ".join(f"$s{i}: String!" for i in range(len(slugs)))
+    selections = "\n".join(
+        f"  q{i}: question(titleSlug: $s{i}) {{ {QUESTION_FIELDS} }}"
+        for i in range(len(slugs))
+    )
+    query = f"query batch({params}) {{\n{selections}\n}}"
+    return query, {f"s{i}": slug for i, slug in enumerate(slugs)}
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (0-based)."""
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+def _retry_after(resp: Response | None) -> float | None:
+    if resp is None:
+        return None
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    ``rate`` tokens per second, holding at most ``burst``. Only touched from
+    the event loop thread, so it needs no lock. ``rate=None`` disables it.
+    """
+
+    def __init__(self, rate: float | None, burst: int | None = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate or 1)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        if not self.rate:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Opens after ``threshold`` consecutive failures; after ``reset_timeout``
+    seconds one trial request is let through (half-open) and its outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before(self) -> None:
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial):
+            raise CircuitOpenError("Circuit open; skipping request")
+        if state == "half-open":
+            self._trial = True
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self._trial or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self._trial = False
+
+
+class _BackgroundLoop:
+    """One event loop thread per process, started on first use (and again after fork)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+
+    def get(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                threading.Thread(
+                    target=self._loop.run_forever, name="http-loop", daemon=True
+                ).start()
+            return self._loop
+
+    def run(self, coro, timeout: float | None = None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.get())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            if future.done():
+                raise
+            future.cancel()
+            raise HTTPClientError(f"No response within {timeout:g}s") from None
+
+
+LOOP = _BackgroundLoop()
+
+
+class HttpClient:
+    """Pooled, rate-limited, retrying HTTP client on the shared event loop."""
+
+    def __init__(
+        self,
+        *,
+        headers: dict | None = None,
+        timeout: float = 10,
+        pool_size: int = 20,
+        max_concurrency: int = 10,
+        rate: float | None = None,
+        burst: int | None = None,
+        retries: int = 3,
+        request_retries: int = 1,
+        request_deadline: float = 15.0,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+    ):
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.request_retries = request_retries
+        self.request_deadline = request_deadline
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.limiter = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self._session = None
+        self._sem = None
+        self._pid = None
+
+    # ── Async API (runs on LOOP) ─────────────────────────────────────────
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._pid != os.getpid():
+            # DummyCookieJar: Set-Cookie from one user's LeetCode session
+            # must never be replayed on another user's request.
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._pid = os.getpid()
+        return self._session
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict | None = None,
+        params: dict | None = None,
+        json: dict | None = None,
+        cookies: dict | None = None,
+    ) -> Response:
+        """
+        Perform a request with rate limiting, retries and the circuit breaker.
+        Non-retryable HTTP errors are returned for the caller to inspect;
+        raises ``HTTPClientError`` when no response could be obtained.
+        """
+        session = self._ensure_session()
+        headers = dict(headers or {})
+        if cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+
+        retries = self.retries
+        if _RETRIES.get() is not None:
+            retries = min(retries, _RETRIES.get())
+        attempt = 0
+        while True:
+            self.breaker.before()
+            await self.limiter.acquire()
+            resp, error = None, None
+            try:
+                async with self._sem:
+                    async with session.request(
+                        method, url, headers=headers, params=params, json=json
+                    ) as r:
+                        body = await r.read()
+                        resp = Response(r.status, dict(r.headers), body, str(r.url))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+
+            if resp is not None and resp.status_code not in RETRY_STATUSES:
+                self.breaker.success()
+                return resp
+            self.breaker.failure()
+            if attempt >= retries or self.breaker.state != "closed":
+                if resp is not None:
+                    return resp
+                raise HTTPClientError(f"{method} {url} failed: {error!r}") from error
+
+            delay = _retry_after(resp)
+            if delay is None:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+            log.info(
+                "Retrying %s %s in %.2fs (%s)",
+                method, url, delay, resp.status_code if resp else repr(error),
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # ── Blocking facade ──────────────────────────────────────────────────
+    def run(self, coro):
+        """Run a coroutine of this client on the shared loop and wait for it."""
+        return LOOP.run(coro)
+
+    def call(self, coro):
+        """
+        ``run`` for request handlers: at most ``request_retries`` retries,
+        and ``HTTPClientError`` once ``request_deadline`` seconds have passed.
+        """
+        return LOOP.run(self._capped(coro), self.request_deadline)
+
+    async def _capped(self, coro):
+        _RETRIES.set(self.request_retries)
+        return await coro
+
+    def request(self, method: str, url: str, **kwargs) -> Response:
+        return self.call(self.arequest(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs) -> Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self.run(self.aclose())
+
+
+class LeetCodeClient(HttpClient):
+    """LeetCode problem-list and GraphQL API on top of ``HttpClient``."""
+
+    def __init__(
+        self,
+        graphql_url: str = GRAPHQL_API,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        problems_url: str = PROB_API,
+        **kwargs,
+    ):
+        kwargs.setdefault("headers", GRAPHQL_HEADERS)
+        super().__init__(**kwargs)
+        self.graphql_url = graphql_url
+        self.problems_url = problems_url
+        self.batch_size = max(1, batch_size)
+
+    # ── Async API ────────────────────────────────────────────────────────
+    async def agraphql_response(self, query: str, variables: dict | None = None) -> Response:
+        return await self.arequest(
+            "POST", self.graphql_url, json={"query": query, "variables": variables or {}}
+        )
+
+    async def agraphql(self, query: str, variables: dict | None = None) -> dict:
+        """POST one GraphQL document and return its ``data`` object."""
+        resp = await self.agraphql_response(query, variables)
+        resp.raise_for_status()
+        return resp.json().get("data") or {}
+
+    async def aproblem_list(self, session_cookie: str) -> Response:
+        return await self.arequest(
+            "GET",
+            self.problems_url,
+            headers=BROWSER_HEADERS,
+            cookies={"LEETCODE_SESSION": session_cookie},
+        )
+
+    async def asolved_slugs(self, session_cookie: str) -> set[str]:
+        """Slugs of accepted problems for the account behind ``session_cookie``."""
+        resp = await self.aproblem_list(session_cookie)
+        resp.raise_for_status()
+        return solved_from_problem_list(resp.json())
+
+    async def _fetch_batch(self, slugs: list[str]) -> dict[str, dict]:
+        query, variables = build_batch_query(slugs)
+        data = await self.agraphql(query, variables)
+        out = {}
+        for i, slug in enumerate(slugs):
+            q = data.get(f"q{i}")
+            if q:
+                out[slug] = {
+                    "tags": [t["name"] for t in q.get("topicTags") or []],
+                    "content": q.get("content") or "",
+                }
+        return out
+
+    async def afetch_questions(
+        self, slugs: list[str], return_failed: bool = False
+    ) -> dict[str, dict] | tuple[dict[str, dict], int]:
+        """
+        Fetch tags and content for ``slugs``, all batches concurrently.
+        Returns ``{slug: {"tags": [...], "content": str}}``; slugs LeetCode
+        does not know are omitted. Errors propagate unless ``return_failed``,
+        in which case ``(results, failed)`` is returned and ``failed``
+        counts slugs whose batch errored or that LeetCode did not return.
+        """
+        size = self.batch_size
+        batches = [slugs[i : i + size] for i in range(0, len(slugs), size)]
+        got = await asyncio.gather(
+            *(self._fetch_batch(b) for b in batches), return_exceptions=return_failed
+        )
+        out, failed = {}, 0
+        for batch, res in zip(batches, got):
+            if isinstance(res, BaseException):
+                log.warning("GraphQL batch of %d failed: %s", len(batch), res)
+                failed += len(batch)
+                continue
+            out.update(res)
+            failed += len(batch) - len(res)
+        return (out, failed) if return_failed else out
+
+    # ── Blocking facade ──────────────────────────────────────────────────
+    def graphql(self, query: str, variables: dict | None = None) -> dict:
+        return self.call(self.agraphql(query, variables))
+
+    def graphql_response(self, query: str, variables: dict | None = None) -> Response:
+        return self.call(self.agraphql_response(query, variables))
+
+    def problem_list(self, session_cookie: str) -> Response:
+        return self.call(self.aproblem_list(session_cookie))
+
+    def fetch_questions(self, slugs: list[str], return_failed: bool = False):
+        # Bulk work (backfill, prefetch): full retries, no overall deadline
+        return self.run(self.afetch_questions(slugs, return_failed))
+
+
+def solved_from_problem_list(payload: dict) -> set[str]:
+    pairs = (payload or {}).get("stat_status_pairs", [])
+    return {p["stat"]["question__title_slug"] for p in pairs if p.get("status") == "ac"}
@@ -12,6 +12,9 @@ Run:
     # activate venv first
     python backend/modules/loader_normalized.py            # default path = backend/data
     python backend/modules/loader_normalized.py /path/to/dataset
+
+Files already recorded in ``loader_manifest`` with the same size/mtime or
+SHA-256 are skipped; changed files only write the rows that differ.
 """
 
 import os
@@ -20,6 +23,16 @@ import pandas as pd
 from bson import ObjectId
 import re
 from backend.config import get_db
+from backend.modules.ingest import sync_bucket_rows
+from backend.modules.bitmaps import assign_ordinals
+from backend.modules.bucket_view import (
+    VIEW_STATE_KEY,
+    ensure_view_indexes,
+    rebuild,
+    sync_view_bucket,
+)
+from backend.modules.catalog import bump_catalog_version
+from backend.modules.manifest import Manifest
 
 # ── CSV bucket filenames → bucket key ───────────────────────────────────
 BUCKET_MAP = {
@@ -35,6 +48,9 @@ db = get_db()
 Q = db.questions  # canonical
 CO = db.companies
 CQ = db.company_questions
+MANIFEST = db.loader_manifest
+CATALOG_STATE = db.catalog_state
+VIEW = db.bucket_questions  # denormalized listing rows
 
 # ── Build indexes once ─────────────────────────────────────────────────
 Q.create_index("link", unique=True)
@@ -42,6 +58,7 @@ Q.create_index("slug", unique=True)
 CO.create_index("name", unique=True)
 CQ.create_index([("company_id", 1), ("bucket", 1)])
 CQ.create_index("question_id")
+ensure_view_indexes(VIEW)
 
 # ── Helper caches to minimise round-trips ──────────────────────────────
 company_id_cache = {}  # name  -> ObjectId
@@ -89,32 +106,45 @@ def get_question_id(link: str, title: str, leet_diff: str) -> ObjectId:
 
 
 # ── Loader main ────────────────────────────────────────────────────────
-def load_company_data(data_root: str | Path | None = None):
+def load_company_data(data_root: str | Path | None = None, full: bool = False):
     """
     Walk data_root/<Company>/*.csv and populate the normalized collections.
+    Pass ``full=True`` to re-read files the manifest marks as unchanged.
     """
     root = Path(data_root) if data_root else Path(__file__).parent.parent / "data"
     if not root.exists():
         raise FileNotFoundError(f"Data root '{root}' does not exist")
 
-    total_cq = 0
+    manifest = Manifest(MANIFEST, full=full)
+    seen = set()
+    total_cq = skipped = 0
     for company_dir in sorted(os.listdir(root)):
         cpath = root / company_dir
         if not cpath.is_dir():
             continue
 
-        print(f"→ Loading company: {company_dir}")
-        cid = get_company_id(company_dir)
-        batch = []
+        cid = None
+        synced = 0
 
         for fname, bucket in BUCKET_MAP.items():
             fpath = cpath / fname
             if not fpath.exists():
                 continue
 
+            state = manifest.check(company_dir, fname, fpath)
+            seen.add(state.key)
+            if not state.changed:
+                skipped += 1
+                continue
+
+            if cid is None:
+                print(f"→ Loading company: {company_dir}")
+                cid = get_company_id(company_dir)
+
             df = pd.read_csv(fpath)
             df.columns = [c.strip() for c in df.columns]
 
+            batch = {}
             for _, row in df.iterrows():
                 title = str(row.get("Title") or row.get("Question") or "").strip()
                 link = str(row.get("Link") or "").strip()
@@ -129,39 +159,47 @@ def load_company_data(data_root: str | Path | None = None):
 
                 qid = get_question_id(link, title, ldiff)
 
-                batch.append(
-                    {
-                        "company_id": cid,
-                        "question_id": qid,
-                        "bucket": bucket,
-                        "frequency": freq,
-                        "acceptanceRate": acc,
-                    }
-                )
-
-        if batch:
-            # Upsert each pair; replaceOne keeps stats idempotent
-            for doc in batch:
-                CQ.replace_one(
-                    {
-                        "company_id": doc["company_id"],
-                        "question_id": doc["question_id"],
-                        "bucket": doc["bucket"],
-                    },
-                    doc,
-                    upsert=True,
-                )
-        print(f"  ✔ added/updated {len(batch)} bucket rows")
-        total_cq += len(batch)
+                batch[qid] = {
+                    "company_id": cid,
+                    "question_id": qid,
+                    "bucket": bucket,
+                    "frequency": freq,
+                    "acceptanceRate": acc,
+                }
+
+            # Diff against stored rows: only new/changed rows are written
+            sync_bucket_rows(CQ, cid, bucket, list(batch.values()))
+            sync_view_bucket(VIEW, Q, cid, bucket, list(batch.values()))
+            manifest.record(state, company_dir, bucket, fpath, len(batch))
+            synced += len(batch)
+
+        if cid is not None:
+            print(f"  ✔ synced {synced} bucket rows")
+        total_cq += synced
+
+    for rec in manifest.missing(seen):
+        co = CO.find_one({"name": rec["company"]}, {"_id": 1})
+        if co:
+            sync_bucket_rows(CQ, co["_id"], rec["bucket"], [])
+            sync_view_bucket(VIEW, Q, co["_id"], rec["bucket"], [])
+        print(f"→ Removed vanished file: {rec['_id']}")
+        manifest.forget(rec["_id"])
+
+    if not CATALOG_STATE.find_one({"_id": VIEW_STATE_KEY, "status": "done"}):
+        rebuild(VIEW, CQ, Q, CATALOG_STATE)
+    assign_ordinals(Q, CATALOG_STATE)
+    bump_catalog_version(CATALOG_STATE)
 
     print("\n✅ Load complete")
     print("  companies         :", CO.count_documents({}))
     print("  questions         :", Q.count_documents({}))
     print("  company_questions :", CQ.count_documents({}))
     print(f"  rows processed    : {total_cq}")
+    print(f"  unchanged files   : {skipped}")
 
 
 if __name__ == "__main__":
     import sys
 
-    load_company_data(sys.argv[1] if len(sys.argv) > 1 else None)
+    args = [a for a in sys.argv[1:] if a != "--full"]
+    load_company_data(args[0] if args else None, full="--full" in sys.argv[1:])
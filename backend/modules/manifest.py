@@ -0,0 +1,98 @@
+"""
+Per-file manifest for incremental dataset reloads.
+
+Each ``<Company>/<bucket file>`` loaded into MongoDB gets one document in
+the ``loader_manifest`` collection:
+
+    {_id: "Amazon/5. All.csv", company, bucket, size, mtime_ns, sha256, rows, loadedAt}
+
+A file whose size and mtime match its record is skipped without being read;
+otherwise it is hashed, and only a changed hash makes the loader parse it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+HASH_BLOCK = 1 << 20
+
+
+def file_digest(path: str | Path) -> str:
+    """SHA-256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def manifest_key(company: str, fname: str) -> str:
+    return f"{company}/{fname}"
+
+
+@dataclass
+class FileState:
+    key: str
+    size: int
+    mtime_ns: int
+    sha256: str | None = None
+    changed: bool = True
+
+
+class Manifest:
+    """Read-through view of ``loader_manifest`` for one loader run."""
+
+    def __init__(self, coll, full: bool = False):
+        self.coll = coll
+        # full=True re-reads every file; the stored records are still loaded
+        # so files deleted since the last run show up in ``missing``
+        self.full = full
+        self.records = {d["_id"]: d for d in coll.find({})}
+
+    def check(self, company: str, fname: str, path: str | Path) -> FileState:
+        """Return the file's state; ``changed`` is False when it can be skipped."""
+        key = manifest_key(company, fname)
+        st = Path(path).stat()
+        state = FileState(key, st.st_size, st.st_mtime_ns)
+        rec = self.records.get(key)
+        if not rec or self.full:
+            return state
+        if rec.get("size") == state.size and rec.get("mtime_ns") == state.mtime_ns:
+            state.sha256 = rec.get("sha256")
+            state.changed = False
+            return state
+
+        state.sha256 = file_digest(path)
+        if state.sha256 == rec.get("sha256"):
+            # Touched but identical: refresh the fast-path fields only
+            state.changed = False
+            self.coll.update_one(
+                {"_id": key},
+                {"$set": {"size": state.size, "mtime_ns": state.mtime_ns}},
+            )
+        return state
+
+    def record(self, state: FileState, company: str, bucket: str, path, rows: int) -> None:
+        """Store the state of a file that was just loaded."""
+        doc = {
+            "company": company,
+            "bucket": bucket,
+            "size": state.size,
+            "mtime_ns": state.mtime_ns,
+            "sha256": state.sha256 or file_digest(path),
+            "rows": rows,
+            "loadedAt": datetime.utcnow(),
+        }
+        self.coll.update_one({"_id": state.key}, {"$set": doc}, upsert=True)
+        self.records[state.key] = {"_id": state.key, **doc}
+
+    def missing(self, seen_keys: set[str]) -> list[dict]:
+        """Records of previously loaded files that no longer exist."""
+        return [r for k, r in self.records.items() if k not in seen_keys]
+
+    def forget(self, key: str) -> None:
+        self.coll.delete_one({"_id": key})
+        self.records.pop(key, None)
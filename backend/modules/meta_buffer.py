@@ -0,0 +1,232 @@
+"""
+Writes to ``user_meta`` and the optional write-behind buffer in front of them.
+
+Every row of a (user, question) pair shares ``solved``, ``userDifficulty``
+and ``note``. A write names the *target* row it upserts and stamps with
+``updatedAt``: ``(company_id, bucket)`` from a bucket page, ``None`` for the
+first (generic) row. It then copies its fields to the user's other rows of
+that question, and a new bucket row starts with the question's solved
+flag. ``row_ops`` turns a sequence of writes into ``bulk_write`` operations
+and applies them to the rows read beforehand, which gives callers the
+resulting rows without reading them back.
+
+``MetaWriteBuffer`` lets callers acknowledge writes before they reach
+``user_meta``. Pending writes are kept per (user, question), with
+consecutive writes to the same target merged. A background thread flushes
+them every ``flush_ms`` milliseconds, or sooner once ``max_ops`` questions
+are pending. Each flush does one read of the affected rows and one ordered
+``bulk_write`` per user and chunk, after which ``on_flush(user_id,
+inserted)`` is called. Readers overlay ``pending()`` on what they read, so
+users see their own writes in this process.
+
+Writes are ordered only against other writes through the same buffer, so
+every writer of ``user_meta`` must go through one buffer in one process;
+a write made around it can be overwritten by an older buffered one.
+
+Durability: a write lives only in memory until the next flush, so a crash
+loses at most the last ``flush_ms`` of writes, plus one flush. ``stop()``
+flushes what is left and runs at interpreter exit. A failed flush puts its
+writes back and retries on the next tick.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+
+from pymongo import UpdateMany, UpdateOne
+
+try:
+    from .ingest import _chunks
+except ImportError:  # pragma: no cover - script execution
+    from ingest import _chunks
+
+SHARED_FIELDS = ("solved", "userDifficulty", "note")
+ROW_FIELDS = {"question_id": 1, "company_id": 1, "bucket": 1, **dict.fromkeys(SHARED_FIELDS, 1)}
+FLUSH_CHUNK = 500
+
+log = logging.getLogger(__name__)
+
+
+def target_row(rows: list[dict], target) -> dict | None:
+    """The row a write to ``target`` lands on, if it exists."""
+    if target is None:
+        return rows[0] if rows else None
+    company_id, bucket = target
+    return next((r for r in rows if r.get("company_id") == company_id and r.get("bucket") == bucket), None)
+
+
+def row_ops(user_id: str, question_id, match, writes, rows: list[dict]) -> tuple[list, int]:
+    """
+    Operations for ``writes`` (``[(target, fields, updated_at)]``, oldest
+    first) on the user's rows of one question; ``match`` is the
+    ``question_id`` filter. ``rows`` is updated in place to the state after
+    the writes. Returns the operations and how many rows they insert.
+    """
+    query_base = {"user_id": user_id, "question_id": match}
+    ops = []
+    inserted = 0
+    for target, fields, updated_at in writes:
+        bucket_fields = {} if target is None else {"company_id": target[0], "bucket": target[1]}
+        update = {"$set": fields | {"updatedAt": updated_at, "question_id": question_id} | bucket_fields}
+        row = target_row(rows, target)
+        if row is None:
+            seed = {}
+            if target is not None and "solved" not in fields and rows and "solved" in rows[0]:
+                seed["solved"] = rows[0]["solved"]
+                update["$setOnInsert"] = seed
+            row = bucket_fields | seed
+            rows.append(row)
+            inserted += 1
+        ops.append(UpdateOne(query_base | bucket_fields, update, upsert=True))
+        row.update(fields)
+        if fields and len(rows) > 1:
+            ops.append(UpdateMany(query_base, {"$set": fields | {"question_id": question_id}}))
+            for r in rows:
+                r.update(fields)
+    return ops, inserted
+
+
+class _Pending:
+    __slots__ = ("question_id", "writes")
+
+    def __init__(self, question_id):
+        self.question_id = question_id
+        self.writes = []
+
+
+class MetaWriteBuffer:
+    def __init__(self, coll, meta_ids, flush_ms: int = 200, max_ops: int = 500, on_flush=None, logger=None):
+        self.coll = coll
+        self.meta_ids = meta_ids
+        self.on_flush = on_flush
+        self.flush_ms = flush_ms
+        self.max_ops = max_ops
+        self.log = logger or log
+        self._pending = {}  # (user_id, str(question_id)) -> _Pending
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, user_id: str, question_id, target, fields: dict, updated_at) -> None:
+        key = (user_id, str(question_id))
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = _Pending(question_id)
+            last = entry.writes[-1] if entry.writes else None
+            if last is not None and last[0] == target:
+                entry.writes[-1] = (target, last[1] | fields, updated_at)
+            else:
+                entry.writes.append((target, fields, updated_at))
+            full = len(self._pending) >= self.max_ops
+        if full:
+            self._wake.set()
+
+    def writes(self, user_id: str, question_id) -> list:
+        """Writes to the question not yet visible in the database, oldest first."""
+        key = (user_id, str(question_id))
+        with self._lock:
+            return [w for source in (self._inflight, self._pending) if key in source for w in source[key].writes]
+
+    def pending(self, user_id: str, question_ids) -> dict:
+        """``{str(question_id): fields}`` of the writes not yet flushed."""
+        out = {}
+        with self._lock:
+            for qid in map(str, question_ids):
+                for source in (self._inflight, self._pending):
+                    entry = source.get((user_id, qid))
+                    if entry is not None:
+                        for _, fields, _ in entry.writes:
+                            out.setdefault(qid, {}).update(fields)
+        return out
+
+    def flush(self) -> int:
+        """Write everything pending; returns the number of operations sent."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return 0
+            by_user = {}
+            for (user_id, _), entry in batch.items():
+                by_user.setdefault(user_id, []).append(entry)
+            sent = 0
+            try:
+                for user_id, entries in by_user.items():
+                    for part in _chunks(entries, FLUSH_CHUNK):
+                        sent += self._write(user_id, part)
+            except Exception:
+                with self._lock:
+                    # Put the failed writes back ahead of any that came in since
+                    for key, entry in batch.items():
+                        newer = self._pending.get(key)
+                        if newer is not None:
+                            entry.writes += newer.writes
+                        self._pending[key] = entry
+                    self._inflight = {}
+                raise
+            with self._lock:
+                self._inflight = {}
+            return sent
+
+    def _write(self, user_id: str, entries: list[_Pending]) -> int:
+        rows = {}
+        for m in self.coll.find(
+            {"user_id": user_id, "question_id": self.meta_ids.match_many([e.question_id for e in entries])},
+            ROW_FIELDS,
+        ):
+            rows.setdefault(str(m["question_id"]), []).append(m)
+        ops = []
+        for e in entries:
+            ops += row_ops(
+                user_id,
+                e.question_id,
+                self.meta_ids.match(e.question_id),
+                e.writes,
+                rows.get(str(e.question_id), []),
+            )[0]
+        if ops:
+            # Ordered: a question's writes must land in the order they were made
+            res = self.coll.bulk_write(ops, ordered=True)
+            if self.on_flush is not None:
+                self.on_flush(user_id, res.upserted_count)
+        return len(ops)
+
+    # ── flusher thread ───────────────────────────────────────────────────
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the flusher and write what is still pending."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception:
+            self.log.exception("Final user_meta flush failed; pending writes are lost")
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_ms / 1000)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.log.warning("user_meta flush failed, will retry: %s", e)
@@ -0,0 +1,153 @@
+"""
+``user_meta.question_id`` stored as an ObjectId.
+
+It used to hold the question's hex string, so every join between
+``company_questions``/``questions`` and ``user_meta`` needed ``$expr`` with
+``$toString``/``$toObjectId``, which cannot use the ``(user_id,
+question_id)`` index. ``migrate`` converts existing documents in batches
+while the app keeps serving. Until it records completion in the
+``migrations`` collection
+
+    {_id: "user_meta.question_id", status: "running" | "done",
+     converted, invalid, startedAt, finishedAt}
+
+``MetaIds`` runs in compat mode: filters match either representation.
+Afterwards they become plain equality matches. Writes always store
+ObjectIds, converting the document they touch.
+
+    python -m backend.modules.meta_ids [--batch-size 1000] [--pause 0.05]
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+MIGRATION_ID = "user_meta.question_id"
+
+
+def to_oid(qid) -> ObjectId:
+    """ObjectId for a question id given as str or ObjectId (raises InvalidId)."""
+    return qid if isinstance(qid, ObjectId) else ObjectId(qid)
+
+
+class MetaIds:
+    """Builds ``user_meta.question_id`` filters for the current phase."""
+
+    def __init__(self, migrations, check_interval: float = 30.0):
+        self.migrations = migrations
+        self.check_interval = check_interval
+        self._done = False
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def compat(self) -> bool:
+        if self._done:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked >= self.check_interval:
+                doc = self.migrations.find_one({"_id": MIGRATION_ID}, {"status": 1})
+                self._done = (doc or {}).get("status") == "done"
+                self._checked = now
+        return not self._done
+
+    def match(self, qid):
+        oid = to_oid(qid)
+        return {"$in": [oid, str(oid)]} if self.compat else oid
+
+    def match_many(self, qids) -> dict:
+        oids = [to_oid(q) for q in qids]
+        if self.compat:
+            return {"$in": oids + [str(o) for o in oids]}
+        return {"$in": oids}
+
+
+def migrate(meta, migrations, batch_size: int = 1000, pause: float = 0.0, log=print) -> dict:
+    """
+    Convert string ``question_id`` values to ObjectId in ``_id`` order,
+    ``batch_size`` documents per bulk write, sleeping ``pause`` seconds
+    between batches. Passes repeat until one converts nothing, which picks
+    up rows written by processes still on the old code. Strings that are not
+    valid ids are left alone and counted as ``invalid``.
+    """
+    started = time.perf_counter()
+    migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"status": "running", "startedAt": datetime.utcnow()}},
+        upsert=True,
+    )
+    converted = invalid = 0
+    while True:
+        pass_converted = pass_invalid = 0
+        last_id = None
+        while True:
+            query = {"question_id": {"$type": "string"}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = list(meta.find(query, {"question_id": 1}).sort("_id", 1).limit(batch_size))
+            if not batch:
+                break
+            ops = []
+            for doc in batch:
+                try:
+                    oid = ObjectId(doc["question_id"])
+                except (InvalidId, TypeError):
+                    pass_invalid += 1
+                    continue
+                # Guarded on the old value so a concurrent write wins
+                ops.append(
+                    UpdateOne(
+                        {"_id": doc["_id"], "question_id": doc["question_id"]},
+                        {"$set": {"question_id": oid}},
+                    )
+                )
+            if ops:
+                pass_converted += meta.bulk_write(ops, ordered=False).modified_count
+            last_id = batch[-1]["_id"]
+            migrations.update_one(
+                {"_id": MIGRATION_ID},
+                {"$set": {"converted": converted + pass_converted}},
+            )
+            if pause:
+                time.sleep(pause)
+        converted += pass_converted
+        invalid = pass_invalid
+        log(f"  pass: converted {pass_converted}, invalid {pass_invalid}")
+        if not pass_converted:
+            break
+
+    migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {
+            "$set": {
+                "status": "done",
+                "converted": converted,
+                "invalid": invalid,
+                "finishedAt": datetime.utcnow(),
+            }
+        },
+    )
+    elapsed = time.perf_counter() - started
+    log(f"✅ user_meta.question_id migrated: {converted} converted, {invalid} invalid, {elapsed:.1f}s")
+    return {"converted": converted, "invalid": invalid, "seconds": elapsed}
+
+
+if __name__ == "__main__":
+    from backend.config import get_db
+
+    parser = argparse.ArgumentParser(description="Convert user_meta.question_id to ObjectId")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between batches")
+    args = parser.parse_args()
+
+    db = get_db()
+    db.user_meta.create_index([("question_id", 1), ("user_id", 1)])
+    migrate(db.user_meta, db.migrations, batch_size=args.batch_size, pause=args.pause)
@@ -0,0 +1,67 @@
+"""
+Keyset pagination helpers.
+
+A cursor is the sort key and id of the last row of a page, encoded as
+URL-safe base64 JSON so clients treat it as opaque. The next page is the
+rows strictly after that pair in ``(field, _id)`` order. On the
+``bucket_questions`` view an index on ``(company_id, bucket, field,
+question_id)`` can seek to it directly instead of skipping every earlier
+row the way ``$skip`` does; the ``company_questions`` join fallback still
+builds and sorts the whole bucket first, and only saves serializing the
+skipped rows. Missing/null sort values sort first ascending and last
+descending, matching MongoDB's ordering.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from binascii import Error as BinasciiError
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(field: str, value, last_id) -> str:
+    raw = json.dumps({"f": field, "v": value, "id": str(last_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, field: str) -> tuple:
+    """``(value, ObjectId)`` from a cursor issued for ``field``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        if data["f"] != field:
+            raise InvalidCursor("cursor was issued for a different sort")
+        return data["v"], ObjectId(data["id"])
+    except InvalidCursor:
+        raise
+    except (BinasciiError, ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursor("malformed cursor") from e
+
+
+def keyset_match(field: str, direction: int, value, last_id, id_field: str = "_id") -> dict:
+    """``$match`` for rows after ``(value, last_id)`` in ``{field: direction, id_field: direction}`` order."""
+    after = "$gt" if direction == 1 else "$lt"
+    same = {field: value, id_field: {after: last_id}}
+    if value is None:
+        # nulls come first ascending (everything non-null is after them)
+        # and last descending (only later nulls remain)
+        return {"$or": [{field: {"$ne": None}}, same]} if direction == 1 else same
+    branches = [{field: {after: value}}, same]
+    if direction == -1:
+        branches.append({field: None})
+    return {"$or": branches}
+
+
+def value_at(doc: dict, path: str):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
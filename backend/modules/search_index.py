@@ -0,0 +1,115 @@
+"""
+In-process question search over titles and slugs.
+
+Questions are kept in rank order (highest company frequency first, then
+title), so any list of positions sorted ascending is already ranked. The
+index holds the casefolded titles and slugs in sorted arrays for prefix
+lookups with ``bisect``, plus trigram postings for infix matches: a query's
+candidates are the intersection of its trigrams' postings, then checked
+with a substring test. Prefix hits rank before infix hits.
+
+It is rebuilt from the catalog snapshot whenever that reloads (loaders,
+imports and the tag backfill bump the catalog version).
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import namedtuple
+
+try:
+    from .catalog_snapshot import CatalogSnapshot, SnapshotView
+except ImportError:  # pragma: no cover - script execution
+    from catalog_snapshot import CatalogSnapshot, SnapshotView
+
+GRAM = 3
+
+_Snapshot = namedtuple("_Snapshot", "ids titles texts by_title by_slug postings")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def _prefixed(keys: list[tuple[str, int]], prefix: str) -> list[int]:
+    """Positions whose key starts with ``prefix`` in a sorted ``(key, pos)`` list."""
+    out = []
+    for key, pos in keys[bisect_left(keys, (prefix,)) :]:
+        if not key.startswith(prefix):
+            break
+        out.append(pos)
+    return out
+
+
+class SearchIndex(SnapshotView):
+    def __init__(self, snapshot: CatalogSnapshot):
+        super().__init__(snapshot)
+        self._snap = _Snapshot([], [], [], [], [], {})
+
+    def __len__(self) -> int:
+        return len(self._snap.ids)
+
+    def search(self, query: str, limit: int | None = None) -> list[tuple]:
+        """Ranked ``[(question_id, title)]`` whose title or slug contains ``query``."""
+        positions, snap = self._ranked(query)
+        if limit is not None:
+            positions = positions[:limit]
+        return [(snap.ids[p], snap.titles[p]) for p in positions]
+
+    def matching_ids(self, query: str) -> list:
+        """Every question id matching ``query``, in rank order."""
+        positions, snap = self._ranked(query)
+        return [snap.ids[p] for p in positions]
+
+    def _ranked(self, query: str) -> tuple[list[int], _Snapshot]:
+        self.refresh()
+        snap = self._snap
+        q = _normalize(query)
+        if not q:
+            return [], snap
+
+        prefix = set(_prefixed(snap.by_title, q))
+        prefix.update(_prefixed(snap.by_slug, q.replace(" ", "-")))
+
+        if len(q) >= GRAM:
+            lists = sorted((snap.postings.get(g, ()) for g in _grams(q)), key=len)
+            candidates = set(lists[0])
+            for other in lists[1:]:
+                candidates.intersection_update(other)
+                if not candidates:
+                    break
+        else:
+            candidates = range(len(snap.ids))
+        infix = [p for p in candidates if p not in prefix and q in snap.texts[p]]
+        return sorted(prefix) + sorted(infix), snap
+
+    def _build(self, catalog) -> None:
+        frequency = {}
+        for key, positions in catalog.members.items():
+            for pos, f in zip(positions, catalog.frequencies[key]):
+                if f is not None and (pos not in frequency or f > frequency[pos]):
+                    frequency[pos] = f
+        docs = [(pos, q) for pos, q in enumerate(catalog.questions) if q.title]
+        docs.sort(key=lambda pq: (-(frequency.get(pq[0]) or 0), _normalize(pq[1].title)))
+
+        ids, titles, texts, by_title, by_slug, postings = [], [], [], [], [], {}
+        for pos, (_, q) in enumerate(docs):
+            title = _normalize(q.title)
+            slug = (q.slug or "").casefold()
+            ids.append(q.id)
+            titles.append(q.title)
+            # Newline keeps trigrams from spanning title and slug
+            text = f"{title}\n{slug}"
+            texts.append(text)
+            by_title.append((title, pos))
+            if slug:
+                by_slug.append((slug, pos))
+            for g in _grams(text):
+                postings.setdefault(g, []).append(pos)
+        by_title.sort()
+        by_slug.sort()
+        self._snap = _Snapshot(ids, titles, texts, by_title, by_slug, postings)
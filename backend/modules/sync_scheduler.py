@@ -0,0 +1,283 @@
+"""
+LeetCode sync scheduler backed by the ``sync_queue`` collection, one
+document per user:
+
+    {_id: user_id, shard, status, priority, dueAt, requestedAt, owner,
+     leaseUntil, claimedAt, servedAt, finishedAt, lastResult, lastError,
+     attempts}
+
+* Coalescing: a request upserts the user's document (raising ``priority``,
+  pulling ``dueAt`` forward), so a burst of logins queues one sync. A
+  request that arrives while the user is being synced leaves the document
+  due, and exactly one follow-up run happens.
+* Ordering: idle documents are claimed by ``priority`` (manual > login >
+  periodic) and then by ``dueAt``; after a successful sync a user becomes
+  due again ``interval`` later, so the least recently synced go first.
+* Exactly once: claiming is an atomic ``find_one_and_update`` with a lease,
+  and a run whose process died is reclaimed once the lease expires.
+* Sharding: users are assigned ``crc32(user_id) % shards``; a process only
+  claims users in its ``shard_ids`` (all by default), so nodes can split the
+  user base while the workers of one node share it.
+* Concurrency: each process runs ``workers`` threads and will not claim
+  while ``max_running`` syncs hold live leases cluster-wide (a soft cap).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument, UpdateOne
+
+PRIORITY_PERIODIC = 0
+PRIORITY_LOGIN = 1
+PRIORITY_MANUAL = 2
+
+LEASE_SECONDS = 120
+POLL_SECONDS = 2.0
+RETRY_DELAY = timedelta(minutes=15)
+SEED_CHUNK = 1000
+NEVER = datetime(9999, 12, 31)  # dueAt when periodic syncs are disabled
+
+log = logging.getLogger(__name__)
+
+
+def shard_of(user_id: str, shards: int) -> int:
+    return zlib.crc32(user_id.encode("utf-8")) % max(1, shards)
+
+
+def _now() -> datetime:
+    # MongoDB keeps milliseconds; truncate so stored and local values compare
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+class SyncScheduler:
+    def __init__(
+        self,
+        coll,
+        sync_fn,
+        *,
+        shards: int = 1,
+        shard_ids: list[int] | None = None,
+        workers: int = 2,
+        max_running: int = 4,
+        interval: timedelta | None = timedelta(hours=24),
+        logger=None,
+    ):
+        self.coll = coll
+        # user_id -> number of solved questions, or None to drop the user
+        self.sync_fn = sync_fn
+        self.shards = max(1, shards)
+        self.shard_ids = sorted(set(shard_ids)) if shard_ids else list(range(self.shards))
+        self.workers = workers
+        self.max_running = max_running
+        self.interval = interval
+        self.log = logger or log
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    # ── Producer side ────────────────────────────────────────────────────
+    def request(self, user_id: str, priority: int = PRIORITY_LOGIN) -> datetime:
+        """Queue a sync for ``user_id``; returns the request timestamp."""
+        now = _now()
+        self.coll.update_one(
+            {"_id": user_id},
+            {
+                "$max": {"priority": priority},
+                "$min": {"dueAt": now},
+                "$set": {"requestedAt": now},
+                "$setOnInsert": {
+                    "shard": shard_of(user_id, self.shards),
+                    "status": "idle",
+                    "attempts": 0,
+                },
+            },
+            upsert=True,
+        )
+        self._wake.set()
+        return now
+
+    def seed(self, user_ids) -> int:
+        """Queue a periodic sync for users that have no queue entry yet."""
+        now, queued = _now(), 0
+        ops = []
+        for uid in user_ids:
+            ops.append(
+                UpdateOne(
+                    {"_id": uid},
+                    {
+                        "$setOnInsert": {
+                            "shard": shard_of(uid, self.shards),
+                            "status": "idle",
+                            "priority": PRIORITY_PERIODIC,
+                            "dueAt": now,
+                            "attempts": 0,
+                        }
+                    },
+                    upsert=True,
+                )
+            )
+            if len(ops) >= SEED_CHUNK:
+                queued += self.coll.bulk_write(ops, ordered=False).upserted_count
+                ops = []
+        if ops:
+            queued += self.coll.bulk_write(ops, ordered=False).upserted_count
+        self._wake.set()
+        return queued
+
+    def wait(self, user_id: str, requested_at: datetime, timeout: float) -> dict | None:
+        """
+        Block until a run that covers the request made at ``requested_at``
+        has finished; returns the queue document, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            doc = self.coll.find_one({"_id": user_id})
+            if doc and doc.get("servedAt") and doc["servedAt"] >= requested_at:
+                return doc
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.25)
+
+    # ── Consumer side ────────────────────────────────────────────────────
+    @property
+    def started(self) -> bool:
+        return bool(self._threads)
+
+    def start(self, seed_from=None) -> None:
+        """
+        Start the worker threads (idempotent). ``seed_from`` returns the ids
+        of all linked users; it is consumed in the background by ``seed``.
+        """
+        with self._lock:
+            if self._threads:
+                return
+            targets = [self._work_loop] * self.workers
+            if seed_from is not None:
+                targets.append(lambda: self._seed_safely(seed_from))
+            for target in targets:
+                t = threading.Thread(target=target, daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def run_forever(self, seed_from=None) -> None:
+        """Blocking entry point for a standalone worker process."""
+        self.start(seed_from)
+        try:
+            while not self._stop.wait(POLL_SECONDS):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+
+    def _seed_safely(self, seed_from) -> None:
+        try:
+            queued = self.seed(seed_from())
+        except Exception as e:
+            self.log.warning("Sync queue seeding failed: %s", e)
+        else:
+            if queued:
+                self.log.info("Queued %d users for periodic sync", queued)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def claim(self) -> dict | None:
+        """Atomically take the most urgent due user in this process's shards."""
+        now = _now()
+        live = {"status": "running", "leaseUntil": {"$gt": now}}
+        if self.max_running and self.coll.count_documents(live) >= self.max_running:
+            return None
+        return self.coll.find_one_and_update(
+            {
+                "shard": {"$in": self.shard_ids},
+                "$or": [
+                    {"status": "idle", "dueAt": {"$lte": now}},
+                    {"status": "running", "leaseUntil": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "owner": self.owner,
+                    "claimedAt": now,
+                    "leaseUntil": now + timedelta(seconds=LEASE_SECONDS),
+                }
+            },
+            sort=[("priority", -1), ("dueAt", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def execute(self, doc: dict) -> None:
+        user_id = doc["_id"]
+        claimed_request = doc.get("requestedAt")
+        try:
+            result = self.sync_fn(user_id)
+        except Exception as e:
+            self.log.warning("Sync failed for %s: %s", user_id, e)
+            error = getattr(e, "description", None) or str(e) or e.__class__.__name__
+            self._finish(doc, claimed_request, None, error)
+            return
+        if result is None:
+            # No longer linked to LeetCode
+            self.coll.delete_one({"_id": user_id, "owner": self.owner})
+            return
+        self._finish(doc, claimed_request, result, None)
+
+    def _finish(self, doc: dict, claimed_request, result, error) -> None:
+        now = _now()
+        update = {
+            "status": "idle",
+            "finishedAt": now,
+            "servedAt": claimed_request or doc.get("claimedAt"),
+            "lastResult": result,
+            "lastError": error,
+        }
+        if error:
+            retry_at = now + RETRY_DELAY
+            reschedule = {"priority": PRIORITY_PERIODIC, "dueAt": retry_at}
+            inc = {"attempts": 1}
+        else:
+            update["lastSyncAt"] = now
+            reschedule = {
+                "priority": PRIORITY_PERIODIC,
+                "dueAt": now + self.interval if self.interval else NEVER,
+                "attempts": 0,
+            }
+            inc = {}
+
+        # No request arrived during the run: schedule the next periodic sync
+        unchanged = (
+            {"requestedAt": {"$lte": claimed_request}}
+            if claimed_request
+            else {"requestedAt": {"$exists": False}}
+        )
+        ops = {"$set": update | reschedule}
+        if inc:
+            ops["$inc"] = inc
+        res = self.coll.update_one({"_id": doc["_id"], "owner": self.owner, **unchanged}, ops)
+        if not res.matched_count:
+            # A newer request is waiting: stay due so it runs once more
+            self.coll.update_one({"_id": doc["_id"], "owner": self.owner}, {"$set": update})
+
+    def _work_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                doc = self.claim()
+            except Exception as e:
+                self.log.warning("Sync claim failed: %s", e)
+                doc = None
+            if doc:
+                self.execute(doc)
+                continue
+            self._wake.wait(POLL_SECONDS)
+            self._wake.clear()
@@ -0,0 +1,66 @@
+"""
+Fingerprint of each user's last synced LeetCode solved set, so a sync only
+writes problems solved since the previous one.
+
+    sync_state: {_id: user_id, solved: [sorted question ids], syncedAt}
+
+A question the user un-marks by hand is pulled from the fingerprint, so the
+next sync marks it solved again (as a full re-sync always did).
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+
+
+class SyncMetrics:
+    """Process-wide counters for LeetCode syncs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.syncs = 0
+        self.unchanged = 0
+        self.writes = 0
+        self.writes_avoided = 0
+
+    def record(self, written: int, avoided: int) -> None:
+        with self._lock:
+            self.syncs += 1
+            self.unchanged += written == 0
+            self.writes += written
+            self.writes_avoided += avoided
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "syncs": self.syncs,
+                "unchanged": self.unchanged,
+                "writes": self.writes,
+                "writesAvoided": self.writes_avoided,
+            }
+
+
+class SyncState:
+    def __init__(self, coll):
+        self.coll = coll
+
+    def previous(self, user_id: str) -> set[str]:
+        doc = self.coll.find_one({"_id": user_id}, {"solved": 1})
+        return set((doc or {}).get("solved") or [])
+
+    def record(self, user_id: str, solved: set[str]) -> None:
+        self.coll.update_one(
+            {"_id": user_id},
+            {
+                "$set": {
+                    "solved": sorted(solved),
+                    "syncedAt": datetime.utcnow(),
+                }
+            },
+            upsert=True,
+        )
+
+    def forget(self, user_id: str, question_ids: list[str]) -> None:
+        """Drop question ids the user marked unsolved from the fingerprint."""
+        self.coll.update_one({"_id": user_id}, {"$pull": {"solved": {"$in": question_ids}}})
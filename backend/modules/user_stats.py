@@ -0,0 +1,137 @@
+"""
+Per-user statistics kept as counters.
+
+``user_stats`` holds one document per user:
+
+    {_id: user_id, totalSolved, totalAttempted,
+     difficulty: {Easy, Medium, Hard}, companies: {<company_id>: solved},
+     catalogVersion, rev, updatedAt}
+
+``totalSolved``, ``difficulty`` and ``companies`` count solved questions
+(a company counts the ones in its ``All`` bucket); ``totalAttempted``
+counts ``user_meta`` rows. Meta writers call ``apply`` with the ordinals
+whose solved bit flipped (``SolvedBitmaps.update`` returns them) and how
+many ``user_meta`` rows they inserted, which becomes one ``$inc``; reading
+a user's stats is then a single document fetch.
+
+Difficulty and company counts depend on the catalog, so increments only
+apply to a document built for the current catalog version. Older ones are
+rebuilt on their next read. ``reconcile`` recomputes a user from
+``user_meta`` and reports which counters had drifted.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+try:
+    from .bitmaps import ordinals_of
+except ImportError:  # pragma: no cover - script execution
+    from bitmaps import ordinals_of
+
+LEVELS = ("Easy", "Medium", "Hard")
+REBUILD_RETRIES = 3
+
+
+class StatsCounters:
+    def __init__(self, coll, user_meta, catalog, solved):
+        self.coll = coll
+        self.user_meta = user_meta
+        self.catalog = catalog
+        self.solved = solved
+
+    def get(self, user_id: str) -> dict:
+        """The user's counters, built from scratch if missing or stale."""
+        self.catalog.refresh()
+        doc = self.coll.find_one({"_id": user_id})
+        if doc is None or doc.get("catalogVersion") != self.catalog.version:
+            doc = self._rebuild(user_id, doc)
+        return doc
+
+    def apply(self, user_id: str, flipped=(), solved: bool = True, inserted: int = 0) -> None:
+        """Count questions whose solved flag flipped and newly inserted meta rows."""
+        inc = {}
+        if flipped:
+            sign = 1 if solved else -1
+            levels, companies = self.catalog.breakdown(flipped)
+            inc["totalSolved"] = sign * len(flipped)
+            inc.update({f"difficulty.{level}": sign * n for level, n in levels.items()})
+            inc.update({f"companies.{co}": sign * n for co, n in companies.items()})
+        if inserted:
+            inc["totalAttempted"] = inserted
+        if not inc:
+            return
+        # A missing or stale document is rebuilt on read, so leave it alone
+        self.coll.update_one(
+            {"_id": user_id, "catalogVersion": self.catalog.version},
+            {"$inc": inc | {"rev": 1}, "$set": {"updatedAt": datetime.utcnow()}},
+        )
+
+    def compute(self, user_id: str, from_meta: bool = False) -> dict:
+        """
+        Counters from scratch. The solved set comes from the user's bitmap,
+        or from ``user_meta`` itself when ``from_meta`` is set.
+        """
+        self.catalog.refresh()
+        if from_meta:
+            qids = self.user_meta.distinct("question_id", {"user_id": user_id, "solved": True})
+            ords = sorted(set(self.catalog.ordinals(qids)))
+        else:
+            ords = ordinals_of(self.solved.get(user_id)).tolist()
+        levels, companies = self.catalog.breakdown(ords)
+        return {
+            "totalSolved": len(ords),
+            "totalAttempted": self.user_meta.count_documents({"user_id": user_id}),
+            "difficulty": {level: levels.get(level, 0) for level in LEVELS},
+            "companies": {str(co): n for co, n in companies.items()},
+            "catalogVersion": self.catalog.version,
+        }
+
+    def reconcile(self, user_id: str) -> dict:
+        """
+        Rewrite the user's document from ``user_meta``. Returns
+        ``{counter: [stored, actual]}`` for every counter that disagreed;
+        documents that were missing or built for another catalog version
+        are rebuilt without reporting drift.
+        """
+        stored = self.coll.find_one({"_id": user_id})
+        fresh = self.compute(user_id, from_meta=True)
+        drift = {}
+        if stored and stored.get("catalogVersion") == fresh["catalogVersion"]:
+            for field in ("totalSolved", "totalAttempted"):
+                if stored.get(field, 0) != fresh[field]:
+                    drift[field] = [stored.get(field), fresh[field]]
+            for group in ("difficulty", "companies"):
+                old, new = stored.get(group) or {}, fresh[group]
+                for key in sorted(old.keys() | new.keys()):
+                    if old.get(key, 0) != new.get(key, 0):
+                        drift[f"{group}.{key}"] = [old.get(key), new.get(key)]
+        self.coll.replace_one(
+            {"_id": user_id},
+            fresh | {"rev": (stored or {}).get("rev", 0) + 1, "updatedAt": datetime.utcnow()},
+            upsert=True,
+        )
+        return drift
+
+    def _rebuild(self, user_id: str, stored: dict | None) -> dict:
+        # ``rev`` moves with every increment: only replace the document we
+        # read, so an increment landing mid-compute is not overwritten
+        for _ in range(REBUILD_RETRIES):
+            fresh = self.compute(user_id)
+            if stored is None:
+                doc = {"_id": user_id, **fresh, "rev": 0, "updatedAt": datetime.utcnow()}
+                try:
+                    self.coll.insert_one(doc)
+                    return doc
+                except DuplicateKeyError:
+                    pass
+            else:
+                doc = {**fresh, "rev": stored.get("rev", 0) + 1, "updatedAt": datetime.utcnow()}
+                if self.coll.replace_one({"_id": user_id, "rev": stored.get("rev")}, doc).matched_count:
+                    return {"_id": user_id, **doc}
+            stored = self.coll.find_one({"_id": user_id})
+            if stored is not None and stored.get("catalogVersion") == fresh["catalogVersion"]:
+                return stored
+        return {"_id": user_id, **fresh}
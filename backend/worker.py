@@ -0,0 +1,19 @@
+# backend/worker.py  – standalone background job worker
+# to run
+# python -m backend.worker
+#
+# Claims jobs from the `jobs` collection (admin import, tag backfill) and
+# resumes any job whose previous worker stopped heartbeating; also runs the
+# LeetCode sync queue. Pair it with JOBS_BACKEND=worker on the web processes
+# so they only enqueue.
+
+try:
+    from .app import JOBS, SYNC, _linked_user_ids, app
+except ImportError:  # Allow running as a script
+    from app import JOBS, SYNC, _linked_user_ids, app
+
+
+if __name__ == "__main__":
+    app.logger.info("Job worker %s started", JOBS.owner)
+    JOBS.start()
+    SYNC.run_forever(seed_from=_linked_user_ids)
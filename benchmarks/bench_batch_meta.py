@@ -0,0 +1,110 @@
+"""
+Latency of ``PATCH /api/questions/batch-meta`` for 10, 100 and 1,000 ids,
+marking questions solved/unsolved from the global list and noting them
+from a company bucket page (which also keeps the user's other bucket rows
+in step).
+
+The script seeds and then drops ``questions``, ``companies``,
+``company_questions``, ``user_meta``, ``user_bitmaps`` and ``user_stats``
+in the database named in the URI, so point it at a scratch database:
+
+    BENCH_MONGODB_URI=mongodb://localhost:27017/leetease_bench \\
+        python -m benchmarks.bench_batch_meta --requests 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+SIZES = (10, 100, 1000)
+COLLECTIONS = ("questions", "companies", "company_questions", "user_meta", "user_bitmaps", "user_stats")
+
+
+def seed(db, questions: int, user_id: str) -> list[str]:
+    qids = db.questions.insert_many(
+        [
+            {"slug": f"bench-{i}", "link": f"https://leetcode.com/problems/bench-{i}/", "title": f"Bench {i}"}
+            for i in range(questions)
+        ]
+    ).inserted_ids
+    for name in ("BenchCo", "OtherCo"):
+        co = db.companies.insert_one({"name": name}).inserted_id
+        db.company_questions.insert_many([{"company_id": co, "bucket": "All", "question_id": q} for q in qids])
+    # Half the questions already have a row from another company's page
+    other = db.companies.find_one({"name": "OtherCo"})["_id"]
+    db.user_meta.insert_many(
+        [
+            {"user_id": user_id, "question_id": q, "company_id": other, "bucket": "All", "solved": False}
+            for q in qids[::2]
+        ]
+    )
+    return [str(q) for q in qids]
+
+
+def timed_batches(client, headers: dict, bodies: list[dict]) -> list[float]:
+    out = []
+    for body in bodies:
+        started = time.perf_counter()
+        resp = client.patch("/api/questions/batch-meta", json=body, headers=headers)
+        out.append((time.perf_counter() - started) * 1000)
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+    return out
+
+
+def report(label: str, samples: list[float]) -> None:
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    print(f"{label:<32} p50 {statistics.median(samples):8.1f} ms   p95 {p95:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--questions", type=int, default=3000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    uri = os.getenv("BENCH_MONGODB_URI")
+    if not uri:
+        sys.exit("Set BENCH_MONGODB_URI to a scratch database")
+    os.environ["MONGODB_URI"] = uri
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("JWT_SECRET_KEY", "bench")
+    os.environ.setdefault("DISABLE_INTEGRITY_CHECK", "1")
+    os.environ.setdefault("JOBS_BACKEND", "worker")
+
+    from flask_jwt_extended import create_access_token
+
+    from backend import app as app_module
+    from backend.config import ensure_indexes
+
+    db = app_module.db
+    for name in COLLECTIONS:
+        db[name].drop()
+    ensure_indexes(db)
+
+    user_id = "bench-user"
+    qids = seed(db, max(args.questions, max(SIZES)), user_id)
+    app_module.app.config["WTF_CSRF_ENABLED"] = False
+    with app_module.app.app_context():
+        token = create_access_token(identity=user_id)
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app_module.app.test_client()
+
+    print(f"{len(qids)} questions, {len(qids[::2])} existing user_meta rows, {args.requests} requests per size")
+    for size in SIZES:
+        ids = qids[:size]
+        client.patch("/api/questions/batch-meta", json={"ids": ids, "solved": True}, headers=headers)  # warm-up
+        solved = [{"ids": ids, "solved": i % 2 == 0} for i in range(args.requests)]
+        report(f"{size:>5} ids, solved", timed_batches(client, headers, solved))
+        noted = [
+            {"ids": ids, "note": f"n{i}", "company": "BenchCo", "bucket": "All"} for i in range(args.requests)
+        ]
+        report(f"{size:>5} ids, note from bucket", timed_batches(client, headers, noted))
+
+    for name in COLLECTIONS:
+        db[name].drop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Offline throughput of question fetching against the local GraphQL stub:
+one request per question (the old backfill path) versus aliased batches,
+driven from a thread pool or fanned out on the client's event loop.
+
+    python -m benchmarks.bench_graphql --questions 3000 --latency 0.05
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.modules.leetcode_client import LeetCodeClient
+from tests.graphql_stub import GraphQLStub
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--questions", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--threads", type=int, default=5)
+    args = parser.parse_args()
+
+    slugs = [f"problem-{i}" for i in range(args.questions)]
+    with GraphQLStub(latency=args.latency) as stub:
+        single = LeetCodeClient(graphql_url=stub.url, batch_size=1)
+        batched = LeetCodeClient(graphql_url=stub.url, batch_size=args.batch_size)
+
+        def run(client):
+            size = client.batch_size
+            parts = [slugs[i : i + size] for i in range(0, len(slugs), size)]
+            with ThreadPoolExecutor(max_workers=args.threads) as pool:
+                list(pool.map(client.fetch_questions, parts))
+
+        stub.requests = 0
+        t_single = timed(lambda: run(single))
+        n_single = stub.requests
+        stub.requests = 0
+        t_batched = timed(lambda: run(batched))
+        n_batched = stub.requests
+        stub.requests = 0
+        t_async = timed(lambda: batched.fetch_questions(slugs))
+        n_async = stub.requests
+        single.close()
+        batched.close()
+
+    print(f"{args.questions} questions, {args.latency * 1000:.0f} ms/request, {args.threads} threads")
+    print(f"per-question : {n_single:>5} requests  {t_single:6.2f}s  {args.questions / t_single:8.0f} q/s")
+    print(f"batched ({args.batch_size:>2}) : {n_batched:>5} requests  {t_batched:6.2f}s  {args.questions / t_batched:8.0f} q/s")
+    print(f"async fan-out: {n_async:>5} requests  {t_async:6.2f}s  {args.questions / t_async:8.0f} q/s")
+    print(f"speedup: {t_single / t_batched:.1f}x (threads), {t_single / t_async:.1f}x (async)")
+
+
+if __name__ == "__main__":
+    main()
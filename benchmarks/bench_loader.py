@@ -0,0 +1,102 @@
+"""
+Compare the per-row and bulk paths of ``loader_normalised.load_company_data``
+on a synthetic dataset (500 companies × 5 buckets by default).
+
+The loader writes to the database named in the URI, and this script empties
+``questions``, ``companies``, ``company_questions`` and ``loader_manifest``
+between runs, so point it at a scratch database:
+
+    BENCH_MONGODB_URI=mongodb://localhost:27017/leetease_bench \\
+        python -m benchmarks.bench_loader --companies 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+BUCKET_SIZES = {
+    "1. Thirty Days.csv": 20,
+    "2. Three Months.csv": 50,
+    "3. Six Months.csv": 80,
+    "4. More Than Six Months.csv": 120,
+    "5. All.csv": 200,
+}
+DIFFICULTIES = ("EASY", "MEDIUM", "HARD")
+
+
+def make_dataset(root: Path, companies: int, pool_size: int, seed: int = 7) -> int:
+    """Write ``companies`` folders of bucket CSVs; return the row count."""
+    rng = random.Random(seed)
+    pool = [f"synthetic-problem-{i}" for i in range(pool_size)]
+    rows = 0
+    for c in range(companies):
+        cdir = root / f"Company {c:04d}"
+        cdir.mkdir(parents=True)
+        for fname, size in BUCKET_SIZES.items():
+            lines = ["Difficulty,Title,Frequency,Acceptance Rate,Link,Topics"]
+            for slug in rng.sample(pool, size):
+                lines.append(
+                    f"{rng.choice(DIFFICULTIES)},{slug.replace('-', ' ').title()},"
+                    f"{rng.uniform(0, 100):.1f},{rng.random():.4f},"
+                    f"https://leetcode.com/problems/{slug},\"Array, String\""
+                )
+            (cdir / fname).write_text("\n".join(lines) + "\n")
+            rows += size
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--companies", type=int, default=500)
+    parser.add_argument("--pool", type=int, default=3000)
+    parser.add_argument(
+        "--workers", type=int, default=0, help="also time bulk mode with N parsers"
+    )
+    args = parser.parse_args()
+
+    uri = os.getenv("BENCH_MONGODB_URI")
+    if not uri:
+        sys.exit("Set BENCH_MONGODB_URI to a scratch database")
+    os.environ["MONGODB_URI"] = uri
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("JWT_SECRET_KEY", "bench")
+
+    from backend.modules import loader_normalised as loader
+
+    def reset():
+        for coll in (loader.Q, loader.CO, loader.CQ, loader.MANIFEST):
+            coll.delete_many({})
+        loader.REGISTRY.clear()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        rows = make_dataset(root, args.companies, args.pool)
+        print(f"dataset: {args.companies} companies, {rows} rows\n")
+
+        results = {}
+        for mode in ("row", "bulk"):
+            reset()
+            results[mode] = loader.load_company_data(root, mode=mode)
+        # Second bulk run over unchanged files: manifest fast path only
+        results["rerun"] = loader.load_company_data(root, mode="bulk")
+        if args.workers > 1:
+            reset()
+            results[f"bulk/{args.workers}"] = loader.load_company_data(
+                root, mode="bulk", workers=args.workers
+            )
+        reset()
+
+    row = results["row"]
+    print("\nmode      seconds   rows/sec   speedup")
+    for mode, r in results.items():
+        print(
+            f"{mode:<9} {r['seconds']:>7.2f}   {r['rows_per_sec']:>8,.0f}"
+            f"   {row['seconds'] / r['seconds']:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
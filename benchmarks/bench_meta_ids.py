@@ -0,0 +1,124 @@
+"""
+Latency of ``GET /api/companies/<company>/buckets/All/questions`` before and
+after the ``user_meta.question_id`` ObjectId migration, for one user with
+2,000 meta rows. Each page reads the user's meta rows for its question ids;
+before the migration that filter matches both the ObjectId and its string,
+afterwards it is a plain ``$in`` on the ``(user_id, question_id)`` index.
+
+The script seeds and then drops ``questions``, ``companies``,
+``company_questions``, ``user_meta`` and ``migrations`` in the database named
+in the URI, so point it at a scratch database:
+
+    BENCH_MONGODB_URI=mongodb://localhost:27017/leetease_bench \\
+        python -m benchmarks.bench_meta_ids --meta-rows 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BUCKETS = ("30Days", "3Months", "6Months", "MoreThan6Months", "All")
+
+
+def seed(db, questions: int, rows_per_bucket: int, meta_rows: int, user_id: str, seed: int = 7):
+    rng = random.Random(seed)
+    qids = db.questions.insert_many(
+        [
+            {"slug": f"bench-{i}", "link": f"https://leetcode.com/problems/bench-{i}/", "title": f"Bench {i}"}
+            for i in range(questions)
+        ]
+    ).inserted_ids
+    co = db.companies.insert_one({"name": "BenchCo"}).inserted_id
+    db.company_questions.insert_many(
+        [
+            {"company_id": co, "bucket": b, "question_id": q, "frequency": rng.random()}
+            for b in BUCKETS
+            for q in rng.sample(qids, rows_per_bucket)
+        ]
+    )
+    db.user_meta.insert_many(
+        [
+            {"user_id": user_id, "question_id": str(q), "solved": rng.random() < 0.6}
+            | ({"company_id": co, "bucket": "All"} if rng.random() < 0.5 else {})
+            for q in rng.sample(qids, meta_rows)
+        ]
+    )
+
+
+def timed_requests(client, url: str, headers: dict, n: int) -> list[float]:
+    out = []
+    for _ in range(n):
+        started = time.perf_counter()
+        resp = client.get(url, headers=headers)
+        out.append((time.perf_counter() - started) * 1000)
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+    return out
+
+
+def report(label: str, samples: list[float]) -> None:
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    print(f"{label:<28} p50 {statistics.median(samples):8.1f} ms   p95 {p95:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--questions", type=int, default=3000)
+    parser.add_argument("--rows-per-bucket", type=int, default=400)
+    parser.add_argument("--meta-rows", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    uri = os.getenv("BENCH_MONGODB_URI")
+    if not uri:
+        sys.exit("Set BENCH_MONGODB_URI to a scratch database")
+    os.environ["MONGODB_URI"] = uri
+    os.environ.setdefault("SECRET_KEY", "bench")
+    os.environ.setdefault("JWT_SECRET_KEY", "bench")
+    os.environ.setdefault("DISABLE_INTEGRITY_CHECK", "1")
+    os.environ.setdefault("JOBS_BACKEND", "worker")
+
+    from flask_jwt_extended import create_access_token
+
+    from backend import app as app_module
+    from backend.config import ensure_indexes
+    from backend.modules.meta_ids import migrate
+
+    db = app_module.db
+    collections = ("questions", "companies", "company_questions", "user_meta", "migrations")
+    for name in collections:
+        db[name].drop()
+    ensure_indexes(db)
+
+    user_id = "bench-user"
+    seed(db, args.questions, args.rows_per_bucket, args.meta_rows, user_id)
+    with app_module.app.app_context():
+        token = create_access_token(identity=user_id)
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app_module.app.test_client()
+    url = f"/api/companies/BenchCo/buckets/All/questions?limit={args.page_size}"
+
+    print(
+        f"{args.rows_per_bucket * len(BUCKETS)} company_questions rows, "
+        f"{args.meta_rows} user_meta rows, {args.page_size} per page, {args.requests} requests"
+    )
+    client.get(url, headers=headers)  # warm-up
+    before = timed_requests(client, url, headers, args.requests)
+    report("before (string or ObjectId)", before)
+
+    migrate(db.user_meta, db.migrations, log=lambda *_: None)
+    app_module.META_IDS._checked = 0.0  # pick up the finished migration now
+    client.get(url, headers=headers)
+    after = timed_requests(client, url, headers, args.requests)
+    report("after (ObjectId)", after)
+    print(f"speedup: {statistics.median(before) / statistics.median(after):.1f}x (p50)")
+
+    for name in collections:
+        db[name].drop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Latency of the in-process question search on a synthetic catalog: every
+typeahead prefix of a few hundred real-looking queries, as the suggestions
+box would send them while a user types. Needs no database.
+
+    python -m benchmarks.bench_search --questions 3500
+"""
+
+import argparse
+import random
+import statistics
+import time
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+from backend.modules.catalog_snapshot import CatalogSnapshot
+from backend.modules.search_index import SearchIndex
+
+WORDS = (
+    "two sum path tree binary search linked list reverse merge interval "
+    "array string substring longest palindrome matrix graph island course "
+    "schedule cache design word break coin change stock buy sell maximum "
+    "minimum subarray product kth largest element valid parentheses"
+).split()
+
+
+def catalog(n: int, rng: random.Random) -> list[dict]:
+    docs = []
+    for i in range(n):
+        title = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(2, 5)))
+        title = f"{title} {i}" if rng.random() < 0.3 else title
+        slug = "-".join(title.lower().split()) + f"-{i}"
+        docs.append({"_id": ObjectId(), "title": title, "slug": slug})
+    return docs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--questions", type=int, default=3500)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    docs = catalog(args.questions, rng)
+    companies, questions, cq, state = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+    companies.find.return_value = [{"_id": "c1", "name": "Acme"}]
+    questions.find.return_value = docs
+    cq.find.return_value = [
+        {"company_id": "c1", "bucket": "All", "question_id": d["_id"], "frequency": rng.random()} for d in docs
+    ]
+    state.find_one.return_value = {"version": 1}
+    index = SearchIndex(CatalogSnapshot(companies, questions, cq, state, check_interval=3600))
+
+    started = time.perf_counter()
+    index.refresh(force=True)
+    print(f"{len(index)} questions indexed in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    samples = []
+    for _ in range(args.queries):
+        phrase = rng.choice(docs)["title"].lower()
+        # infix queries start mid-title
+        if rng.random() < 0.5:
+            phrase = phrase[rng.randint(0, len(phrase) // 2) :]
+        for end in range(1, len(phrase) + 1):
+            started = time.perf_counter()
+            index.search(phrase[:end], args.limit)
+            samples.append((time.perf_counter() - started) * 1000)
+
+    q = statistics.quantiles(samples, n=100)
+    print(
+        f"{len(samples)} keystrokes: p50 {statistics.median(samples):.3f} ms   "
+        f"p99 {q[98]:.3f} ms   max {max(samples):.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -107,6 +107,21 @@ export function backfillTags() {
   return api.post('/api/admin/backfill-tags');
 }
 
+// Import and backfill run as background jobs (202 + jobId)
+export function fetchJob(jobId) {
+  return api.get(`/api/jobs/${jobId}`);
+}
+
+// Poll a job until it finishes; onProgress receives each status snapshot.
+export async function waitForJob(jobId, onProgress, intervalMs = 1500) {
+  for (;;) {
+    const { data } = await fetchJob(jobId);
+    if (onProgress) onProgress(data);
+    if (data.status === 'done' || data.status === 'failed') return data;
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 // ───────────────────────────────
 // Company / Progress
 // ───────────────────────────────
@@ -5,7 +5,7 @@ import ReactDOM from 'react-dom'
 import { Link } from 'react-router-dom'
 import { useAuth } from '../context/AuthContext'
 import { useTheme } from '../context/ThemeContext'
-import { backfillTags } from '../api'
+import { backfillTags, waitForJob } from '../api'
 import { extractErrorMessage } from '../utils/error'
 import { emitGlobalError } from '../context/ErrorToastContext'
 
@@ -157,8 +157,11 @@ export default function Navbar({
     closeMenu()
     setIsBackfilling(true)
     try {
-      await backfillTags()
-      emitGlobalError('Tag backfill completed successfully.')
+      const { data } = await backfillTags()
+      const job = await waitForJob(data.jobId)
+      if (job.status === 'done') {
+        emitGlobalError('Tag backfill completed successfully.')
+      }
     } catch (err) {
       emitGlobalError(
         extractErrorMessage(err) || 'Backfill failed. Please try again.'
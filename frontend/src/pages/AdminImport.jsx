@@ -1,6 +1,6 @@
 // src/pages/AdminImport.jsx
 import React, { useState } from 'react';
-import { uploadQuestions, backfillTags } from '../api';
+import { uploadQuestions, backfillTags, waitForJob } from '../api';
 import { extractErrorMessage } from '../utils/error';
 
 export default function AdminImport() {
@@ -10,6 +10,13 @@ export default function AdminImport() {
   const [isBackfilling, setIsBackfilling] = useState(false);
 
   // ─── Handlers ─────────────────────────────────────────────────────────
+  const showProgress = (label) => (job) => {
+    if (job.status !== 'running') return;
+    const done = job.processed + job.failed;
+    const eta = job.eta != null ? `, ~${Math.ceil(job.eta)}s left` : '';
+    setMessage(`${label}… ${done}${job.total != null ? ` / ${job.total}` : ''}${eta}`);
+  };
+
   const onFileChange = (e) => {
     setFile(e.target.files[0] ?? null);
     setMessage('');
@@ -24,8 +31,13 @@ export default function AdminImport() {
 
     setIsUploading(true);
     try {
-      const { data } = await uploadQuestions(file);  // uses FormData internally
-      const { imported = 0, skipped = 0 } = data;
+      const { data: queued } = await uploadQuestions(file);  // uses FormData internally
+      const job = await waitForJob(queued.jobId, showProgress('Importing'));
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Import failed.');
+      }
+      const imported = job.processed;
+      const skipped = job.failed;
 
       let msg = `${imported} question${imported === 1 ? '' : 's'} imported successfully.`;
       if (skipped > 0) {
@@ -48,8 +60,14 @@ export default function AdminImport() {
     setIsBackfilling(true);
     setMessage('');
     try {
-      await backfillTags();
-      setMessage('Tag backfill completed successfully.');
+      const { data: queued } = await backfillTags();
+      const job = await waitForJob(queued.jobId, showProgress('Backfilling tags'));
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Backfill failed.');
+      }
+      setMessage(
+        `Tag backfill completed successfully (${job.processed} updated, ${job.failed} failed).`
+      );
     } catch (err) {
       setMessage(
         extractErrorMessage(err) || 'Backfill failed. Please try again.'
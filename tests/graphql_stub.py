@@ -0,0 +1,81 @@
+"""
+Local stand-in for the LeetCode GraphQL endpoint, for offline tests and
+benchmarks. Understands aliased ``question(titleSlug: $var)`` selections
+as produced by ``backend.modules.leetcode_client.build_batch_query`` and the
+single-question queries used by ``backend.app``.
+
+    with GraphQLStub(latency=0.02) as stub:
+        client = LeetCodeClient(graphql_url=stub.url)
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SELECTION = re.compile(r"(?:(\w+)\s*:\s*)?question\(titleSlug:\s*\$(\w+)\)")
+
+
+def fake_question(slug):
+    return {
+        "titleSlug": slug,
+        "content": f"<p>Problem {slug}</p>",
+        "topicTags": [{"name": "Array"}, {"name": slug.split("-")[0].title()}],
+    }
+
+
+class GraphQLStub:
+    def __init__(self, latency=0.0, unknown_prefix="missing-"):
+        self.latency = latency
+        self.unknown_prefix = unknown_prefix
+        self.requests = 0
+        self.fail_next = 0  # answer this many requests with fail_status
+        self.fail_status = 429
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, payload = stub.handle(json.loads(body or b"{}"))
+                out = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/graphql"
+
+    def handle(self, payload):
+        with self._lock:
+            self.requests += 1
+            failing = self.fail_next > 0
+            self.fail_next -= failing
+        if failing:
+            return self.fail_status, {"errors": [{"message": "stub failure"}]}
+        if self.latency:
+            time.sleep(self.latency)
+        variables = payload.get("variables") or {}
+        data = {}
+        for alias, var in SELECTION.findall(payload.get("query", "")):
+            slug = variables.get(var, "")
+            q = None if slug.startswith(self.unknown_prefix) else fake_question(slug)
+            data[alias or "question"] = q
+        return 200, {"data": data}
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,115 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.bitmaps import (
+    CatalogBitmaps,
+    SolvedBitmaps,
+    difference,
+    from_ordinals,
+    intersect,
+    ordinals_of,
+    popcount,
+    set_bits,
+)
+from backend.modules.catalog_snapshot import CatalogSnapshot
+
+QIDS = [ObjectId() for _ in range(12)]
+
+
+class BitHelperTests(unittest.TestCase):
+    def test_set_and_clear(self):
+        bits = from_ordinals([0, 7, 8, 11], 12)
+        self.assertEqual(ordinals_of(bits).tolist(), [0, 7, 8, 11])
+        set_bits(bits, [7, 99], False)
+        self.assertEqual(ordinals_of(bits).tolist(), [0, 8, 11])
+
+    def test_and_and_not_pad_shorter_operand(self):
+        members = from_ordinals([1, 2, 10], 12)
+        solved = from_ordinals([2], 3)
+        self.assertEqual(popcount(intersect(members, solved)), 1)
+        self.assertEqual(ordinals_of(difference(members, solved)).tolist(), [1, 10])
+
+
+def catalog():
+    companies = MagicMock()
+    companies.find.return_value = [{'_id': 'c1', 'name': 'Acme'}, {'_id': 'c2', 'name': 'Globex'}]
+    questions = MagicMock()
+    questions.find.return_value = [
+        {
+            '_id': q,
+            'ordinal': i,
+            'leetDifficulty': 'easy' if i % 2 else 'Hard',
+            'tags': ['Array'] + (['Graph'] if i < 2 else []),
+        }
+        for i, q in enumerate(QIDS)
+    ]
+    cq = MagicMock()
+    cq.find.return_value = [
+        {'company_id': 'c1', 'bucket': 'All', 'question_id': q} for q in QIDS[:6]
+    ] + [{'company_id': 'c2', 'bucket': 'All', 'question_id': QIDS[10]}]
+    state = MagicMock()
+    state.find_one.return_value = {'version': 1}
+    return CatalogBitmaps(CatalogSnapshot(companies, questions, cq, state))
+
+
+class CatalogBitmapsTests(unittest.TestCase):
+    def test_membership_and_difficulty(self):
+        cat = catalog()
+        self.assertEqual(popcount(cat.bucket('c1', 'All')), 6)
+        self.assertEqual(popcount(cat.bucket('c1', '30Days')), 0)
+        self.assertEqual(set(cat.buckets('All')), {'c1', 'c2'})
+        self.assertEqual(popcount(cat.difficulty()['Easy']), 6)
+        self.assertEqual(cat.ids(cat.bucket('c2', 'All')), [QIDS[10]])
+
+    def test_tag_histogram_per_bucket(self):
+        cat = catalog()
+        self.assertEqual(cat.tag_histogram('c1', 'All'), [('Array', 6), ('Graph', 2)])
+        self.assertEqual(cat.tag_histogram('c2', 'All'), [('Array', 1)])
+        self.assertEqual(popcount(cat.tags()['Graph']), 2)
+
+    def test_breakdown_by_difficulty_and_company(self):
+        levels, companies = catalog().breakdown([0, 1, 10])
+        self.assertEqual(levels, {'Hard': 2, 'Easy': 1})
+        self.assertEqual(companies, {'c1': 2, 'c2': 1})
+
+
+class SolvedBitmapsTests(unittest.TestCase):
+    def setUp(self):
+        self.coll = MagicMock()
+        self.coll.find_one.return_value = None
+        self.meta = MagicMock()
+        self.meta.distinct.return_value = [str(QIDS[0]), QIDS[3]]
+        self.bits = SolvedBitmaps(self.coll, self.meta, catalog())
+
+    def test_cold_build_from_user_meta(self):
+        solved = self.bits.get('u1')
+        self.assertEqual(ordinals_of(solved).tolist(), [0, 3])
+        doc = self.coll.insert_one.call_args.args[0]
+        self.assertEqual(doc['version'], 1)
+        self.meta.distinct.assert_called_once_with('question_id', {'user_id': 'u1', 'solved': True})
+
+    def test_update_is_compare_and_set_on_version(self):
+        self.bits.get('u1')
+        self.coll.update_one.return_value.matched_count = 1
+        self.assertEqual(self.bits.update('u1', [QIDS[5], QIDS[0]], True), [5])
+        (query, update), _ = self.coll.update_one.call_args
+        self.assertEqual(query, {'_id': 'u1', 'version': 1})
+        self.assertEqual(update['$inc'], {'version': 1})
+        stored = np.frombuffer(update['$set']['bits'], dtype=np.uint8)
+        self.assertEqual(ordinals_of(stored).tolist(), [0, 3, 5])
+        self.assertEqual(ordinals_of(self.bits.get('u1')).tolist(), [0, 3, 5])
+
+    def test_noop_update_skips_write(self):
+        self.assertEqual(self.bits.update('u1', [QIDS[0]], True), [])
+        self.coll.update_one.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.bucket_view import BucketView, _drop_orphans, view_docs
+
+
+class ViewDocsTests(unittest.TestCase):
+    def test_embeds_question_fields_and_drops_orphans(self):
+        q1, gone, co = ObjectId(), ObjectId(), ObjectId()
+        questions = MagicMock()
+        questions.find.return_value = [
+            {'_id': q1, 'title': 'Two Sum', 'slug': 'two-sum', 'tags': ['Array']}
+        ]
+        rows = [
+            {'company_id': co, 'bucket': 'All', 'question_id': q1, 'frequency': 3.0, 'acceptanceRate': 0.5},
+            {'company_id': co, 'bucket': 'All', 'question_id': gone, 'frequency': 1.0, 'acceptanceRate': 0.1},
+        ]
+        (doc,) = view_docs(questions, rows)
+        self.assertEqual(doc['title'], 'Two Sum')
+        self.assertEqual(doc['tags'], ['Array'])
+        self.assertEqual(doc['frequency'], 3.0)
+        self.assertIsNone(doc['leetDifficulty'])
+
+
+class RebuildTests(unittest.TestCase):
+    def test_keeps_unstamped_rows_that_still_have_a_source(self):
+        q1, q2, q3, co = ObjectId(), ObjectId(), ObjectId(), ObjectId()
+        view = MagicMock()
+        view.find.return_value = [
+            {'_id': 1, 'company_id': co, 'bucket': 'All', 'question_id': q1},  # written by a loader meanwhile
+            {'_id': 2, 'company_id': co, 'bucket': '30Days', 'question_id': q1},  # source row deleted
+            {'_id': 3, 'company_id': co, 'bucket': 'All', 'question_id': q2},  # question deleted
+            {'_id': 4, 'company_id': co, 'bucket': 'All', 'question_id': q3},
+        ]
+        view.delete_many.return_value.deleted_count = 2
+        cq = MagicMock()
+        cq.find.return_value = [
+            {'company_id': co, 'bucket': 'All', 'question_id': q} for q in (q1, q2, q3)
+        ]
+        questions = MagicMock()
+        questions.find.return_value = [{'_id': q1}, {'_id': q3}]
+
+        self.assertEqual(_drop_orphans(view, cq, questions, 'run', 100), 2)
+        view.delete_many.assert_called_once_with({'_id': {'$in': [2, 3]}})
+
+class BucketViewTests(unittest.TestCase):
+    def test_falls_back_to_join_until_built(self):
+        view, cq, state = MagicMock(), MagicMock(), MagicMock()
+        state.find_one.return_value = None
+        source = BucketView(view, cq, state, check_interval=0)
+        match = {'company_id': 'c1', 'bucket': 'All'}
+
+        coll, pipeline = source.rows(match)
+        self.assertIs(coll, cq)
+        self.assertIn('$lookup', pipeline[2])
+
+        state.find_one.return_value = {'status': 'done'}
+        coll, pipeline = source.rows(match)
+        self.assertIs(coll, view)
+        self.assertEqual(pipeline, [{'$match': match}])
+
+    def test_count_uses_view_query_with_tag(self):
+        view, cq, state = MagicMock(), MagicMock(), MagicMock()
+        state.find_one.return_value = {'status': 'done'}
+        view.count_documents.return_value = 7
+        source = BucketView(view, cq, state, check_interval=0)
+        match = {'company_id': 'c1', 'bucket': 'All'}
+
+        self.assertEqual(source.count(match, 'Array'), 7)
+        view.count_documents.assert_called_once_with(match | {'tags': 'Array'})
+        view.aggregate.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.cache import Cache, LRUCache
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(max_entries=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual((lru.get('a'), lru.get('c')), (1, 3))
+
+    def test_entries_expire(self):
+        lru = LRUCache(ttl=0.01)
+        lru.set('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(lru.get('a'))
+
+
+class CacheTests(unittest.TestCase):
+    def test_concurrent_misses_compute_once(self):
+        cache = Cache(LRUCache())
+        calls = []
+        gate = threading.Event()
+
+        def compute():
+            calls.append(1)
+            gate.wait(1)
+            return {'n': 1}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'n': 1}] * 8)
+
+    def test_invalidate_forces_recompute(self):
+        cache = Cache(LRUCache())
+        values = iter([1, 2])
+        self.assertEqual(cache.get_or_compute('k', lambda: next(values)), 1)
+        self.assertEqual(cache.get_or_compute('k', lambda: next(values)), 1)
+        cache.invalidate('k')
+        self.assertEqual(cache.get_or_compute('k', lambda: next(values)), 2)
+
+
+    def test_invalidate_during_compute_is_not_lost(self):
+        cache = Cache(LRUCache())
+
+        def stale():
+            # A write lands while the old value is being computed
+            cache.invalidate('k')
+            return 'old'
+
+        self.assertEqual(cache.get_or_compute('k', stale), 'old')
+        self.assertIsNone(cache.get('k'))
+        self.assertEqual(cache.get_or_compute('k', lambda: 'new'), 'new')
+        self.assertEqual(cache.get('k'), 'new')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.catalog import CatalogResponses, SlugIndex
+
+
+class FakeQuestions:
+    def __init__(self):
+        self.docs = []
+        self.queries = []
+
+    def add(self, slug=None, link=None):
+        doc = {'_id': ObjectId(), 'slug': slug, 'link': link}
+        self.docs.append(doc)
+        return str(doc['_id'])
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        lower = query.get('_id', {}).get('$gt')
+        return [d for d in self.docs if lower is None or d['_id'] > lower]
+
+
+class SlugIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.questions = FakeQuestions()
+        self.state = MagicMock()
+        self.state.find_one.return_value = {'version': 1}
+        self.index = SlugIndex(self.questions, self.state, check_interval=0)
+
+    def test_lookup_uses_slug_field_with_link_fallback(self):
+        a = self.questions.add(slug='two-sum', link='https://leetcode.com/problems/two-sum/')
+        b = self.questions.add(link='https://leetcode.com/problems/lru-cache/?x=1')
+        out = self.index.ids_for({'two-sum', 'lru-cache', 'unknown'})
+        self.assertEqual(out, {'two-sum': a, 'lru-cache': b})
+
+    def test_unchanged_version_skips_rescan(self):
+        self.questions.add(slug='two-sum')
+        self.index.ids_for(['two-sum'])
+        self.index.ids_for(['two-sum'])
+        self.assertEqual(len(self.questions.queries), 1)
+
+    def test_version_bump_loads_only_recent_questions(self):
+        self.questions.add(slug='two-sum')
+        self.index.ids_for(['two-sum'])
+        new = self.questions.add(slug='lru-cache')
+        self.state.find_one.return_value = {'version': 2}
+
+        self.assertEqual(self.index.get('lru-cache'), new)
+        self.assertIn('$gt', self.questions.queries[-1]['_id'])
+        self.assertEqual(len(self.index), 2)
+
+    def test_readers_keep_the_old_map_while_another_thread_reloads(self):
+        old = self.questions.add(slug='two-sum')
+        self.index.ids_for(['two-sum'])
+        self.questions.add(slug='lru-cache')
+        self.state.find_one.return_value = {'version': 2}
+
+        scanning, release = threading.Event(), threading.Event()
+        find = self.questions.find
+
+        def slow_find(query, projection=None):
+            scanning.set()
+            release.wait(2)
+            return find(query, projection)
+
+        self.questions.find = slow_find
+        reloader = threading.Thread(target=self.index.refresh)
+        reloader.start()
+        self.assertTrue(scanning.wait(2))
+        self.assertEqual(self.index.ids_for(['two-sum', 'lru-cache']), {'two-sum': old})
+        release.set()
+        reloader.join(2)
+        self.assertEqual(self.index.version, 2)
+        self.assertEqual(len(self.index), 2)
+
+
+class CatalogResponsesTests(unittest.TestCase):
+    def setUp(self):
+        self.state = MagicMock()
+        self.state.find_one.return_value = {'version': 4}
+        self.responses = CatalogResponses(self.state, check_interval=0)
+
+    def test_body_is_built_once_per_version(self):
+        build = MagicMock(return_value=b'[]')
+        self.assertEqual(self.responses.get('companies', build), ('catalog-4', b'[]'))
+        self.assertEqual(self.responses.get('companies', build), ('catalog-4', b'[]'))
+        self.assertEqual(build.call_count, 1)
+
+        self.state.find_one.return_value = {'version': 5}
+        self.assertEqual(self.responses.etag, 'catalog-5')
+        self.assertEqual(self.responses.get('companies', build), ('catalog-5', b'[]'))
+        self.assertEqual(build.call_count, 2)
+
+    def test_lagging_source_is_not_cached(self):
+        source = MagicMock(version=3)
+        build = MagicMock(return_value=b'{}')
+        self.assertEqual(self.responses.get('topics', build, sources=[source]), (None, b'{}'))
+        source.version = 4
+        self.responses.get('topics', build, sources=[source])
+        self.responses.get('topics', build, sources=[source])
+        self.assertEqual(source.refresh.call_count, 2)
+        self.assertEqual(build.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+os.environ.setdefault('SECRET_KEY', 'test')
+os.environ.setdefault('MONGODB_URI', 'mongodb://localhost:27017/test')
+os.environ.setdefault('JWT_SECRET_KEY', 'testjwt')
+os.environ.setdefault('GOOGLE_CLIENT_ID', 'cid123')
+os.environ.setdefault('DISABLE_INTEGRITY_CHECK', '1')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.app import app, create_access_token
+from backend.modules.catalog import CatalogResponses
+
+
+class CatalogEtagTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        with app.app_context():
+            token = create_access_token(identity='u1')
+        self.headers = {'Authorization': f'Bearer {token}'}
+        state = MagicMock()
+        state.find_one.return_value = {'version': 9}
+        self.responses = CatalogResponses(state, check_interval=0)
+
+    def test_companies_etag_and_304(self):
+        snapshot = MagicMock(version=9, **{'company_names.return_value': ['Acme', 'Globex']})
+        with patch('backend.app.CATALOG_RESPONSES', self.responses), \
+             patch('backend.app.CATALOG_SNAPSHOT', snapshot):
+            first = self.client.get('/api/companies', headers=self.headers)
+            again = self.client.get('/api/companies', headers=self.headers)
+            cached = self.client.get(
+                '/api/companies', headers=self.headers | {'If-None-Match': first.headers['ETag']}
+            )
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json(), ['Acme', 'Globex'])
+        self.assertEqual(first.headers['ETag'], '"catalog-9"')
+        self.assertEqual(again.get_data(), first.get_data())
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.get_data(), b'')
+        snapshot.company_names.assert_called_once()
+
+    def test_304_skips_company_lookup(self):
+        snapshot = MagicMock(version=9, **{'company_id.return_value': 'co1', 'buckets.return_value': ['All']})
+        with patch('backend.app.CATALOG_RESPONSES', self.responses), \
+             patch('backend.app.CATALOG_SNAPSHOT', snapshot):
+            resp = self.client.get(
+                '/api/companies/Acme/buckets', headers=self.headers | {'If-None-Match': '"catalog-9"'}
+            )
+            stale = self.client.get(
+                '/api/companies/Acme/buckets', headers=self.headers | {'If-None-Match': '"catalog-8"'}
+            )
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.get_json(), ['All'])
+        snapshot.company_id.assert_called_once_with('Acme')
+        snapshot.buckets.assert_called_once_with('co1')
+
+    def test_lagging_snapshot_is_not_etagged(self):
+        snapshot = MagicMock(version=8, **{'company_names.return_value': ['Acme']})
+        with patch('backend.app.CATALOG_RESPONSES', self.responses), \
+             patch('backend.app.CATALOG_SNAPSHOT', snapshot):
+            resp = self.client.get('/api/companies', headers=self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn('ETag', resp.headers)
+
+    def test_unsolved_topics_are_not_etagged(self):
+        bits = MagicMock(**{'tag_histogram.return_value': [], 'tags.return_value': {}})
+        with patch('backend.app.CATALOG_RESPONSES', self.responses), \
+             patch('backend.app.CATALOG_SNAPSHOT', MagicMock(**{'company_id.return_value': 'co1'})), \
+             patch('backend.app.CATALOG_BITS', bits), \
+             patch('backend.app.SOLVED_BITS', MagicMock()), \
+             patch('backend.app.difference'):
+            resp = self.client.get('/api/companies/Acme/topics?unsolved=true', headers=self.headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn('ETag', resp.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
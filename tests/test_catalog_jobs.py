@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+
+os.environ.setdefault('SECRET_KEY', 'test')
+os.environ.setdefault('MONGODB_URI', 'mongodb://localhost:27017/test')
+os.environ.setdefault('JWT_SECRET_KEY', 'testjwt')
+os.environ.setdefault('GOOGLE_CLIENT_ID', 'cid123')
+os.environ.setdefault('DISABLE_INTEGRITY_CHECK', '1')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend import app as backend_app
+
+
+def questions(pages):
+    """``questions`` mock whose find().sort().limit() yields ``pages`` in turn."""
+    coll = MagicMock()
+    coll.find.return_value.sort.return_value.limit.side_effect = pages
+    return coll
+
+
+class BackfillJobTests(unittest.TestCase):
+    def run_job(self, pages, checkpoint=None):
+        fetched = lambda slugs: ({s: {'tags': ['Array'], 'content': '<p/>'} for s in slugs}, 0)
+        ctx = SimpleNamespace(total=1, checkpoint=checkpoint, progress=MagicMock())
+        with patch('backend.app.QUEST', questions(pages)), \
+             patch('backend.app.fetch_leetcode_questions', side_effect=fetched), \
+             patch('backend.app.refresh_questions'), \
+             patch('backend.app.CONTENT'), \
+             patch('backend.app.bump_catalog_version') as bump:
+            backend_app._run_backfill_job(ctx)
+        return bump
+
+    def test_catalog_version_is_bumped_once_per_job(self):
+        page = lambda n: [{'_id': ObjectId(), 'link': f'https://leetcode.com/problems/q{n}-{i}/'} for i in range(3)]
+        bump = self.run_job([page(1), page(2), []])
+        bump.assert_called_once()
+
+    def test_resumed_job_bumps_even_with_nothing_left(self):
+        self.run_job([[]]).assert_not_called()
+        self.run_job([[]], checkpoint=str(ObjectId())).assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
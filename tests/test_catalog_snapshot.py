@@ -0,0 +1,89 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.bitmaps import CatalogBitmaps
+from backend.modules.catalog_snapshot import CatalogSnapshot
+from backend.modules.company_index import CompanyIndex
+from backend.modules.search_index import SearchIndex
+
+
+class CatalogSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.q1, self.q2, self.q3 = ObjectId(), ObjectId(), ObjectId()
+        self.acme, self.globex, gone = ObjectId(), ObjectId(), ObjectId()
+        self.companies = MagicMock()
+        self.companies.find.return_value = [
+            {'_id': self.globex, 'name': 'Globex'},
+            {'_id': self.acme, 'name': 'Acme'},
+        ]
+        self.questions = MagicMock()
+        self.questions.find.return_value = [
+            {'_id': self.q1, 'title': 'Two Sum', 'link': 'https://leetcode.com/problems/two-sum/',
+             'leetDifficulty': 'Easy', 'tags': ['Array']},
+            {'_id': self.q2, 'title': 'LRU Cache', 'slug': 'lru-cache', 'link': 'https://leetcode.com/problems/lru-cache/'},
+            {'_id': self.q3, 'title': 'Unlisted', 'slug': 'unlisted'},
+        ]
+        self.cq = MagicMock()
+        self.cq.find.return_value = [
+            {'company_id': self.acme, 'bucket': 'All', 'question_id': self.q2},
+            {'company_id': self.acme, 'bucket': 'All', 'question_id': self.q1},
+            {'company_id': self.acme, 'bucket': '30Days', 'question_id': self.q1},
+            {'company_id': gone, 'bucket': 'All', 'question_id': self.q3},
+        ]
+        self.state = MagicMock()
+        self.state.find_one.return_value = {'version': 2}
+        self.snapshot = CatalogSnapshot(self.companies, self.questions, self.cq, self.state, check_interval=0)
+
+    def test_lookups(self):
+        snap = self.snapshot
+        self.assertEqual(snap.company_names(), ['Acme', 'Globex'])
+        self.assertEqual(snap.company_id('Acme'), self.acme)
+        self.assertIsNone(snap.company_id('Initech'))
+        self.assertEqual(snap.buckets(self.acme), ['30Days', 'All'])
+        self.assertEqual(snap.buckets(self.globex), [])
+
+        info = snap.question(str(self.q1))
+        self.assertEqual((info.title, info.slug, info.difficulty, info.tags), ('Two Sum', 'two-sum', 'Easy', ('Array',)))
+        self.assertEqual(snap.question(self.q2).as_doc()['tags'], [])
+        self.assertIsNone(snap.question(ObjectId()))
+
+        self.assertEqual([q.id for q in snap.members(self.acme, 'All')], [self.q1, self.q2])
+        self.assertEqual([q.id for q in snap.listed()], [self.q1, self.q2])
+
+    def test_reloads_whole_snapshot_on_version_change(self):
+        self.snapshot.company_names()
+        self.snapshot.company_names()
+        self.assertEqual(self.companies.find.call_count, 1)
+
+        self.companies.find.return_value = [{'_id': self.acme, 'name': 'Acme'}]
+        self.state.find_one.return_value = {'version': 3}
+        self.assertEqual(self.snapshot.company_names(), ['Acme'])
+        self.assertEqual(self.questions.find.call_count, 2)
+        self.assertEqual(self.snapshot.version, 3)
+
+    def test_views_are_built_from_one_scan(self):
+        bits = CatalogBitmaps(self.snapshot)
+        search = SearchIndex(self.snapshot)
+        companies = CompanyIndex(self.snapshot)
+        self.assertEqual([t for _, t in search.search('lru')], ['LRU Cache'])
+        self.assertEqual([c['company'] for c in companies.companies_for(self.q1)], ['Acme'])
+        bits.refresh()
+        self.assertEqual((bits.version, search.version, companies.version), (2, 2, 2))
+        self.assertEqual(self.questions.find.call_count, 1)
+        self.assertEqual(self.cq.find.call_count, 1)
+
+        self.state.find_one.return_value = {'version': 3}
+        self.cq.find.return_value = []
+        self.assertEqual(companies.companies_for(self.q1), [])
+        self.assertEqual(companies.version, 3)
+        self.assertEqual(self.cq.find.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.catalog_snapshot import CatalogSnapshot
+from backend.modules.company_index import CompanyIndex
+
+
+class CompanyIndexTests(unittest.TestCase):
+    def test_inverts_company_questions(self):
+        q1, q2 = ObjectId(), ObjectId()
+        acme, globex, gone = ObjectId(), ObjectId(), ObjectId()
+        companies = MagicMock()
+        companies.find.return_value = [
+            {'_id': acme, 'name': 'Acme'},
+            {'_id': globex, 'name': 'Globex'},
+        ]
+        questions = MagicMock()
+        questions.find.return_value = [{'_id': q1, 'title': 'Two Sum'}, {'_id': q2, 'title': 'LRU Cache'}]
+        cq = MagicMock()
+        cq.find.return_value = [
+            {'company_id': globex, 'bucket': 'All', 'question_id': q1, 'frequency': 2.0},
+            {'company_id': acme, 'bucket': 'All', 'question_id': q1, 'frequency': 1.0},
+            {'company_id': acme, 'bucket': '30Days', 'question_id': q1, 'frequency': 4.0},
+            {'company_id': gone, 'bucket': 'All', 'question_id': q2, 'frequency': 1.0},
+        ]
+        state = MagicMock()
+        state.find_one.return_value = {'version': 3}
+        index = CompanyIndex(CatalogSnapshot(companies, questions, cq, state))
+
+        self.assertEqual(
+            index.companies_for(q1),
+            [
+                {
+                    'company': 'Acme',
+                    'buckets': [
+                        {'bucket': '30Days', 'frequency': 4.0},
+                        {'bucket': 'All', 'frequency': 1.0},
+                    ],
+                },
+                {'company': 'Globex', 'buckets': [{'bucket': 'All', 'frequency': 2.0}]},
+            ],
+        )
+        self.assertEqual(index.companies_for(str(q2)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
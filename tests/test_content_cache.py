@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.content_cache import ContentCache, content_hash
+
+
+class ContentCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.coll = MagicMock()
+        self.coll.find_one.return_value = None
+        self.fetch = MagicMock(return_value='<p>live</p>')
+        self.cache = ContentCache(self.coll, self.fetch, ttl=timedelta(days=1))
+
+    def test_cold_miss_fetches_live_and_stores(self):
+        self.assertEqual(self.cache.get('two-sum'), '<p>live</p>')
+        self.fetch.assert_called_once_with('two-sum')
+        (query, update), _ = self.coll.update_one.call_args
+        self.assertEqual(query, {'_id': 'two-sum'})
+        self.assertEqual(update['$set']['hash'], content_hash('<p>live</p>'))
+
+        # Served from memory afterwards
+        self.assertEqual(self.cache.get('two-sum'), '<p>live</p>')
+        self.assertEqual(self.coll.find_one.call_count, 1)
+        self.fetch.assert_called_once()
+
+    def test_empty_live_result_is_not_stored(self):
+        self.fetch.return_value = ''
+        self.assertEqual(self.cache.get('two-sum'), '')
+        self.coll.update_one.assert_not_called()
+
+    def test_fresh_hit_does_not_fetch(self):
+        self.coll.find_one.return_value = {'content': '<p>stored</p>', 'fetchedAt': datetime.utcnow()}
+        self.assertEqual(self.cache.get('two-sum'), '<p>stored</p>')
+        self.fetch.assert_not_called()
+
+    def test_stale_hit_is_served_and_refreshed_in_background(self):
+        self.coll.find_one.return_value = {
+            'content': '<p>stored</p>', 'fetchedAt': datetime.utcnow() - timedelta(days=2),
+        }
+        self.assertEqual(self.cache.get('two-sum'), '<p>stored</p>')
+        self.cache._pool.shutdown(wait=True)
+        self.fetch.assert_called_once_with('two-sum')
+        self.assertEqual(self.cache.get('two-sum'), '<p>live</p>')
+
+    def test_store_many_and_fresh_slugs(self):
+        self.assertEqual(self.cache.store_many({'a': '<p>a</p>', 'b': ''}), 1)
+        ops = self.coll.bulk_write.call_args.args[0]
+        self.assertEqual([op._filter for op in ops], [{'_id': 'a'}])
+        self.assertEqual(self.cache.get('a'), '<p>a</p>')
+        self.coll.find_one.assert_not_called()
+
+        self.coll.find.return_value = [{'_id': 'a'}]
+        self.assertEqual(self.cache.fresh_slugs(['a', 'b']), {'a'})
+        (query, _), _ = self.coll.find.call_args
+        self.assertEqual(query['_id'], {'$in': ['a', 'b']})
+        self.assertLess(datetime.utcnow() - query['fetchedAt']['$gte'], timedelta(days=1, seconds=5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import io
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from backend.modules.ingest import (
+    inspect_upload,
+    iter_upload_chunks,
+    normalize_frame,
+    normalize_import_frame,
+    resolve_company_ids,
+    resolve_question_ids,
+    sync_bucket_rows,
+)
+
+
+class NormalizeFrameTests(unittest.TestCase):
+    def test_column_variants_and_slugs(self):
+        df = pd.DataFrame({
+            ' Question ': ['Two Sum', 'LRU Cache'],
+            'URL': ['https://leetcode.com/problems/two-sum/', 'https://leetcode.com/problems/lru-cache?x=1'],
+            'Acceptance': [0.5, None],
+            'Difficulty': ['EASY', 'MEDIUM'],
+        })
+        out = normalize_frame(df)
+        self.assertEqual(out['slug'].tolist(), ['two-sum', 'lru-cache'])
+        self.assertEqual(out['leetDifficulty'].tolist(), ['Easy', 'Medium'])
+        self.assertEqual(out['acceptanceRate'].tolist(), [0.5, 0.0])
+        self.assertEqual(out['frequency'].tolist(), [0.0, 0.0])
+
+    def test_rows_without_link_are_dropped(self):
+        df = pd.DataFrame({'Title': ['A', 'B'], 'Link': ['https://leetcode.com/problems/a', None]})
+        self.assertEqual(normalize_frame(df)['title'].tolist(), ['A'])
+
+
+class UploadChunkTests(unittest.TestCase):
+    def test_csv_is_streamed_in_chunks(self):
+        data = b"Title,Link,Company,Bucket\n" + b"".join(
+            f"T{i},https://leetcode.com/problems/t{i},Acme,All\n".encode() for i in range(5)
+        )
+        chunks = list(iter_upload_chunks(io.BytesIO(data), 'csv', chunksize=2))
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        self.assertEqual(list(chunks[0].columns), ['title', 'link', 'company', 'bucket'])
+
+    def test_malformed_rows_are_counted(self):
+        chunk = pd.DataFrame({
+            'title': ['A', ''],
+            'link': ['https://leetcode.com/problems/a', 'https://leetcode.com/problems/b'],
+            'company': ['Acme', 'Acme'],
+            'bucket': ['All', 'All'],
+            'frequency': ['bad', '2'],
+        })
+        rows, skipped = normalize_import_frame(chunk)
+        self.assertEqual(skipped, 1)
+        self.assertEqual(rows['slug'].tolist(), ['a'])
+        self.assertEqual(rows['frequency'].tolist(), [0.0])
+        self.assertIsNone(rows['leetDifficulty'][0])
+
+
+class ResolveIdsTests(unittest.TestCase):
+    def frame(self, *slugs):
+        return pd.DataFrame({
+            'slug': list(slugs),
+            'link': [f'https://leetcode.com/problems/{s}/' for s in slugs],
+            'title': [s.title() for s in slugs],
+            'leetDifficulty': ['Easy'] * len(slugs),
+        })
+
+    def test_companies_are_looked_up_then_created_once(self):
+        acme = ObjectId()
+        coll = MagicMock()
+        coll.find.return_value = [{'_id': acme, 'name': 'Acme'}]
+        cache = {}
+        out = resolve_company_ids(coll, ['Acme', 'Globex', 'Acme'], cache)
+        self.assertEqual(out['Acme'], acme)
+        inserted = coll.insert_many.call_args.args[0]
+        self.assertEqual([d['name'] for d in inserted], ['Globex'])
+        self.assertEqual(out['Globex'], inserted[0]['_id'])
+
+        resolve_company_ids(coll, ['Globex'], cache)
+        self.assertEqual(coll.find.call_count, 1)
+
+    def test_questions_match_by_slug_or_link_and_insert_the_rest(self):
+        by_slug, by_link = ObjectId(), ObjectId()
+        coll = MagicMock()
+        coll.find.return_value = [
+            {'_id': by_slug, 'slug': 'two-sum'},
+            {'_id': by_link, 'link': 'https://leetcode.com/problems/lru-cache/'},
+        ]
+        ids = resolve_question_ids(coll, self.frame('two-sum', 'lru-cache', 'new-one', 'two-sum'))
+        inserted = coll.insert_many.call_args.args[0]
+        self.assertEqual([d['slug'] for d in inserted], ['new-one'])
+        self.assertEqual(ids.tolist(), [by_slug, by_link, inserted[0]['_id'], by_slug])
+
+    def test_lost_insert_race_is_reread_by_slug_or_link(self):
+        theirs_slug, theirs_link = ObjectId(), ObjectId()
+        coll = MagicMock()
+        coll.find.side_effect = [
+            [],
+            [
+                {'_id': theirs_slug, 'slug': 'two-sum', 'link': 'https://leetcode.com/problems/two-sum/'},
+                {'_id': theirs_link, 'slug': 'lru', 'link': 'https://leetcode.com/problems/lru-cache/'},
+            ],
+        ]
+        coll.insert_many.side_effect = BulkWriteError(
+            {'writeErrors': [{'index': 0, 'code': 11000}, {'index': 1, 'code': 11000}]}
+        )
+        frame = self.frame('two-sum', 'lru-cache', 'new-one')
+        ids = resolve_question_ids(coll, frame).tolist()
+        self.assertEqual(ids[:2], [theirs_slug, theirs_link])
+        self.assertEqual(ids[2], coll.insert_many.call_args.args[0][2]['_id'])
+        (query, _), _ = coll.find.call_args
+        self.assertEqual(query['$or'][1], {'link': {'$in': sorted(frame['link'][:2])}})
+
+    def test_other_insert_errors_propagate(self):
+        coll = MagicMock()
+        coll.find.return_value = []
+        coll.insert_many.side_effect = BulkWriteError({'writeErrors': [{'index': 0, 'code': 121}]})
+        with self.assertRaises(BulkWriteError):
+            resolve_company_ids(coll, ['Acme'])
+
+
+class SyncBucketRowsTests(unittest.TestCase):
+    def test_only_differences_are_written(self):
+        coll = MagicMock()
+        coll.find.return_value = [
+            {'question_id': 'same', 'frequency': 1.0, 'acceptanceRate': 0.5},
+            {'question_id': 'changed', 'frequency': 1.0, 'acceptanceRate': 0.5},
+            {'question_id': 'gone', 'frequency': 1.0, 'acceptanceRate': 0.5},
+        ]
+        docs = [
+            {'question_id': q, 'company_id': 'c1', 'bucket': 'All', 'frequency': f, 'acceptanceRate': 0.5}
+            for q, f in [('same', 1.0), ('changed', 2.0), ('new', 1.0)]
+        ]
+        out = sync_bucket_rows(coll, 'c1', 'All', docs)
+        self.assertEqual(out, {'inserted': 1, 'updated': 1, 'removed': 1})
+        ops = coll.bulk_write.call_args.args[0]
+        self.assertEqual(
+            [(type(op).__name__, op._filter['question_id']) for op in ops],
+            [('ReplaceOne', 'changed'), ('ReplaceOne', 'new'), ('DeleteMany', {'$in': ['gone']})],
+        )
+
+    def test_unchanged_bucket_writes_nothing(self):
+        coll = MagicMock()
+        coll.find.return_value = [{'question_id': 'q', 'frequency': 1.0, 'acceptanceRate': 0.5}]
+        doc = {'question_id': 'q', 'company_id': 'c1', 'bucket': 'All', 'frequency': 1.0, 'acceptanceRate': 0.5}
+        self.assertEqual(sync_bucket_rows(coll, 'c1', 'All', [doc]), {'inserted': 0, 'updated': 0, 'removed': 0})
+        coll.bulk_write.assert_not_called()
+
+
+class InspectUploadTests(unittest.TestCase):
+    def sheet(self, rows, max_row):
+        wb = MagicMock()
+        wb.active.max_row = max_row
+        wb.active.iter_rows.side_effect = lambda **kw: iter(rows)
+        return patch('openpyxl.load_workbook', return_value=wb)
+
+    def test_csv_counts_lines(self):
+        stream = io.BytesIO(b'Title,Link\na,b\nc,d')
+        self.assertEqual(inspect_upload(stream, 'csv'), ({'title', 'link'}, 2))
+        self.assertEqual(stream.tell(), 0)
+
+    def test_excel_uses_stored_dimensions(self):
+        with self.sheet([('Title', 'Link'), ('a', 'b')], max_row=3):
+            self.assertEqual(inspect_upload(io.BytesIO(), 'xlsx'), ({'title', 'link'}, 2))
+
+    def test_excel_without_dimensions_is_unknown_not_empty(self):
+        with self.sheet([('Title',), ('a',)], max_row=None):
+            self.assertEqual(inspect_upload(io.BytesIO(), 'xlsx'), ({'title'}, None))
+        with self.sheet([('Title',), ('a',)], max_row=1):
+            self.assertEqual(inspect_upload(io.BytesIO(), 'xlsx')[1], None)
+        with self.sheet([('Title',)], max_row=None):
+            self.assertEqual(inspect_upload(io.BytesIO(), 'xlsx')[1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
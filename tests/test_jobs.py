@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules import jobs
+from backend.modules.jobs import JobRunner, describe_job, job_handler
+
+
+class DescribeJobTests(unittest.TestCase):
+    def test_throughput_and_eta(self):
+        now = datetime.utcnow()
+        doc = {
+            '_id': 'j1', 'type': 'import', 'status': 'running',
+            'total': 300, 'processed': 90, 'failed': 10,
+            'startedAt': now - timedelta(seconds=10),
+        }
+        out = describe_job(doc)
+        self.assertAlmostEqual(out['throughput'], 10, delta=0.5)
+        self.assertAlmostEqual(out['eta'], 20, delta=1.5)
+        self.assertNotIn('error', out)
+
+
+class JobRunnerTests(unittest.TestCase):
+    def setUp(self):
+        self.coll = MagicMock()
+        self.runner = JobRunner(self.coll)
+
+    def tearDown(self):
+        jobs.HANDLERS.pop('test-job', None)
+        jobs.FAILURE_HOOKS.pop('test-job', None)
+
+    def test_handler_resumes_from_checkpoint(self):
+        seen = []
+
+        @job_handler('test-job')
+        def handler(ctx):
+            seen.append(ctx.checkpoint)
+            ctx.progress(processed=5, checkpoint=7)
+
+        self.runner.execute({'_id': 'j1', 'type': 'test-job', 'checkpoint': 3, 'attempts': 2})
+        self.assertEqual(seen, [3])
+        progress_update = self.coll.update_one.call_args_list[0][0][1]
+        self.assertEqual(progress_update['$inc'], {'processed': 5, 'failed': 0})
+        self.assertEqual(progress_update['$set']['checkpoint'], 7)
+        final = self.coll.update_one.call_args_list[-1][0][1]['$set']
+        self.assertEqual(final['status'], 'done')
+
+    def test_failure_is_recorded(self):
+        @job_handler('test-job')
+        def handler(ctx):
+            raise RuntimeError('boom')
+
+        self.runner.execute({'_id': 'j1', 'type': 'test-job', 'attempts': 1})
+        final = self.coll.update_one.call_args_list[-1][0][1]['$set']
+        self.assertEqual(final['status'], 'failed')
+        self.assertEqual(final['error'], 'boom')
+
+    def test_failure_hook_runs_when_the_job_fails(self):
+        cleaned = []
+
+        @job_handler('test-job', on_failure=lambda params: cleaned.append(params))
+        def handler(ctx):
+            raise RuntimeError('boom')
+
+        self.runner.execute({'_id': 'j1', 'type': 'test-job', 'params': {'file_id': 'f1'}, 'attempts': 1})
+        self.runner.execute({'_id': 'j2', 'type': 'test-job', 'params': {'file_id': 'f2'}, 'attempts': 9})
+        self.assertEqual(cleaned, [{'file_id': 'f1'}, {'file_id': 'f2'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
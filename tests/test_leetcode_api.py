@@ -11,28 +11,29 @@ os.environ.setdefault('DISABLE_INTEGRITY_CHECK', '1')
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from backend.app import app, _fetch_solved_slugs_via_list, fetch_leetcode_tags
+from backend.app import LEETCODE, app, _fetch_solved_slugs_via_list, fetch_leetcode_questions
+from backend.modules.leetcode_client import HTTPClientError
 from werkzeug.exceptions import HTTPException
-import requests
 
 class LeetEaseLeetCodeErrorTests(unittest.TestCase):
     def test_fetch_solved_slugs_connection_error(self):
         with app.test_request_context():
-            with patch('backend.app.requests.get', side_effect=requests.ConnectionError("fail")):
+            with patch('backend.app.LEETCODE.arequest', side_effect=HTTPClientError("fail")):
                 with self.assertRaises(HTTPException) as cm:
                     _fetch_solved_slugs_via_list('cookie')
                 resp, code = app.handle_http_exception(cm.exception)
                 self.assertEqual(code, 502)
                 self.assertEqual(resp.get_json()['description'], 'Unable to contact LeetCode')
 
-    def test_fetch_leetcode_tags_connection_error(self):
-        with app.test_request_context():
-            with patch('backend.app.requests.post', side_effect=requests.ConnectionError("fail")):
-                with self.assertRaises(HTTPException) as cm:
-                    fetch_leetcode_tags('two-sum')
-                resp, code = app.handle_http_exception(cm.exception)
-                self.assertEqual(code, 502)
-                self.assertEqual(resp.get_json()['description'], 'Unable to contact LeetCode')
+    def test_fetch_leetcode_questions_counts_failed_batches(self):
+        slugs = [f'problem-{i}' for i in range(5)]
+        got = {'problem-0': {'tags': ['Array'], 'content': '<p>0</p>'}}
+        with patch.object(LEETCODE, 'batch_size', 2), \
+             patch.object(LEETCODE, '_fetch_batch', side_effect=[got, HTTPClientError("fail"), {}]):
+            results, failed = fetch_leetcode_questions(slugs)
+        self.assertEqual(results, got)
+        # one batch of 2 errored, and 1 + 1 slugs came back missing
+        self.assertEqual(failed, 4)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.leetcode_client import (
+    CircuitOpenError,
+    HTTPClientError,
+    HTTPStatusError,
+    LeetCodeClient,
+    TokenBucket,
+    build_batch_query,
+)
+from tests.graphql_stub import GraphQLStub
+
+
+class BatchQueryTests(unittest.TestCase):
+    def test_aliases_and_variables(self):
+        query, variables = build_batch_query(['two-sum', 'lru-cache'])
+        self.assertIn('q0: question(titleSlug: $s0)', query)
+        self.assertIn('q1: question(titleSlug: $s1)', query)
+        self.assertIn('topicTags { name }', query)
+        self.assertEqual(variables, {'s0': 'two-sum', 's1': 'lru-cache'})
+
+
+class BatchedFetchTests(unittest.TestCase):
+    def test_one_request_per_batch(self):
+        slugs = [f'problem-{i}' for i in range(10)] + ['missing-one']
+        with GraphQLStub() as stub:
+            client = LeetCodeClient(graphql_url=stub.url, batch_size=4)
+            out = client.fetch_questions(slugs)
+            self.assertEqual(stub.requests, 3)
+        self.assertEqual(len(out), 10)
+        self.assertNotIn('missing-one', out)
+        self.assertEqual(out['problem-3']['tags'], ['Array', 'Problem'])
+        self.assertEqual(out['problem-3']['content'], '<p>Problem problem-3</p>')
+
+
+    def test_concurrent_batches_report_failures(self):
+        slugs = [f'problem-{i}' for i in range(8)] + ['missing-one']
+        with GraphQLStub() as stub:
+            client = LeetCodeClient(graphql_url=stub.url, batch_size=3, retries=0)
+            stub.fail_next, stub.fail_status = 1, 400
+            out, failed = client.fetch_questions(slugs, return_failed=True)
+        # one batch of 3 rejected outright, plus the unknown slug
+        self.assertEqual(len(out), 5)
+        self.assertEqual(failed, 4)
+
+
+class ResilienceTests(unittest.TestCase):
+    def test_retries_429_then_succeeds(self):
+        with GraphQLStub() as stub:
+            client = LeetCodeClient(graphql_url=stub.url, backoff_base=0.01)
+            stub.fail_next = 2
+            out = client.fetch_questions(['two-sum'])
+            self.assertEqual(stub.requests, 3)
+        self.assertIn('two-sum', out)
+
+    def test_blocking_calls_retry_less(self):
+        with GraphQLStub() as stub:
+            client = LeetCodeClient(graphql_url=stub.url, backoff_base=0.01, request_retries=1)
+            stub.fail_next = 5
+            resp = client.graphql_response('{ question(titleSlug: $s) { content } }', {'s': 'two-sum'})
+            self.assertEqual((resp.status_code, stub.requests), (429, 2))
+
+    def test_blocking_calls_give_up_at_the_deadline(self):
+        with GraphQLStub(latency=1.0) as stub:
+            client = LeetCodeClient(graphql_url=stub.url, request_deadline=0.1)
+            started = time.monotonic()
+            with self.assertRaises(HTTPClientError):
+                client.graphql('{ question(titleSlug: $s) { content } }', {'s': 'two-sum'})
+            self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        with GraphQLStub() as stub:
+            client = LeetCodeClient(
+                graphql_url=stub.url, retries=0, breaker_threshold=2, breaker_reset=60
+            )
+            stub.fail_next, stub.fail_status = 10, 503
+            for _ in range(2):
+                with self.assertRaises(HTTPStatusError):
+                    client.fetch_questions(['two-sum'])
+            with self.assertRaises(CircuitOpenError):
+                client.fetch_questions(['two-sum'])
+            self.assertEqual(stub.requests, 2)
+
+    def test_token_bucket_spaces_requests(self):
+        bucket = TokenBucket(rate=50, burst=1)
+        client = LeetCodeClient()
+
+        async def take(n):
+            for _ in range(n):
+                await bucket.acquire()
+
+        started = time.monotonic()
+        client.run(take(6))
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.manifest import Manifest, file_digest
+
+
+class ManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, '5. All.csv')
+        with open(self.path, 'w') as fh:
+            fh.write('title,link\n')
+        st = os.stat(self.path)
+        self.record = {
+            '_id': 'Acme/5. All.csv', 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+            'sha256': file_digest(self.path),
+        }
+        self.coll = MagicMock()
+        self.coll.find.return_value = [self.record, {'_id': 'Acme/1. Gone.csv'}]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unchanged_file_is_skipped(self):
+        state = Manifest(self.coll).check('Acme', '5. All.csv', self.path)
+        self.assertFalse(state.changed)
+        self.assertEqual(state.sha256, self.record['sha256'])
+
+    def test_touched_but_identical_file_refreshes_fast_path_fields(self):
+        self.record['mtime_ns'] -= 1
+        state = Manifest(self.coll).check('Acme', '5. All.csv', self.path)
+        self.assertFalse(state.changed)
+        self.coll.update_one.assert_called_once()
+
+    def test_new_or_edited_file_is_changed(self):
+        self.coll.find.return_value = []
+        self.assertTrue(Manifest(self.coll).check('Acme', '5. All.csv', self.path).changed)
+        self.record.update(size=0, sha256='old')
+        self.coll.find.return_value = [self.record]
+        self.assertTrue(Manifest(self.coll).check('Acme', '5. All.csv', self.path).changed)
+
+    def test_full_reload_rereads_files_but_still_finds_deleted_ones(self):
+        manifest = Manifest(self.coll, full=True)
+        self.assertTrue(manifest.check('Acme', '5. All.csv', self.path).changed)
+        self.assertEqual([r['_id'] for r in manifest.missing({'Acme/5. All.csv'})], ['Acme/1. Gone.csv'])
+
+    def test_record_and_forget(self):
+        manifest = Manifest(self.coll)
+        state = manifest.check('Acme', '5. All.csv', self.path)
+        manifest.record(state, 'Acme', 'All', self.path, rows=0)
+        (query, update), kwargs = self.coll.update_one.call_args
+        self.assertEqual(query, {'_id': 'Acme/5. All.csv'})
+        self.assertEqual(update['$set']['sha256'], self.record['sha256'])
+        self.assertTrue(kwargs['upsert'])
+        manifest.forget('Acme/1. Gone.csv')
+        self.assertEqual(manifest.missing({'Acme/5. All.csv'}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
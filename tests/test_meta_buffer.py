@@ -0,0 +1,99 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.meta_buffer import MetaWriteBuffer, row_ops
+from backend.modules.meta_ids import MetaIds
+
+
+def meta_ids():
+    migrations = MagicMock()
+    migrations.find_one.return_value = {'status': 'done'}
+    return MetaIds(migrations)
+
+
+class RowOpsTests(unittest.TestCase):
+    def test_new_bucket_row_starts_solved_and_syncs_other_rows(self):
+        q = ObjectId()
+        rows = [{'company_id': 'co2', 'bucket': 'All', 'solved': True}]
+        ops, inserted = row_ops('u1', q, q, [(('co1', '30d'), {'note': 'n'}, 1)], rows)
+        self.assertEqual(inserted, 1)
+        self.assertEqual([type(op).__name__ for op in ops], ['UpdateOne', 'UpdateMany'])
+        self.assertEqual(ops[0]._doc['$setOnInsert'], {'solved': True})
+        self.assertEqual(ops[0]._filter, {'user_id': 'u1', 'question_id': q, 'company_id': 'co1', 'bucket': '30d'})
+        self.assertEqual([r.get('note') for r in rows], ['n', 'n'])
+        self.assertTrue(rows[1]['solved'])
+
+    def test_writes_replay_in_order(self):
+        q = ObjectId()
+        rows = []
+        writes = [(None, {'solved': True}, 1), (('co1', 'All'), {'note': 'a'}, 2), (None, {'solved': False}, 3)]
+        ops, inserted = row_ops('u1', q, q, writes, rows)
+        self.assertEqual(inserted, 2)
+        self.assertEqual([type(op).__name__ for op in ops], ['UpdateOne', 'UpdateOne', 'UpdateMany', 'UpdateOne', 'UpdateMany'])
+        self.assertEqual(rows, [{'solved': False, 'note': 'a'}, {'company_id': 'co1', 'bucket': 'All', 'solved': False, 'note': 'a'}])
+
+
+class MetaWriteBufferTests(unittest.TestCase):
+    def setUp(self):
+        self.coll = MagicMock()
+        self.coll.find.return_value = []
+        self.coll.bulk_write.return_value.upserted_count = 1
+        self.on_flush = MagicMock()
+        self.buffer = MetaWriteBuffer(self.coll, meta_ids(), on_flush=self.on_flush)
+        self.q = ObjectId()
+
+    def test_same_target_writes_are_merged(self):
+        self.buffer.add('u1', self.q, None, {'solved': True}, 1)
+        self.buffer.add('u1', self.q, None, {'note': 'n'}, 2)
+        self.buffer.add('u1', self.q, ('co1', 'All'), {'note': 'm'}, 3)
+        self.assertEqual(
+            self.buffer.writes('u1', self.q),
+            [(None, {'solved': True, 'note': 'n'}, 2), (('co1', 'All'), {'note': 'm'}, 3)],
+        )
+        self.assertEqual(self.buffer.pending('u1', [self.q]), {str(self.q): {'solved': True, 'note': 'm'}})
+        self.assertEqual(self.buffer.pending('u2', [self.q]), {})
+        self.coll.bulk_write.assert_not_called()
+
+    def test_flush_writes_once_per_user(self):
+        other = ObjectId()
+        self.buffer.add('u1', self.q, None, {'solved': True}, 1)
+        self.buffer.add('u1', other, None, {'solved': True}, 1)
+        self.buffer.add('u2', self.q, None, {'note': 'n'}, 1)
+        self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(self.coll.find.call_count, 2)
+        self.assertEqual(self.coll.bulk_write.call_count, 2)
+        self.assertTrue(all(c.kwargs['ordered'] for c in self.coll.bulk_write.call_args_list))
+        self.on_flush.assert_any_call('u1', 1)
+        self.on_flush.assert_any_call('u2', 1)
+        self.assertEqual(self.buffer.pending('u1', [self.q, other]), {})
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_failed_flush_keeps_writes_in_order(self):
+        self.buffer.add('u1', self.q, None, {'note': 'a'}, 1)
+        self.coll.bulk_write.side_effect = [RuntimeError('down'), MagicMock(upserted_count=0)]
+        with self.assertRaises(RuntimeError):
+            self.buffer.flush()
+        self.buffer.add('u1', self.q, ('co1', 'All'), {'note': 'b'}, 2)
+        self.assertEqual(
+            self.buffer.writes('u1', self.q),
+            [(None, {'note': 'a'}, 1), (('co1', 'All'), {'note': 'b'}, 2)],
+        )
+        self.buffer.flush()
+        ops = self.coll.bulk_write.call_args.args[0]
+        self.assertEqual([op._doc['$set']['note'] for op in ops if type(op).__name__ == 'UpdateOne'], ['a', 'b'])
+        self.on_flush.assert_called_once_with('u1', 0)
+
+    def test_stop_flushes_pending_writes(self):
+        self.buffer.add('u1', self.q, None, {'solved': True}, 1)
+        self.buffer.stop()
+        self.coll.bulk_write.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
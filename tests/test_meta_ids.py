@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.meta_ids import MIGRATION_ID, MetaIds, migrate
+
+
+class FakeCursor(list):
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        return FakeCursor(self[:n])
+
+
+class FakeMeta:
+    def __init__(self, values):
+        self.docs = [{'_id': i, 'question_id': v} for i, v in enumerate(values)]
+
+    def find(self, query, projection=None):
+        after = query.get('_id', {}).get('$gt', -1)
+        return FakeCursor(
+            d for d in self.docs if isinstance(d['question_id'], str) and d['_id'] > after
+        )
+
+    def bulk_write(self, ops, ordered=True):
+        modified = 0
+        for op in ops:
+            doc = self.docs[op._filter['_id']]
+            if doc['question_id'] == op._filter['question_id']:
+                doc['question_id'] = op._doc['$set']['question_id']
+                modified += 1
+        return SimpleNamespace(modified_count=modified)
+
+
+class MetaIdsTests(unittest.TestCase):
+    def test_compat_matches_both_representations_until_done(self):
+        migrations = MagicMock()
+        migrations.find_one.return_value = {'status': 'running'}
+        ids = MetaIds(migrations, check_interval=0)
+        oid = ObjectId()
+        self.assertEqual(ids.match(str(oid)), {'$in': [oid, str(oid)]})
+
+        migrations.find_one.return_value = {'status': 'done'}
+        self.assertEqual(ids.match(str(oid)), oid)
+        self.assertEqual(ids.match_many([str(oid)]), {'$in': [oid]})
+
+
+class MigrateTests(unittest.TestCase):
+    def test_converts_in_batches_and_records_completion(self):
+        oids = [ObjectId() for _ in range(5)]
+        meta = FakeMeta([str(o) for o in oids] + ['not-an-id', oids[0]])
+        migrations = MagicMock()
+
+        out = migrate(meta, migrations, batch_size=2, log=lambda *_: None)
+
+        self.assertEqual(out['converted'], 5)
+        self.assertEqual(out['invalid'], 1)
+        self.assertEqual([d['question_id'] for d in meta.docs[:5]], oids)
+        (query, update), _ = migrations.update_one.call_args
+        self.assertEqual(query, {'_id': MIGRATION_ID})
+        self.assertEqual(update['$set']['status'], 'done')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_match,
+    value_at,
+)
+
+
+class CursorTests(unittest.TestCase):
+    def test_round_trip(self):
+        oid = ObjectId()
+        cursor = encode_cursor('q.title', 'Two Sum', oid)
+        self.assertEqual(decode_cursor(cursor, 'q.title'), ('Two Sum', oid))
+
+    def test_rejects_garbage_and_other_sort(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not a cursor', 'q.title')
+        cursor = encode_cursor('frequency', 0.5, ObjectId())
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(cursor, 'q.title')
+
+    def test_keyset_match_handles_nulls(self):
+        oid = ObjectId()
+        self.assertEqual(
+            keyset_match('frequency', 1, 0.5, oid),
+            {'$or': [{'frequency': {'$gt': 0.5}}, {'frequency': 0.5, '_id': {'$gt': oid}}]},
+        )
+        self.assertIn({'frequency': None}, keyset_match('frequency', -1, 0.5, oid)['$or'])
+        self.assertEqual(
+            keyset_match('frequency', -1, None, oid), {'frequency': None, '_id': {'$lt': oid}}
+        )
+        self.assertIn({'frequency': {'$ne': None}}, keyset_match('frequency', 1, None, oid)['$or'])
+
+    def test_value_at(self):
+        self.assertEqual(value_at({'q': {'title': 'A'}}, 'q.title'), 'A')
+        self.assertIsNone(value_at({'q': None}, 'q.title'))
+
+
+if __name__ == '__main__':
+    unittest.main()
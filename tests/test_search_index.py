@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.catalog_snapshot import CatalogSnapshot
+from backend.modules.search_index import SearchIndex
+
+TITLES = {
+    'two-sum': 'Two Sum',
+    'two-sum-ii': 'Two Sum II',
+    '3sum': '3Sum',
+    'path-sum': 'Path Sum',
+    'lru-cache': 'LRU Cache',
+    'sum-of-two-integers': 'Sum of Two Integers',
+}
+
+
+def index(frequency=None):
+    frequency = frequency or {}
+    ids = {slug: ObjectId() for slug in TITLES}
+    questions = MagicMock()
+    questions.find.return_value = [
+        {'_id': ids[slug], 'slug': slug, 'title': title} for slug, title in TITLES.items()
+    ]
+    companies = MagicMock()
+    companies.find.return_value = [{'_id': 'c1', 'name': 'Acme'}]
+    cq = MagicMock()
+    cq.find.return_value = [
+        {'company_id': 'c1', 'bucket': 'All', 'question_id': ids[s], 'frequency': f} for s, f in frequency.items()
+    ]
+    state = MagicMock()
+    state.find_one.return_value = {'version': 1}
+    return SearchIndex(CatalogSnapshot(companies, questions, cq, state)), ids
+
+
+class SearchIndexTests(unittest.TestCase):
+    def test_prefix_hits_rank_before_infix(self):
+        idx, _ = index()
+        titles = [t for _, t in idx.search('sum')]
+        self.assertEqual(
+            titles, ['Sum of Two Integers', '3Sum', 'Path Sum', 'Two Sum', 'Two Sum II']
+        )
+        titles = [t for _, t in idx.search('two')]
+        self.assertEqual(titles, ['Two Sum', 'Two Sum II', 'Sum of Two Integers'])
+
+    def test_frequency_breaks_ties(self):
+        idx, _ = index({'two-sum-ii': 5.0, 'path-sum': 1.0})
+        titles = [t for _, t in idx.search('sum')]
+        self.assertEqual(
+            titles, ['Sum of Two Integers', 'Two Sum II', 'Path Sum', '3Sum', 'Two Sum']
+        )
+
+    def test_slug_and_short_queries(self):
+        idx, ids = index()
+        self.assertEqual(idx.matching_ids('lru-c'), [ids['lru-cache']])
+        self.assertEqual([t for _, t in idx.search('ca')], ['LRU Cache'])
+        self.assertEqual(idx.search('3s', limit=1), [(ids['3sum'], '3Sum')])
+        self.assertEqual(idx.search('  '), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
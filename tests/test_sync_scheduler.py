@@ -0,0 +1,54 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.sync_scheduler import (
+    PRIORITY_MANUAL,
+    SyncScheduler,
+    shard_of,
+)
+
+
+class SyncSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.coll = MagicMock()
+        self.scheduler = SyncScheduler(self.coll, lambda uid: 3, shards=4, shard_ids=[1, 3])
+
+    def test_request_upserts_one_document_per_user(self):
+        self.scheduler.request('u1', PRIORITY_MANUAL)
+        (query, update), kwargs = self.coll.update_one.call_args
+        self.assertEqual(query, {'_id': 'u1'})
+        self.assertEqual(update['$max'], {'priority': PRIORITY_MANUAL})
+        self.assertIn('dueAt', update['$min'])
+        self.assertEqual(update['$setOnInsert']['shard'], shard_of('u1', 4))
+        self.assertTrue(kwargs['upsert'])
+
+    def test_claim_is_limited_to_own_shards(self):
+        self.coll.count_documents.return_value = 0
+        self.scheduler.claim()
+        (query, _), kwargs = self.coll.find_one_and_update.call_args
+        self.assertEqual(query['shard'], {'$in': [1, 3]})
+        self.assertEqual(kwargs['sort'], [('priority', -1), ('dueAt', 1)])
+
+    def test_claim_respects_global_cap(self):
+        self.coll.count_documents.return_value = self.scheduler.max_running
+        self.assertIsNone(self.scheduler.claim())
+        self.coll.find_one_and_update.assert_not_called()
+
+    def test_request_during_run_keeps_user_due(self):
+        requested = datetime(2025, 1, 1)
+        self.coll.update_one.return_value.matched_count = 0
+        self.scheduler.execute({'_id': 'u1', 'requestedAt': requested})
+        first, second = self.coll.update_one.call_args_list
+        self.assertEqual(first.args[0]['requestedAt'], {'$lte': requested})
+        self.assertNotIn('dueAt', second.args[1]['$set'])
+        self.assertEqual(second.args[1]['$set']['lastResult'], 3)
+        self.assertEqual(second.args[1]['$set']['servedAt'], requested)
+
+
+if __name__ == '__main__':
+    unittest.main()
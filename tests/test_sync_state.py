@@ -0,0 +1,82 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+
+os.environ.setdefault('SECRET_KEY', 'test')
+os.environ.setdefault('MONGODB_URI', 'mongodb://localhost:27017/test')
+os.environ.setdefault('JWT_SECRET_KEY', 'testjwt')
+os.environ.setdefault('DISABLE_INTEGRITY_CHECK', '1')
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend import app as app_module
+from backend.modules.meta_ids import MetaIds
+from backend.modules.sync_state import SyncMetrics
+
+Q1, Q2 = '0' * 23 + '1', '0' * 23 + '2'
+
+
+class DifferentialSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.index = MagicMock()
+        self.index.ids_for.return_value = {'two-sum': Q1, 'lru-cache': Q2}
+        self.state = MagicMock()
+        self.meta = MagicMock()
+        self.metrics = SyncMetrics()
+        self.bits = MagicMock()
+        self.stats = MagicMock()
+        migrations = MagicMock()
+        migrations.find_one.return_value = {'status': 'done'}
+        self.patches = [
+            patch.object(app_module, 'SLUG_INDEX', self.index),
+            patch.object(app_module, 'SYNC_STATE', self.state),
+            patch.object(app_module, 'USER_META', self.meta),
+            patch.object(app_module, 'SYNC_METRICS', self.metrics),
+            patch.object(app_module, 'SOLVED_BITS', self.bits),
+            patch.object(app_module, 'USER_STATS', self.stats),
+            patch.object(app_module, 'META_IDS', MetaIds(migrations)),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+
+    def test_only_new_solves_are_written(self):
+        self.state.previous.return_value = {Q1}
+        synced = app_module._mark_solved('u1', {'two-sum', 'lru-cache'})
+        self.assertEqual(synced, 2)
+        (ops,), _ = self.meta.bulk_write.call_args
+        self.assertEqual([op._filter['question_id'] for op in ops], [ObjectId(Q2)])
+        self.state.record.assert_called_once_with('u1', {Q1, Q2})
+        self.bits.update.assert_called_once_with('u1', {Q2}, True)
+        self.assertEqual(self.metrics.snapshot()['writesAvoided'], 1)
+
+    def test_unchanged_set_skips_bulk_write(self):
+        self.state.previous.return_value = {Q1, Q2}
+        synced = app_module._mark_solved('u1', {'two-sum', 'lru-cache'})
+        self.assertEqual(synced, 2)
+        self.meta.bulk_write.assert_not_called()
+        self.state.record.assert_not_called()
+        self.assertEqual(
+            self.metrics.snapshot(),
+            {'syncs': 1, 'unchanged': 1, 'writes': 0, 'writesAvoided': 2},
+        )
+
+
+    def test_write_behind_queues_solves_in_the_buffer(self):
+        self.state.previous.return_value = {Q1}
+        buffer = MagicMock()
+        with patch.object(app_module, 'META_BUFFER', buffer):
+            app_module._mark_solved('u1', {'two-sum', 'lru-cache'})
+        self.meta.bulk_write.assert_not_called()
+        (uid, qid, target, fields, _), _ = buffer.add.call_args
+        self.assertEqual((uid, qid, target, fields), ('u1', ObjectId(Q2), None, {'solved': True}))
+        self.stats.apply.assert_called_once_with('u1', self.bits.update.return_value, True, inserted=0)
+
+if __name__ == '__main__':
+    unittest.main()
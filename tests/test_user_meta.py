@@ -1,5 +1,6 @@
 import os
 import unittest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
 os.environ.setdefault('SECRET_KEY', 'test')
@@ -12,7 +13,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from backend import app as app_module
 from backend.app import app, create_access_token
+from backend.modules.meta_ids import MetaIds
 from bson.objectid import ObjectId
+from pymongo import UpdateOne
 
 class FakeColl:
     def __init__(self):
@@ -22,35 +25,35 @@ class FakeColl:
             if all(doc.get(k) == v for k, v in query.items() if not isinstance(v, dict)):
                 return doc.copy()
         return None
-    def find_one_and_update(self, query, update, upsert=False, return_document=False):
-        doc = self.find_one(query)
-        if doc:
-            if "$set" in update:
-                doc.update(update["$set"])
-            if return_document:
-                return doc.copy()
-            return None
-        elif upsert:
-            new_doc = query.copy()
-            if "$setOnInsert" in update:
-                new_doc.update(update["$setOnInsert"])
-            if "$set" in update:
-                new_doc.update(update["$set"])
-            self.docs.append(new_doc)
-            return new_doc.copy()
-        return None
+    def find(self, query, projection=None):
+        return [
+            doc.copy()
+            for doc in self.docs
+            if all(doc.get(k) == v for k, v in query.items() if not isinstance(v, dict))
+        ]
     def update_one(self, query, update, upsert=False):
-        doc = self.find_one(query)
+        doc = next(
+            (d for d in self.docs if all(d.get(k) == v for k, v in query.items() if not isinstance(v, dict))),
+            None,
+        )
         if doc:
             if "$set" in update:
                 doc.update(update["$set"])
         elif upsert:
-            new_doc = query.copy()
-            if "$set" in update:
-                new_doc.update(update["$set"])
+            new_doc = {"_id": ObjectId()} | {k: v for k, v in query.items() if not isinstance(v, dict)}
+            new_doc.update(update.get("$setOnInsert", {}))
+            new_doc.update(update.get("$set", {}))
             self.docs.append(new_doc)
-    def update_many(self, *args, **kwargs):
-        pass
+            return SimpleNamespace(upserted_id=len(self.docs))
+        return SimpleNamespace(upserted_id=None)
+    def bulk_write(self, ops, ordered=True):
+        upserted = 0
+        for op in ops:
+            # Other rows of the question are not modelled
+            if isinstance(op, UpdateOne):
+                res = self.update_one(op._filter, op._doc, upsert=op._upsert)
+                upserted += res.upserted_id is not None
+        return SimpleNamespace(upserted_count=upserted)
 
 class UserMetaTests(unittest.TestCase):
     def setUp(self):
@@ -63,10 +66,15 @@ class UserMetaTests(unittest.TestCase):
         self.fake_meta = FakeColl()
 
     def test_rating_update_preserves_solved(self):
-        self.fake_meta.docs.append({"user_id": "u1", "question_id": "000000000000000000000001", "solved": True})
+        # Legacy row with a string question_id, read through the compat path
+        self.fake_meta.docs.append({"_id": ObjectId(), "user_id": "u1", "question_id": "000000000000000000000001", "solved": True})
+        migrations = MagicMock()
+        migrations.find_one.return_value = None
         with patch("backend.app.USER_META", self.fake_meta), \
-             patch("backend.app.QUEST.find_one", return_value=True), \
-             patch("backend.app.COMPANIES.find_one", return_value={"_id": "co1", "name": "Acme"}):
+             patch("backend.app.USER_STATS", MagicMock()), \
+             patch("backend.app.META_IDS", MetaIds(migrations)), \
+             patch("backend.app.CATALOG_BITS", MagicMock(**{"ordinal.return_value": 0})), \
+             patch("backend.app.CATALOG_SNAPSHOT", MagicMock(**{"company_id.return_value": "co1"})):
             resp = self.client.patch(
                 "/api/questions/000000000000000000000001",
                 json={"userDifficulty": "Easy", "company": "Acme", "bucket": "30d"},
@@ -75,8 +83,75 @@ class UserMetaTests(unittest.TestCase):
         self.assertEqual(resp.status_code, 200)
         data = resp.get_json()
         self.assertTrue(data["solved"])
-        doc = self.fake_meta.find_one({"user_id": "u1", "question_id": "000000000000000000000001", "company_id": "co1", "bucket": "30d"})
+        doc = self.fake_meta.find_one({"user_id": "u1", "question_id": ObjectId("000000000000000000000001"), "company_id": "co1", "bucket": "30d"})
         self.assertTrue(doc["solved"])
 
+    def test_solved_toggle_returns_stored_fields(self):
+        q = ObjectId("000000000000000000000002")
+        self.fake_meta.docs.append({"_id": ObjectId(), "user_id": "u1", "question_id": q, "note": "dp", "userDifficulty": "Hard"})
+        migrations = MagicMock()
+        migrations.find_one.return_value = {"status": "done"}
+        bits = MagicMock(**{"update.return_value": [0]})
+        with patch("backend.app.USER_META", self.fake_meta), \
+             patch("backend.app.USER_STATS", MagicMock()) as stats, \
+             patch("backend.app.SOLVED_BITS", bits), \
+             patch("backend.app.META_IDS", MetaIds(migrations)), \
+             patch("backend.app.CATALOG_BITS", MagicMock(**{"ordinal.return_value": 1})), \
+             patch("backend.app.QUEST.find_one") as quest_find:
+            resp = self.client.patch(f"/api/questions/{q}", json={"solved": True}, headers=self.headers)
+        self.assertEqual(
+            resp.get_json(),
+            {"question_id": str(q), "solved": True, "userDifficulty": "Hard", "note": "dp"},
+        )
+        quest_find.assert_not_called()
+        self.assertEqual(len(self.fake_meta.docs), 1)
+        stats.apply.assert_called_once_with("u1", [0], True, inserted=0)
+
+    def test_unknown_question_is_404(self):
+        with patch("backend.app.CATALOG_BITS", MagicMock(**{"ordinal.return_value": None})), \
+             patch("backend.app.QUEST.find_one", return_value=None):
+            resp = self.client.patch(
+                "/api/questions/000000000000000000000003", json={"solved": True}, headers=self.headers
+            )
+        self.assertEqual(resp.status_code, 404)
+
+    def test_batch_reads_once_per_chunk_and_writes_minimal_ops(self):
+        app_module.csrf.exempt(app_module.batch_update_questions_meta)
+        qids = [ObjectId() for _ in range(5)]
+        meta = MagicMock()
+        # Only the first question already has a row, in another bucket
+        meta.find.side_effect = lambda query, projection: (
+            [{"_id": ObjectId(), "question_id": qids[0], "company_id": "co2", "bucket": "All", "solved": True}]
+            if qids[0] in query["question_id"]["$in"]
+            else []
+        )
+        meta.bulk_write.return_value.upserted_count = 2
+        migrations = MagicMock()
+        migrations.find_one.return_value = {"status": "done"}
+        with patch("backend.app.USER_META", meta), \
+             patch("backend.app.USER_STATS", MagicMock()) as stats, \
+             patch("backend.app.META_IDS", MetaIds(migrations)), \
+             patch("backend.app.BATCH_META_CHUNK", 3), \
+             patch("backend.app.CATALOG_SNAPSHOT", MagicMock(**{"company_id.return_value": "co1"})):
+            resp = self.client.patch(
+                "/api/questions/batch-meta",
+                json={"ids": [str(q) for q in qids], "note": "n", "company": "Acme", "bucket": "30d"},
+                headers=self.headers,
+            )
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        self.assertEqual([d["question_id"] for d in data], [str(q) for q in qids])
+        self.assertTrue(data[0]["solved"])
+        self.assertFalse(data[1]["solved"])
+        self.assertEqual({d["note"] for d in data}, {"n"})
+        meta.find_one.assert_not_called()
+        self.assertEqual(meta.find.call_count, 2)
+        first, second = [c.args[0] for c in meta.bulk_write.call_args_list]
+        # Upserts for every question, one UpdateMany for the row in another bucket
+        self.assertEqual([type(op).__name__ for op in first], ["UpdateOne", "UpdateMany", "UpdateOne", "UpdateOne"])
+        self.assertEqual(first[0]._doc["$setOnInsert"], {"solved": True})
+        self.assertEqual(len(second), 2)
+        stats.apply.assert_called_once_with("u1", [], True, inserted=4)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.modules.bitmaps import CatalogBitmaps, from_ordinals
+from backend.modules.catalog_snapshot import CatalogSnapshot
+from backend.modules.user_stats import StatsCounters
+
+QIDS = [ObjectId() for _ in range(6)]
+
+
+def catalog():
+    companies = MagicMock()
+    companies.find.return_value = [{'_id': 'c1', 'name': 'Acme'}, {'_id': 'c2', 'name': 'Globex'}]
+    questions = MagicMock()
+    questions.find.return_value = [
+        {'_id': q, 'ordinal': i, 'leetDifficulty': ['Easy', 'Medium', 'Hard'][i % 3]}
+        for i, q in enumerate(QIDS)
+    ]
+    cq = MagicMock()
+    cq.find.return_value = [
+        {'company_id': 'c1', 'bucket': 'All', 'question_id': q} for q in QIDS[:4]
+    ] + [
+        {'company_id': 'c2', 'bucket': 'All', 'question_id': QIDS[3]},
+        {'company_id': 'c2', 'bucket': '30Days', 'question_id': QIDS[3]},
+    ]
+    state = MagicMock()
+    state.find_one.return_value = {'version': 7}
+    return CatalogBitmaps(CatalogSnapshot(companies, questions, cq, state))
+
+
+class StatsCountersTests(unittest.TestCase):
+    def setUp(self):
+        self.coll = MagicMock()
+        self.meta = MagicMock()
+        self.meta.count_documents.return_value = 9
+        self.solved = MagicMock()
+        self.stats = StatsCounters(self.coll, self.meta, catalog(), self.solved)
+
+    def test_apply_increments_counters_for_flips(self):
+        self.stats.apply('u1', [0, 3], True, inserted=2)
+        (query, update), _ = self.coll.update_one.call_args
+        self.assertEqual(query, {'_id': 'u1', 'catalogVersion': 7})
+        self.assertEqual(
+            update['$inc'],
+            {
+                'totalSolved': 2,
+                'difficulty.Easy': 2,
+                'companies.c1': 2,
+                'companies.c2': 1,
+                'totalAttempted': 2,
+                'rev': 1,
+            },
+        )
+
+    def test_apply_decrements_on_unsolve_and_skips_noops(self):
+        self.stats.apply('u1', [], False)
+        self.coll.update_one.assert_not_called()
+        self.stats.apply('u1', [1], False)
+        update = self.coll.update_one.call_args.args[1]
+        self.assertEqual(update['$inc'], {'totalSolved': -1, 'difficulty.Medium': -1, 'companies.c1': -1, 'rev': 1})
+
+    def test_stale_document_is_rebuilt_from_bitmap(self):
+        self.coll.find_one.return_value = {'_id': 'u1', 'catalogVersion': 6, 'rev': 4}
+        self.coll.replace_one.return_value.matched_count = 1
+        self.solved.get.return_value = from_ordinals([2, 3, 5], 6)
+        doc = self.stats.get('u1')
+        self.assertEqual(doc['totalSolved'], 3)
+        self.assertEqual(doc['totalAttempted'], 9)
+        self.assertEqual(doc['difficulty'], {'Easy': 1, 'Medium': 0, 'Hard': 2})
+        self.assertEqual(doc['companies'], {'c1': 2, 'c2': 1})
+        query = self.coll.replace_one.call_args.args[0]
+        self.assertEqual(query, {'_id': 'u1', 'rev': 4})
+
+    def test_current_document_is_served_as_is(self):
+        stored = {'_id': 'u1', 'catalogVersion': 7, 'rev': 1, 'totalSolved': 1}
+        self.coll.find_one.return_value = stored
+        self.assertIs(self.stats.get('u1'), stored)
+        self.meta.count_documents.assert_not_called()
+
+    def test_reconcile_reports_drift(self):
+        self.coll.find_one.return_value = {
+            '_id': 'u1',
+            'catalogVersion': 7,
+            'rev': 2,
+            'totalSolved': 3,
+            'totalAttempted': 9,
+            'difficulty': {'Easy': 2, 'Medium': 1, 'Hard': 0},
+            'companies': {'c1': 3, 'c2': 0},
+        }
+        self.meta.distinct.return_value = [QIDS[0], str(QIDS[3])]
+        drift = self.stats.reconcile('u1')
+        self.assertEqual(
+            drift,
+            {
+                'totalSolved': [3, 2],
+                'difficulty.Medium': [1, 0],
+                'companies.c1': [3, 2],
+                'companies.c2': [0, 1],
+            },
+        )
+        (query, doc), kwargs = self.coll.replace_one.call_args
+        self.assertEqual(doc['rev'], 3)
+        self.assertEqual(doc['totalSolved'], 2)
+        self.assertTrue(kwargs['upsert'])
+
+
+if __name__ == '__main__':
+    unittest.main()